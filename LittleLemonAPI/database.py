@@ -0,0 +1,104 @@
+"""
+Build ``DATABASES['default']`` from environment variables.
+
+DATABASE_ENGINE              ``sqlite`` (default) or ``postgresql``
+DATABASE_NAME                SQLite file, or PostgreSQL database name
+DATABASE_USER, DATABASE_PASSWORD, DATABASE_HOST, DATABASE_PORT
+DATABASE_CONN_MAX_AGE        Seconds a connection is reused across requests
+                             (default ``0``: closed after every request,
+                             ``none`` keeps it forever). Only raise it for
+                             WSGI workers: under ASGI (asgi.py, the async
+                             views) each request may run in a new thread
+                             with its own connection, so persistent ones
+                             pile up until the database runs out.
+DATABASE_CONN_HEALTH_CHECKS  Ping a reused connection once per request
+                             before trusting it (default on)
+DATABASE_POOL                PostgreSQL only: ``on`` or ``MIN:MAX`` pooled
+                             connections per worker (needs psycopg[pool]);
+                             replaces persistent connections
+DATABASE_SQLITE_PRAGMAS      ``off`` to skip the SQLite tuning below
+"""
+
+# Applied on every new SQLite connection. WAL lets readers run alongside the
+# writer, NORMAL only syncs at checkpoints (safe under WAL), the mmap cuts
+# read syscalls and the busy timeout makes writers queue instead of failing
+# with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 128 * 1024 * 1024,
+    'busy_timeout': 5000,
+}
+
+ENGINES = {
+    'sqlite': 'django.db.backends.sqlite3',
+    'postgresql': 'django.db.backends.postgresql',
+}
+
+TRUE = ('1', 'true', 'yes', 'on')
+FALSE = ('0', 'false', 'no', 'off')
+
+
+def _flag(environ, name, default):
+    value = environ.get(name, '').strip().lower()
+    if value in TRUE:
+        return True
+    if value in FALSE:
+        return False
+    return default
+
+
+def _conn_max_age(environ, default=0):
+    value = environ.get('DATABASE_CONN_MAX_AGE', '').strip().lower()
+    if not value:
+        return default
+    if value == 'none':
+        return None
+    return int(value)
+
+
+def _pool_options(value):
+    if value.lower() in TRUE:
+        return True
+    min_size, _, max_size = value.partition(':')
+    options = {'min_size': int(min_size)}
+    if max_size:
+        options['max_size'] = int(max_size)
+    return options
+
+
+def sqlite_init_command(pragmas=SQLITE_PRAGMAS):
+    return ';'.join(f'PRAGMA {name}={value}' for name, value in pragmas.items())
+
+
+def database_config(environ, base_dir):
+    engine = environ.get('DATABASE_ENGINE', 'sqlite').strip().lower()
+    if engine not in ENGINES:
+        raise ValueError(f"DATABASE_ENGINE must be one of {', '.join(ENGINES)}, not {engine!r}.")
+    config = {
+        'ENGINE': ENGINES[engine],
+        'CONN_MAX_AGE': _conn_max_age(environ),
+        'CONN_HEALTH_CHECKS': _flag(environ, 'DATABASE_CONN_HEALTH_CHECKS', True),
+        'OPTIONS': {},
+    }
+
+    if engine == 'sqlite':
+        config['NAME'] = environ.get('DATABASE_NAME') or base_dir / 'db.sqlite3'
+        if _flag(environ, 'DATABASE_SQLITE_PRAGMAS', True):
+            config['OPTIONS']['init_command'] = sqlite_init_command()
+        return config
+
+    config.update({
+        'NAME': environ.get('DATABASE_NAME', 'littlelemon'),
+        'USER': environ.get('DATABASE_USER', ''),
+        'PASSWORD': environ.get('DATABASE_PASSWORD', ''),
+        'HOST': environ.get('DATABASE_HOST', ''),
+        'PORT': environ.get('DATABASE_PORT', ''),
+    })
+    pool = environ.get('DATABASE_POOL', '').strip()
+    if pool and pool.lower() not in FALSE:
+        config['OPTIONS']['pool'] = _pool_options(pool)
+        # Django refuses persistent connections on top of a pool; the pool
+        # keeps connections open instead.
+        config['CONN_MAX_AGE'] = 0
+    return config
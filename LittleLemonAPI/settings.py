@@ -10,9 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 import sys
 from pathlib import Path
 import logging
+from .database import database_config
 
 logger = logging.getLogger('django.request')
 
@@ -55,6 +57,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'LittleLemonAPIDRF.instrumentation.ServerTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'LittleLemonAPI.urls'
@@ -79,14 +82,80 @@ WSGI_APPLICATION = 'LittleLemonAPI.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Configured from DATABASE_* environment variables, see database.py. By
+# default: SQLite with WAL and tuned pragmas, no persistent connections (safe
+# under ASGI; WSGI deployments can set DATABASE_CONN_MAX_AGE).
 
 DATABASES = {
+    'default': database_config(os.environ, BASE_DIR),
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory is fine for a single process; point this at a shared backend
+# (Redis, Memcached) when running several workers.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Seconds a user's group names (their roles, which decide permissions) are
+# cached in the default cache. 0 only memoizes them per request. Only raise it
+# with a cache shared by every worker (not LocMemCache): group changes bump a
+# per-user version there on commit, and a per-process cache would keep a
+# demoted manager's rights on the other workers until the timeout.
+LITTLE_LEMON_ROLE_CACHE_TIMEOUT = 0
+
+# Seconds cached menu responses are kept; the menu version bumps on every
+# MenuItem save/delete, so this only bounds memory, not staleness.
+LITTLE_LEMON_MENU_CACHE_TIMEOUT = 600
+
+# Seconds a cart line holds its stock. Run the release_expired_reservations
+# management command periodically to give back stock from abandoned carts.
+LITTLE_LEMON_RESERVATION_TTL = 30 * 60
+
+# Most orders a delivery crew member can take from the dispatch queue with
+# one POST /api/dispatch/claim/.
+LITTLE_LEMON_DISPATCH_MAX_CLAIM = 10
+
+# Where working carts live. DatabaseCartStore writes every change to the Cart
+# table and reserves its stock. CacheCartStore keeps carts in the default
+# cache (use one shared by all workers, e.g. Redis or Memcached) and writes
+# them to the table only at checkout and when the flush_carts management
+# command runs; its lines hold no stock until checkout, so a lost cache loses
+# at most the changes since the last flush. Untouched cached carts expire
+# after CART_CACHE_TIMEOUT seconds.
+LITTLE_LEMON_CART_STORE = 'LittleLemonAPIDRF.cart.DatabaseCartStore'
+LITTLE_LEMON_CART_CACHE_TIMEOUT = 24 * 60 * 60
+
+# Order status push (GET /api/orders/events/, ASGI only). The default broker
+# only reaches subscribers in the same process; with several workers point
+# this at a broker shared between them. Idle streams get a keep-alive comment
+# every HEARTBEAT seconds.
+LITTLE_LEMON_EVENT_BROKER = 'LittleLemonAPIDRF.events.InProcessBroker'
+LITTLE_LEMON_EVENTS_HEARTBEAT = 15
+
+# Token -> user cache used by CachedTokenAuthentication. Each worker keeps an
+# LRU of up to SIZE entries for LOCAL_TTL seconds, which is also how long a
+# logged out or deactivated user can still be accepted by another worker.
+# SHARED also stores entries in the default cache for TTL seconds so workers
+# warm each other; those are versioned and dropped as soon as they are revoked.
+LITTLE_LEMON_TOKEN_CACHE_SIZE = 10000
+LITTLE_LEMON_TOKEN_CACHE_LOCAL_TTL = 5
+LITTLE_LEMON_TOKEN_CACHE_TTL = 60
+LITTLE_LEMON_TOKEN_CACHE_SHARED = False
+
+# Request instrumentation: every request gets a DEBUG line on the
+# LittleLemonAPIDRF.timing logger. Requests slower than
+# LITTLE_LEMON_SLOW_REQUEST_MS are logged at WARNING, and a
+# LITTLE_LEMON_SLOW_REQUEST_SAMPLE_RATE fraction of them with their SQL.
+# Staff users get a Server-Timing header; set LITTLE_LEMON_SERVER_TIMING_HEADER
+# to send it to everyone (development only). Defaults are in
+# LittleLemonAPIDRF/instrumentation.py.
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -132,20 +201,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 5,
+    # orjson-backed JSON when it is installed, DRF's stdlib JSON otherwise;
+    # the output is the same either way.
+    'DEFAULT_RENDERER_CLASSES': [
+        'LittleLemonAPIDRF.formats.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'LittleLemonAPIDRF.formats.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Sliding-window counters per role; a view's throttle_scope adds
+    # per-endpoint rates such as 'orders.user': '5/minute'.
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.UserRateThrottle',
-        'rest_framework.throttling.AnonRateThrottle',
+        'LittleLemonAPIDRF.throttling.RoleRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'user': '10/minute',
         'anon': '2/minute',
+        'delivery_crew': '30/minute',
+        'manager': '60/minute',
     },
     'DEFAULT_FILTER_BACKENDS': [
         'rest_framework.filters.OrderingFilter',
         'rest_framework.filters.SearchFilter',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'LittleLemonAPIDRF.authentication.CachedTokenAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',  # Optional: forces auth unless specified otherwise
@@ -172,4 +255,9 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'DEBUG',
     },
+    'loggers': {
+        'LittleLemonAPIDRF.timing': {
+            'level': 'INFO',
+        },
+    },
 }
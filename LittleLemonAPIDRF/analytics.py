@@ -0,0 +1,147 @@
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import Order, OrderItem, DailySales, DailyItemSales, DailyCrewDeliveries
+
+# The analytics-relevant state of one order.
+OrderSnapshot = namedtuple('OrderSnapshot', 'day delivery_crew_id status total')
+
+
+def snapshot(order):
+    return OrderSnapshot(timezone.localdate(order.date), order.delivery_crew_id, bool(order.status), order.total)
+
+
+def _increment(model, keys, rows):
+    """Add ``rows`` of ``{column: delta}`` to ``model``, creating missing rows.
+
+    One ``INSERT ... ON CONFLICT DO UPDATE`` for all rows on SQLite and
+    PostgreSQL, so concurrent checkouts never lose an increment.
+    """
+    rows = [row for row in rows if any(row[column] for column in row if column not in keys)]
+    if not rows:
+        return
+    columns = list(rows[0])
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        for row in rows:
+            increments = {column: row[column] for column in columns if column not in keys}
+            lookup = {column: row[column] for column in keys}
+            obj, created = model.objects.select_for_update().get_or_create(**lookup, defaults=increments)
+            if not created:
+                for column, delta in increments.items():
+                    setattr(obj, column, getattr(obj, column) + delta)
+                obj.save(update_fields=list(increments))
+        return
+
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    db_columns = [model._meta.get_field(column).column for column in columns]
+    placeholders = ', '.join(['(%s)' % ', '.join(['%s'] * len(columns))] * len(rows))
+    updates = ', '.join(
+        f'{qn(db_column)} = {table}.{qn(db_column)} + excluded.{qn(db_column)}'
+        for column, db_column in zip(columns, db_columns) if column not in keys
+    )
+    conflict = ', '.join(qn(model._meta.get_field(column).column) for column in keys)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({", ".join(qn(c) for c in db_columns)}) VALUES {placeholders} '
+            f'ON CONFLICT ({conflict}) DO UPDATE SET {updates}',
+            [row[column] for row in rows for column in columns],
+        )
+
+
+def _apply(state, lines, sign):
+    """Add (``sign=1``) or remove (``sign=-1``) one order's contribution."""
+    _increment(DailySales, ['day'], [{
+        'day': state.day, 'orders': sign, 'delivered': sign * state.status, 'revenue': sign * state.total,
+    }])
+    _increment(DailyItemSales, ['day', 'title', 'category'], [
+        {'day': state.day, 'title': title, 'category': category, 'quantity': sign * quantity, 'revenue': sign * price}
+        for title, category, quantity, price in lines
+    ])
+    if state.delivery_crew_id:
+        _increment(DailyCrewDeliveries, ['day', 'delivery_crew'], [{
+            'day': state.day, 'delivery_crew': state.delivery_crew_id,
+            'assigned': sign, 'delivered': sign * state.status,
+        }])
+
+
+def record_order_created(order, lines):
+    """``lines`` are ``(title, category, quantity, price)`` tuples of the new order."""
+    _apply(snapshot(order), lines, 1)
+
+
+def record_order_deleted(order):
+    lines = order.order_items.values_list('title', 'category', 'quantity', 'price')
+    _apply(snapshot(order), list(lines), -1)
+
+
+def record_order_changed(before, after):
+    """Apply the difference between two snapshots of the same order."""
+    if before == after:
+        return
+    _increment(DailySales, ['day'], [{
+        'day': after.day, 'orders': 0,
+        'delivered': after.status - before.status, 'revenue': after.total - before.total,
+    }])
+    if before.delivery_crew_id == after.delivery_crew_id:
+        if after.delivery_crew_id:
+            _increment(DailyCrewDeliveries, ['day', 'delivery_crew'], [{
+                'day': after.day, 'delivery_crew': after.delivery_crew_id,
+                'assigned': 0, 'delivered': after.status - before.status,
+            }])
+        return
+    rows = []
+    if before.delivery_crew_id:
+        rows.append({'day': before.day, 'delivery_crew': before.delivery_crew_id,
+                     'assigned': -1, 'delivered': -before.status})
+    if after.delivery_crew_id:
+        rows.append({'day': after.day, 'delivery_crew': after.delivery_crew_id,
+                     'assigned': 1, 'delivered': after.status})
+    _increment(DailyCrewDeliveries, ['day', 'delivery_crew'], rows)
+
+
+def record_orders_reassigned(befores, delivery_crew_id):
+    """Move the orders of ``befores`` (snapshots) to ``delivery_crew_id`` in one statement."""
+    deltas = defaultdict(lambda: [0, 0])
+    for state in befores:
+        if state.delivery_crew_id == delivery_crew_id:
+            continue
+        for crew_id, sign in ((state.delivery_crew_id, -1), (delivery_crew_id, 1)):
+            if crew_id:
+                delta = deltas[state.day, crew_id]
+                delta[0] += sign
+                delta[1] += sign * state.status
+    _increment(DailyCrewDeliveries, ['day', 'delivery_crew'], [
+        {'day': day, 'delivery_crew': crew_id, 'assigned': assigned, 'delivered': delivered}
+        for (day, crew_id), (assigned, delivered) in deltas.items()
+    ])
+
+
+def rebuild(batch_size=5000):
+    """Recompute every summary table from the orders, e.g. after bulk writes."""
+    day = TruncDate('date')
+    with transaction.atomic():
+        for model in (DailySales, DailyItemSales, DailyCrewDeliveries):
+            model.objects.all().delete()
+        DailySales.objects.bulk_create((
+            DailySales(**row) for row in Order.objects.annotate(day=day).values('day').annotate(
+                orders=Count('id'), delivered=Count('id', filter=Q(status=True)), revenue=Sum('total'),
+            ).order_by().iterator()
+        ), batch_size=batch_size)
+        DailyItemSales.objects.bulk_create((
+            DailyItemSales(**row) for row in OrderItem.objects.annotate(day=TruncDate('order__date')).values(
+                'day', 'title', 'category',
+            ).annotate(
+                quantity=Sum('quantity'), revenue=Sum('price'),
+            ).order_by().iterator()
+        ), batch_size=batch_size)
+        DailyCrewDeliveries.objects.bulk_create((
+            DailyCrewDeliveries(day=row['day'], delivery_crew_id=row['delivery_crew_id'],
+                                assigned=row['assigned'], delivered=row['delivered'])
+            for row in Order.objects.filter(delivery_crew__isnull=False).annotate(day=day).values(
+                'day', 'delivery_crew_id',
+            ).annotate(assigned=Count('id'), delivered=Count('id', filter=Q(status=True))).order_by().iterator()
+        ), batch_size=batch_size)
@@ -0,0 +1,238 @@
+# async_views.py
+import asyncio
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import http_date, quote_etag
+from django.views import View
+from rest_framework import exceptions, status
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from .authentication import CachedTokenAuthentication
+from .conditional import ConditionalGetMixin
+from .events import get_broker, heartbeat_interval, order_event, format_event
+from .instrumentation import timed
+from .menu_cache import _cache_timeout, get_stock_version, menu_cache_key, menu_etag, refresh_stock, stale_stock_ids
+from .models import MenuItem, Order
+from .pagination import AsyncKeysetPagination
+from .roles import MANAGER, DELIVERY_CREW, aget_roles
+from .serializers import MenuItemSerializer, OrderSerializer
+
+
+class AsyncAPIView(View):
+    """Minimal ASGI-native counterpart of DRF's ``APIView`` for read endpoints.
+
+    DRF views are synchronous, so under ASGI each request holds a worker
+    thread for its whole life. Subclasses implement ``async def get()`` and
+    return plain data; authentication, permissions, throttling, errors,
+    pagination and content negotiation follow the sync API. Only the
+    HTML renderers are left out, since the browsable API needs a DRF view.
+    """
+    http_method_names = ['get', 'head', 'options']
+    authentication_class = CachedTokenAuthentication
+    pagination_class = AsyncKeysetPagination
+    renderer_classes = [
+        renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer.media_type != 'text/html'
+    ]
+    content_negotiation_class = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS
+    require_authentication = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        with timed(request, 'view'):
+            request = Request(request, authenticators=[])
+            self.request = request
+            try:
+                self.perform_content_negotiation(request)
+                if request.method.lower() not in self.http_method_names:
+                    raise exceptions.MethodNotAllowed(request.method)
+                await self.perform_authentication(request)
+                await self.check_permissions(request)
+                self.check_throttles(request)
+                response = await getattr(self, request.method.lower())(request, *args, **kwargs)
+            except exceptions.APIException as exc:
+                response = self.handle_exception(exc)
+        return response
+
+    def perform_content_negotiation(self, request):
+        renderers = [renderer() for renderer in self.renderer_classes]
+        try:
+            request.accepted_renderer, request.accepted_media_type = (
+                self.content_negotiation_class().select_renderer(request, renderers)
+            )
+        except exceptions.NotAcceptable:
+            # As in DRF, the 406 itself is rendered with the first renderer.
+            request.accepted_renderer, request.accepted_media_type = renderers[0], renderers[0].media_type
+            raise
+
+    async def perform_authentication(self, request):
+        with timed(request, 'auth'):
+            result = await self.authentication_class().aauthenticate(request)
+        request.user, request.auth = result if result else (AnonymousUser(), None)
+
+    async def check_permissions(self, request):
+        with timed(request, 'perm'):
+            if self.require_authentication and not request.user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+            await aget_roles(request)
+
+    def check_throttles(self, request):
+        # Throttles only touch the cache, never the database.
+        for throttle in [throttle() for throttle in api_settings.DEFAULT_THROTTLE_CLASSES]:
+            if not throttle.allow_request(request, self):
+                raise exceptions.Throttled(throttle.wait())
+
+    def handle_exception(self, exc):
+        headers = {}
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            exc.status_code = status.HTTP_401_UNAUTHORIZED
+            headers['WWW-Authenticate'] = self.authentication_class().authenticate_header(self.request)
+        if getattr(exc, 'wait', None):
+            headers['Retry-After'] = '%d' % exc.wait
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        return self.render(data, exc.status_code, headers)
+
+    def render(self, data, status_code=status.HTTP_200_OK, headers=None):
+        renderer, media_type = self.request.accepted_renderer, self.request.accepted_media_type
+        body = b'' if data is None else renderer.render(data, media_type, {'request': self.request, 'view': self})
+        content_type = renderer.media_type
+        if renderer.charset is not None:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        return HttpResponse(body, status=status_code, content_type=content_type, headers=headers)
+
+    async def options(self, request, *args, **kwargs):
+        return self.render(None, headers={'Allow': ', '.join(m.upper() for m in self.http_method_names)})
+
+    async def paginate(self, queryset, serializer_class):
+        paginator = self.pagination_class()
+        page = await paginator.apaginate_queryset(queryset, self.request, self)
+        data = serializer_class(page, many=True, context={'request': self.request}).data
+        return paginator.get_paginated_data(data)
+
+
+class AsyncMenuItemListView(ConditionalGetMixin, AsyncAPIView):
+    """``GET /api/async/menu-items/``: the menu list served without a thread.
+
+    Shares the menu cache and ETags with ``MenuItemViewSet`` and supports the
+    same ``?ordering=``; ``?search=`` stays on the sync endpoint.
+    """
+    require_authentication = False
+    ordering_fields = ['title', 'price']
+
+    async def get(self, request):
+        etag = quote_etag(menu_etag(request, 'async-list'))
+        if self._not_modified(request, etag, None):
+            return self.render(None, status.HTTP_304_NOT_MODIFIED, {'ETag': etag})
+
+        timeout = _cache_timeout()
+        key = menu_cache_key(request, 'async-list')
+        stock_version = get_stock_version()
+        entry = await cache.aget(key) if timeout else None
+        if entry is not None and entry['stock'] != stock_version:
+            ids = stale_stock_ids(entry)
+            inventory = {pk: stock async for pk, stock in MenuItem.objects.filter(pk__in=ids).values_list('pk', 'inventory')}
+            await cache.aset(key, refresh_stock(entry, inventory, stock_version), timeout)
+        if entry is None:
+            data = await self.paginate(MenuItem.objects.order_by(*self.get_ordering(request)), MenuItemSerializer)
+            entry = {'stock': stock_version, 'data': data}
+            if timeout:
+                await cache.aset(key, entry, timeout)
+        return self.render(entry['data'], headers={'ETag': etag})
+
+    def get_ordering(self, request):
+        param = request.query_params.get(api_settings.ORDERING_PARAM, '')
+        ordering = [
+            field.strip() for field in param.split(',')
+            if field.strip().lstrip('-') in self.ordering_fields
+        ]
+        return ordering + ['id']
+
+
+class AsyncOrderListView(AsyncAPIView):
+    """``GET /api/async/orders/``: newest orders first, scoped by role."""
+
+    async def get(self, request):
+        queryset = self.get_queryset(request, await aget_roles(request)).order_by('-date', '-id')
+        return self.render(await self.paginate(queryset, OrderSerializer))
+
+    def get_queryset(self, request, roles):
+        queryset = Order.objects.prefetch_related('order_items')
+        if MANAGER in roles:
+            return queryset
+        elif DELIVERY_CREW in roles:
+            return queryset.filter(delivery_crew=request.user)
+        return queryset.filter(user=request.user)
+
+
+class AsyncOrderDetailView(ConditionalGetMixin, AsyncAPIView):
+    """``GET /api/async/orders/<pk>/`` with the same validators as ``OrderDetailView``."""
+
+    async def get(self, request, pk):
+        # Validate against updated_at alone; the order and its items are only
+        # loaded when the client's copy is stale.
+        updated_at = await Order.objects.filter(pk=pk).values_list('updated_at', flat=True).afirst()
+        if updated_at is None:
+            raise exceptions.NotFound()
+        etag = quote_etag(f'order-{pk}-{updated_at.timestamp():.6f}')
+        headers = {'ETag': etag, 'Last-Modified': http_date(updated_at.timestamp())}
+        if self._not_modified(request, etag, updated_at):
+            return self.render(None, status.HTTP_304_NOT_MODIFIED, headers)
+        try:
+            order = await Order.objects.prefetch_related('order_items').aget(pk=pk)
+        except Order.DoesNotExist:
+            raise exceptions.NotFound()
+        return self.render(OrderSerializer(order, context={'request': request}).data, headers=headers)
+
+
+class OrderEventsView(AsyncAPIView):
+    """Order changes as Server-Sent Events, instead of polling the order.
+
+    ``GET /api/orders/<pk>/events/`` follows one order;
+    ``GET /api/orders/events/`` follows every order the caller can list
+    (all for managers, assigned ones for crew, own ones for customers).
+    The one-order stream opens with the order's current state, so nothing
+    that changed before the client connected is missed.
+
+    Each open stream is a coroutine waiting on a queue, so idle clients cost
+    no thread and no CPU beyond a heartbeat comment. Requires ASGI.
+    """
+
+    async def get(self, request, pk=None):
+        roles = await aget_roles(request)
+        if pk is None:
+            if MANAGER in roles:
+                channel = 'orders'
+            elif DELIVERY_CREW in roles:
+                channel = f'crew:{request.user.pk}'
+            else:
+                channel = f'user:{request.user.pk}'
+        else:
+            order = await Order.objects.filter(pk=pk).only('user', 'delivery_crew').afirst()
+            if order is None or not (
+                MANAGER in roles or request.user.pk in (order.user_id, order.delivery_crew_id)
+            ):
+                raise exceptions.NotFound()
+            channel = f'order:{pk}'
+
+        response = StreamingHttpResponse(self.stream(channel, pk), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Keep reverse proxies from buffering the stream.
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    async def stream(self, channel, pk=None):
+        heartbeat = heartbeat_interval()
+        async with get_broker().subscribe(channel) as queue:
+            yield f'retry: {heartbeat * 1000}\n\n'
+            if pk is not None:
+                # Read after subscribing, so a change in between is still delivered.
+                order = await Order.objects.filter(pk=pk).only('user', 'delivery_crew', 'status', 'updated_at').afirst()
+                if order is None:
+                    return
+                yield format_event(order_event(order))
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_event(message)
@@ -0,0 +1,238 @@
+import copy
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication, get_authorization_header
+
+
+class AsyncTokenAuthentication(TokenAuthentication):
+    """``TokenAuthentication`` with an async ``aauthenticate()`` for ASGI views.
+
+    Header parsing and error messages are the same as the sync class, so a
+    client sees identical 401 responses on either path.
+    """
+
+    async def aauthenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) == 1:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. No credentials provided.'))
+        elif len(auth) > 2:
+            raise exceptions.AuthenticationFailed(_('Invalid token header. Token string should not contain spaces.'))
+        try:
+            key = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed(
+                _('Invalid token header. Token string should not contain invalid characters.')
+            )
+        return await self.aauthenticate_credentials(key)
+
+    async def aauthenticate_credentials(self, key):
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related('user').aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        return token.user, token
+
+
+class TokenCache:
+    """Bounded LRU of token key -> user with a TTL on every entry.
+
+    Every token has a version in the default Django cache, bumped by
+    ``invalidate_tokens()`` once a logout or user change commits. A lookup
+    takes a ``stamp()`` before reading the database and ``set()`` stores the
+    user under it, so an entry read before an invalidation never outlives it.
+
+    A worker's own LRU answers without asking the shared cache, so another
+    worker's invalidation reaches it only when the entry expires: revoked
+    tokens keep working there for at most ``LITTLE_LEMON_TOKEN_CACHE_LOCAL_TTL``
+    seconds. With ``LITTLE_LEMON_TOKEN_CACHE_SHARED`` the entries are also
+    written to the default cache for ``LITTLE_LEMON_TOKEN_CACHE_TTL`` seconds,
+    so other workers warm up from them; they are only used while their
+    version is current.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        # Bumped by every local invalidation; set() drops entries stamped before it.
+        self._generation = 0
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'LITTLE_LEMON_TOKEN_CACHE_SIZE', 10000)
+
+    @property
+    def ttl(self):
+        return getattr(settings, 'LITTLE_LEMON_TOKEN_CACHE_TTL', 60)
+
+    @property
+    def local_ttl(self):
+        return getattr(settings, 'LITTLE_LEMON_TOKEN_CACHE_LOCAL_TTL', 5)
+
+    @property
+    def shared(self):
+        return getattr(settings, 'LITTLE_LEMON_TOKEN_CACHE_SHARED', False)
+
+    @staticmethod
+    def shared_key(key):
+        # Never put raw credentials into a cache other processes can read.
+        return 'littlelemon:token:' + hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def version_key(cls, key):
+        return cls.shared_key(key) + ':version'
+
+    def _get_local(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def _set_local(self, key, user, generation):
+        if not self.local_ttl or not self.max_size:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.local_ttl, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _current(entry, version):
+        if entry is None or version is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def stamp(self, key):
+        """Capture the token's version; call before reading the database."""
+        version = None
+        if self.shared:
+            version_key = self.version_key(key)
+            version = cache.get(version_key)
+            if version is None:
+                # Seeded from the clock so an evicted version is never reused.
+                cache.add(version_key, time.time_ns(), None)
+                version = cache.get(version_key)
+        return self._generation, version
+
+    async def astamp(self, key):
+        version = None
+        if self.shared:
+            version_key = self.version_key(key)
+            version = await cache.aget(version_key)
+            if version is None:
+                await cache.aadd(version_key, time.time_ns(), None)
+                version = await cache.aget(version_key)
+        return self._generation, version
+
+    def get(self, key):
+        """Return a private copy of the cached user, or ``None``."""
+        user = self._get_local(key)
+        if user is None and self.shared:
+            generation = self._generation
+            found = cache.get_many([self.shared_key(key), self.version_key(key)])
+            user = self._current(found.get(self.shared_key(key)), found.get(self.version_key(key)))
+            if user is not None:
+                self._set_local(key, user, generation)
+        # Callers may set attributes on request.user; keep the cached one clean.
+        return copy.copy(user) if user is not None else None
+
+    async def aget(self, key):
+        user = self._get_local(key)
+        if user is None and self.shared:
+            generation = self._generation
+            found = await cache.aget_many([self.shared_key(key), self.version_key(key)])
+            user = self._current(found.get(self.shared_key(key)), found.get(self.version_key(key)))
+            if user is not None:
+                self._set_local(key, user, generation)
+        return copy.copy(user) if user is not None else None
+
+    def set(self, key, user, stamp):
+        generation, version = stamp
+        self._set_local(key, user, generation)
+        if version is not None and self.ttl:
+            cache.set(self.shared_key(key), (version, user), self.ttl)
+
+    async def aset(self, key, user, stamp):
+        generation, version = stamp
+        self._set_local(key, user, generation)
+        if version is not None and self.ttl:
+            await cache.aset(self.shared_key(key), (version, user), self.ttl)
+
+    def delete(self, *keys):
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._entries.pop(key, None)
+        if not self.shared:
+            return
+        for key in keys:
+            try:
+                cache.incr(self.version_key(key))
+            except ValueError:
+                # No version means no entry was stored under one.
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+token_cache = TokenCache()
+
+
+def invalidate_tokens(*keys):
+    """Drop cached users for ``keys`` once the current transaction commits.
+
+    Invalidating earlier would let a request that still sees the old rows
+    cache them again under the new version.
+    """
+    if keys:
+        transaction.on_commit(lambda: token_cache.delete(*keys))
+
+
+class CachedTokenAuthentication(AsyncTokenAuthentication):
+    """Token authentication that skips the authtoken query on the warm path.
+
+    Only active users are cached; ``signals.py`` drops entries when a token
+    is deleted (djoser logout) or its user is saved, e.g. deactivated. See
+    ``TokenCache`` for how long other workers may still accept them.
+    """
+
+    def authenticate_credentials(self, key):
+        user = token_cache.get(key)
+        if user is None:
+            stamp = token_cache.stamp(key)
+            user, token = super().authenticate_credentials(key)
+            token_cache.set(key, user, stamp)
+            return user, token
+        return user, self.get_model()(key=key, user=user)
+
+    async def aauthenticate_credentials(self, key):
+        user = await token_cache.aget(key)
+        if user is None:
+            stamp = await token_cache.astamp(key)
+            user, token = await super().aauthenticate_credentials(key)
+            await token_cache.aset(key, user, stamp)
+            return user, token
+        return user, self.get_model()(key=key, user=user)
@@ -0,0 +1,529 @@
+"""In-process load and latency benchmarks for the API.
+
+Everything runs against a throwaway copy of the database created through
+Django's test-database machinery, so the harness works offline on SQLite and
+never touches ``db.sqlite3``. ``manage.py benchmark`` is the entry point.
+"""
+import io
+import json
+import logging
+import random
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+from .cart import CacheCartStore
+from .formats import FastJSONParser, FastJSONRenderer
+from .models import MenuItem, Cart, Order, OrderItem
+from .roles import MANAGER, DELIVERY_CREW
+from .search import get_search_backend
+from .serializers import MenuItemSerializer, OrderSerializer
+from . import analytics
+
+WORDS = [
+    'Lemon', 'Greek', 'Salad', 'Bruschetta', 'Pasta', 'Pizza', 'Grilled', 'Fish',
+    'Lamb', 'Souvlaki', 'Feta', 'Olive', 'Tart', 'Cake', 'Chicken', 'Risotto',
+    'Garlic', 'Bread', 'Soup', 'Spinach', 'Pie', 'Baklava', 'Gelato', 'Espresso',
+]
+CATEGORIES = ['Starters', 'Mains', 'Desserts', 'Drinks', 'Sides', 'Specials']
+
+
+@contextmanager
+def benchmark_database():
+    """Create a scratch test database for the duration of the block.
+
+    SQLite gets a real file rather than Django's in-memory test database so
+    that connection handling and journal settings behave as in production.
+    """
+    # Keeping every query in connection.queries would skew the numbers;
+    # teardown_test_environment() puts DEBUG back.
+    setup_test_environment(debug=False)
+    test_settings = connection.settings_dict.setdefault('TEST', {})
+    old_test_name = test_settings.get('NAME')
+    try:
+        with tempfile.TemporaryDirectory(prefix='littlelemon-bench-') as directory:
+            if connection.vendor == 'sqlite':
+                test_settings['NAME'] = str(Path(directory) / 'bench.sqlite3')
+            old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                yield
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+    finally:
+        test_settings['NAME'] = old_test_name
+        teardown_test_environment()
+
+
+@contextmanager
+def benchmark_settings():
+    """Lift throttle limits and silence request logging while scenarios run.
+
+    Throttles stay installed so their bookkeeping is part of the measurement;
+    only the rates are raised so the harness is never rejected with 429.
+    """
+    rates = {scope: '1000000/second' for scope in SimpleRateThrottle.THROTTLE_RATES}
+    loggers = [logging.getLogger(name) for name in ('django.request', 'LittleLemonAPIDRF.timing', 'asyncio')]
+    levels = [logger.level for logger in loggers]
+    for logger in loggers:
+        logger.setLevel(logging.ERROR)
+    try:
+        with mock.patch.object(SimpleRateThrottle, 'THROTTLE_RATES', rates):
+            yield
+    finally:
+        for logger, level in zip(loggers, levels):
+            logger.setLevel(level)
+
+
+class Fixture:
+    """The seeded data that scenarios pick their users and ids from."""
+
+    def __init__(self, manager, crew, customers, tokens, menu_ids, rng):
+        self.manager = manager
+        self.crew = crew
+        self.customers = customers
+        self.tokens = tokens
+        self.menu_ids = menu_ids
+        self.rng = rng
+
+    @property
+    def customer(self):
+        return self.customers[0]
+
+    def user(self, role):
+        return {MANAGER: self.manager, DELIVERY_CREW: self.crew[0], 'customer': self.customer}[role]
+
+    def menu_id(self, i):
+        return self.menu_ids[i % len(self.menu_ids)]
+
+    def fill_cart(self, lines=3, start=0):
+        Cart.objects.filter(user=self.customer).delete()
+        items = MenuItem.objects.in_bulk([self.menu_id(start + n) for n in range(lines)])
+        Cart.objects.bulk_create([
+            Cart(user=self.customer, menuitem=item, quantity=1, unit_price=item.price,
+                 price=item.price, reserved_until=timezone.now() + timedelta(hours=1))
+            for item in items.values()
+        ])
+
+    def customer_order_id(self):
+        return Order.objects.filter(user=self.customer).values_list('id', flat=True).first()
+
+
+@contextmanager
+def _without_auto_now_add(model, field_name):
+    # bulk_create() would stamp every row with the same auto_now_add value;
+    # spreading dates out gives realistic index selectivity.
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def seed(menu_items=2000, orders=100000, customers=500, crew=20, batch_size=5000, random_seed=0, log=None):
+    """Bulk-load a realistic data set and return a ``Fixture``."""
+    rng = random.Random(random_seed)
+    log = log or (lambda message: None)
+
+    manager_group = Group.objects.get_or_create(name=MANAGER)[0]
+    crew_group = Group.objects.get_or_create(name=DELIVERY_CREW)[0]
+
+    log(f'Seeding {customers} customers and {crew} delivery crew')
+    manager = User.objects.create(username='bench-manager', password='!')
+    manager.groups.add(manager_group)
+    User.objects.bulk_create([User(username=f'bench-crew-{n}', password='!') for n in range(max(crew, 2))])
+    crew_users = list(User.objects.filter(username__startswith='bench-crew-').order_by('id'))
+    User.groups.through.objects.bulk_create([
+        User.groups.through(user_id=user.id, group_id=crew_group.id) for user in crew_users
+    ])
+    User.objects.bulk_create([User(username=f'bench-customer-{n}', password='!') for n in range(customers)])
+    customer_users = list(User.objects.filter(username__startswith='bench-customer-').order_by('id'))
+
+    tokens = {}
+    for role, user in ((MANAGER, manager), (DELIVERY_CREW, crew_users[0]), ('customer', customer_users[0])):
+        tokens[role] = Token.objects.create(user=user, key=Token.generate_key()).key
+
+    log(f'Seeding {menu_items} menu items')
+    MenuItem.objects.bulk_create([
+        MenuItem(
+            title=f'{rng.choice(WORDS)} {rng.choice(WORDS)} {n}',
+            price=Decimal(rng.randint(300, 3000)) / 100,
+            inventory=30000,
+            category=rng.choice(CATEGORIES),
+        )
+        for n in range(menu_items)
+    ], batch_size=batch_size)
+    get_search_backend().rebuild()
+    menu = list(MenuItem.objects.values_list('id', 'title', 'category', 'price'))
+
+    log(f'Seeding {orders} orders')
+    start = timezone.now() - timedelta(days=365)
+    step = timedelta(days=365) / max(orders, 1)
+    with _without_auto_now_add(Order, 'date'):
+        for offset in range(0, orders, batch_size):
+            count = min(batch_size, orders - offset)
+            lines = [rng.sample(menu, rng.randint(1, 3)) for _ in range(count)]
+            created = Order.objects.bulk_create([
+                Order(
+                    user=rng.choice(customer_users),
+                    delivery_crew=rng.choice(crew_users) if rng.random() < 0.8 else None,
+                    status=rng.random() < 0.7,
+                    total=sum(price for *_, price in order_lines),
+                    date=start + step * (offset + n),
+                )
+                for n, order_lines in enumerate(lines)
+            ])
+            OrderItem.objects.bulk_create([
+                OrderItem(order_id=order.id, menuitem_id=menuitem_id, title=title, category=category,
+                          quantity=1, unit_price=price, price=price)
+                for order, order_lines in zip(created, lines)
+                for menuitem_id, title, category, price in order_lines
+            ])
+            log(f'  {offset + count}/{orders}')
+
+    # Make sure the sample customer and crew member always have orders of their own.
+    Order.objects.filter(pk__in=Order.objects.order_by('-date').values('pk')[:50]).update(
+        user=customer_users[0], delivery_crew=crew_users[0])
+
+    log('Building analytics summaries')
+    analytics.rebuild(batch_size=batch_size)
+
+    return Fixture(manager, crew_users, customer_users, tokens, [pk for pk, *_ in menu], rng)
+
+
+class Scenario:
+    """One request shape against one route.
+
+    ``path``, ``data`` and ``setup`` may be callables taking
+    ``(fixture, iteration)``; all three are evaluated outside the timed
+    section. ``settings`` are overridden for the whole run.
+    """
+
+    def __init__(self, name, method, path, role=None, data=None, setup=None, expected=(200,), settings=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.role = role
+        self.data = data
+        self.setup = setup
+        self.expected = expected
+        self.settings = settings or {}
+
+    def resolve(self, value, fixture, i):
+        return value(fixture, i) if callable(value) else value
+
+
+def _readd_crew(fixture, i):
+    fixture.crew[1].groups.add(Group.objects.get(name=DELIVERY_CREW))
+
+
+def _add_manager(fixture, i):
+    fixture.crew[1].groups.add(Group.objects.get(name=MANAGER))
+
+
+def _new_menu_item(fixture, i):
+    return MenuItem.objects.create(title=f'Bench delete {i}', price=Decimal('5.00'), inventory=1)
+
+
+def _new_order(fixture, i):
+    return Order.objects.create(user=fixture.customer, total=10)
+
+
+def _queue_orders(fixture, count):
+    return Order.objects.bulk_create([Order(user=fixture.customer, total=10) for _ in range(count)])
+
+
+CACHE_CART_STORE = {'LITTLE_LEMON_CART_STORE': 'LittleLemonAPIDRF.cart.CacheCartStore'}
+
+
+SCENARIOS = [
+    Scenario('menu-items list', 'get', '/api/menu-items/', 'customer'),
+    Scenario('menu-items list ordering=price', 'get', '/api/menu-items/?ordering=price&page_size=50', 'customer'),
+    Scenario('menu-items list search', 'get', lambda f, i: f'/api/menu-items/?search={WORDS[i % len(WORDS)][:4]}', 'customer'),
+    Scenario('menu-items detail', 'get', lambda f, i: f'/api/menu-items/{f.menu_id(i)}/', 'customer'),
+    Scenario('menu-items create', 'post', '/api/menu-items/', MANAGER,
+             data=lambda f, i: {'title': f'Bench special {i}', 'price': '9.99', 'inventory': 10}, expected=(201,)),
+    Scenario('menu-items update', 'patch', lambda f, i: f'/api/menu-items/{f.menu_id(i)}/', MANAGER,
+             data={'price': '11.50'}),
+    Scenario('menu-items delete', 'delete', lambda f, i: f'/api/menu-items/{_new_menu_item(f, i).id}/', MANAGER,
+             expected=(204,)),
+    Scenario('menu-items import (100 rows)', 'post', '/api/menu-items/import/', MANAGER,
+             data=lambda f, i: [{'title': f'Bench import {n}', 'price': '4.50', 'inventory': i % 50} for n in range(100)]),
+    Scenario('menu-items export (csv)', 'get', '/api/menu-items/export/', MANAGER),
+    Scenario('cart list', 'get', '/api/cart/menu-items/', 'customer', setup=lambda f, i: f.fill_cart()),
+    Scenario('cart add', 'post', '/api/cart/menu-items/', 'customer',
+             data=lambda f, i: {'menuitem': f.menu_id(i), 'quantity': 1},
+             setup=lambda f, i: Cart.objects.filter(user=f.customer).delete(), expected=(201,)),
+    Scenario('cart batch (10 lines)', 'post', '/api/cart/menu-items/batch/', 'customer',
+             data=lambda f, i: [{'menuitem': f.menu_id(i + n), 'quantity': 1 + i % 3} for n in range(10)]),
+    Scenario('cart add (cache store)', 'post', '/api/cart/menu-items/', 'customer',
+             data=lambda f, i: {'menuitem': f.menu_id(i), 'quantity': 1},
+             setup=lambda f, i: CacheCartStore().checked_out(f.customer), expected=(201,), settings=CACHE_CART_STORE),
+    Scenario('cart batch (10 lines, cache store)', 'post', '/api/cart/menu-items/batch/', 'customer',
+             data=lambda f, i: [{'menuitem': f.menu_id(i + n), 'quantity': 1 + i % 3} for n in range(10)],
+             settings=CACHE_CART_STORE),
+    Scenario('cart clear', 'delete', '/api/cart/menu-items/', 'customer',
+             setup=lambda f, i: f.fill_cart(start=i), expected=(204,)),
+    Scenario('cart clear (delete/)', 'delete', '/api/cart/menu-items/delete/', 'customer',
+             setup=lambda f, i: f.fill_cart(start=i), expected=(204,)),
+    Scenario('orders list (manager)', 'get', '/api/orders/', MANAGER),
+    Scenario('orders list (delivery crew)', 'get', '/api/orders/', DELIVERY_CREW),
+    Scenario('orders list (customer)', 'get', '/api/orders/', 'customer'),
+    Scenario('orders list 100 (manager)', 'get', '/api/orders/?page_size=100', MANAGER),
+    Scenario('orders list 100 fields=id,status', 'get', '/api/orders/?page_size=100&fields=id,status', MANAGER),
+    Scenario('orders list 100 cursor (manager)', 'get', '/api/orders/?cursor=&page_size=100', MANAGER),
+    Scenario('orders checkout', 'post', '/api/orders/', 'customer',
+             setup=lambda f, i: f.fill_cart(start=i), expected=(201,)),
+    Scenario('order detail', 'get', lambda f, i: f'/api/orders/{f.customer_order_id()}/', 'customer'),
+    Scenario('order status update (crew)', 'patch', lambda f, i: f'/api/orders/{f.customer_order_id()}/',
+             DELIVERY_CREW, data=lambda f, i: {'status': i % 2}),
+    Scenario('order delete (manager)', 'delete', lambda f, i: f'/api/orders/{_new_order(f, i).id}/', MANAGER,
+             expected=(204,)),
+    Scenario('dispatch queue', 'get', '/api/dispatch/queue/', DELIVERY_CREW),
+    Scenario('dispatch claim (5)', 'post', '/api/dispatch/claim/', DELIVERY_CREW,
+             data={'count': 5}, setup=lambda f, i: _queue_orders(f, 5)),
+    Scenario('dispatch bulk assign (20)', 'post', '/api/dispatch/assign/', MANAGER,
+             data=lambda f, i: {'orders': [o.id for o in _queue_orders(f, 20)], 'delivery_crew': f.crew[0].id}),
+    Scenario('async menu-items list', 'get', '/api/async/menu-items/', 'customer'),
+    Scenario('async orders list (customer)', 'get', '/api/async/orders/', 'customer'),
+    Scenario('async order detail', 'get', lambda f, i: f'/api/async/orders/{f.customer_order_id()}/', 'customer'),
+    Scenario('analytics daily sales', 'get', '/api/analytics/daily-sales/?from=2000-01-01', MANAGER),
+    Scenario('analytics top items', 'get', '/api/analytics/top-items/?from=2000-01-01', MANAGER),
+    Scenario('analytics crew deliveries', 'get', '/api/analytics/crew-deliveries/?from=2000-01-01', MANAGER),
+    Scenario('manager users list', 'get', '/api/groups/manager/users/', MANAGER),
+    Scenario('manager user remove', 'delete', lambda f, i: f'/api/groups/manager/users/{f.crew[1].id}/',
+             MANAGER, setup=_add_manager),
+    Scenario('delivery crew users list', 'get', '/api/groups/delivery-crew/users/', MANAGER),
+    Scenario('delivery crew user remove', 'delete', lambda f, i: f'/api/groups/delivery-crew/users/{f.crew[1].id}/',
+             MANAGER, setup=_readd_crew),
+    Scenario('throttle state', 'get', '/api/throttles/', MANAGER),
+]
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(scenario, fixture, requests=200, warmup=10, recycle_connections=False):
+    """Time ``requests`` calls of ``scenario`` after ``warmup`` untimed ones.
+
+    The test client never closes the database connection, so by default every
+    request reuses one. ``recycle_connections`` applies ``CONN_MAX_AGE`` at
+    the end of each request like Django's request handler does, which makes
+    the cost of reconnecting part of the next request.
+    """
+    client = APIClient()
+    if scenario.role:
+        client.credentials(HTTP_AUTHORIZATION=f'Token {fixture.tokens[scenario.role]}')
+    call = getattr(client, scenario.method)
+
+    timings, queries, failures = [], 0, 0
+    with override_settings(**scenario.settings):
+        for i in range(warmup + requests):
+            if scenario.setup:
+                scenario.setup(fixture, i)
+            path = scenario.resolve(scenario.path, fixture, i)
+            data = scenario.resolve(scenario.data, fixture, i)
+            counter = QueryCounter()
+            with connection.execute_wrapper(counter):
+                started = time.perf_counter()
+                response = call(path, data, format='json') if data is not None else call(path)
+                if response.streaming:
+                    # Streamed bodies are produced, and queried for, as they are read.
+                    b''.join(response.streaming_content)
+                elapsed = time.perf_counter() - started
+            if recycle_connections:
+                connection.close_if_unusable_or_obsolete()
+            if i < warmup:
+                continue
+            timings.append(elapsed)
+            queries += counter.count
+            if response.status_code not in scenario.expected:
+                failures += 1
+
+    timings.sort()
+    total = sum(timings)
+    return {
+        'requests': requests,
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+        'rps': round(requests / total, 1) if total else 0.0,
+        'queries_per_request': round(queries / requests, 2) if requests else 0.0,
+        'failures': failures,
+    }
+
+
+def run_benchmarks(fixture, scenarios=SCENARIOS, requests=200, warmup=10, log=None):
+    results = {}
+    with benchmark_settings():
+        for scenario in scenarios:
+            cache.clear()
+            results[scenario.name] = run_scenario(scenario, fixture, requests, warmup)
+            if log:
+                log(scenario.name, results[scenario.name])
+    return results
+
+
+@contextmanager
+def conn_max_age(max_age):
+    """Reconnect with ``CONN_MAX_AGE = max_age`` for the duration of the block."""
+    previous = connection.settings_dict['CONN_MAX_AGE']
+    connection.close()
+    connection.settings_dict['CONN_MAX_AGE'] = max_age
+    try:
+        yield
+    finally:
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = previous
+
+
+def run_connection_benchmark(fixture, scenarios, requests=200, warmup=10, max_ages=(0, 60)):
+    """Run ``scenarios`` once per ``CONN_MAX_AGE`` to show what persistent connections save.
+
+    Returns ``{scenario name: {max_age: result}}``. With 0 every request pays
+    for a new connection (and the SQLite pragmas); with a positive age the
+    connection is kept, as in production.
+    """
+    results = {scenario.name: {} for scenario in scenarios}
+    with benchmark_settings():
+        # Back to back per scenario, so both settings see the same data and caches.
+        for scenario in scenarios:
+            for max_age in max_ages:
+                with conn_max_age(max_age):
+                    cache.clear()
+                    results[scenario.name][max_age] = run_scenario(
+                        scenario, fixture, requests, warmup, recycle_connections=True)
+    return results
+
+
+def run_export_benchmark(fixture, formats=('csv', 'ndjson')):
+    """Stream the whole order export once per format and measure throughput.
+
+    Throughput, not latency, is what matters for an export, so this runs
+    outside the scenario table; seed with ``orders=1000000`` for a realistic
+    end-of-day pull.
+    """
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {fixture.tokens[MANAGER]}')
+    results = {}
+    with benchmark_settings():
+        for export_format in formats:
+            started = time.perf_counter()
+            response = client.get(f'/api/orders/export/?format={export_format}')
+            lines = size = 0
+            for chunk in response.streaming_content:
+                lines += 1
+                size += len(chunk)
+            elapsed = time.perf_counter() - started
+            rows = lines - 1 if export_format == 'csv' else lines
+            results[f'orders export ({export_format})'] = {
+                'rows': rows,
+                'seconds': round(elapsed, 3),
+                'rows_per_s': round(rows / elapsed, 1) if elapsed else 0.0,
+                'mb_per_s': round(size / elapsed / 1e6, 2) if elapsed else 0.0,
+                'status': response.status_code,
+            }
+    return results
+
+
+def json_payloads(page_size=100):
+    """Realistic bodies to encode: the menu and order pages the API serves,
+    and raw order rows still holding ``Decimal`` and aware ``datetime``."""
+    orders = Order.objects.prefetch_related('order_items').order_by('-date', '-id')[:page_size]
+    return {
+        'menu page': {'next': None, 'previous': None, 'results': MenuItemSerializer(
+            MenuItem.objects.order_by('id')[:page_size], many=True).data},
+        'orders page': {'next': None, 'previous': None, 'results': OrderSerializer(orders, many=True).data},
+        'order rows': list(Order.objects.order_by('-date', '-id').values(
+            'id', 'user_id', 'delivery_crew_id', 'status', 'total', 'date', 'updated_at')[:page_size]),
+    }
+
+
+def _time_per_call(function, iterations):
+    started = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def run_json_benchmark(payloads, iterations=200):
+    """Time DRF's ``JSONRenderer``/``JSONParser`` against the orjson-backed ones.
+
+    Returns ``{payload name: {...}}`` with the encoded size, microseconds per
+    render and per parse for each pair, and whether both render the same bytes.
+    """
+    results = {}
+    for name, data in payloads.items():
+        default = JSONRenderer().render(data)
+        fast = FastJSONRenderer().render(data)
+        results[name] = {
+            'bytes': len(default),
+            'identical': default == fast,
+            'render_default_us': round(_time_per_call(lambda: JSONRenderer().render(data), iterations), 1),
+            'render_fast_us': round(_time_per_call(lambda: FastJSONRenderer().render(data), iterations), 1),
+            'parse_default_us': round(_time_per_call(
+                lambda: JSONParser().parse(io.BytesIO(default)), iterations), 1),
+            'parse_fast_us': round(_time_per_call(
+                lambda: FastJSONParser().parse(io.BytesIO(default)), iterations), 1),
+        }
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=0.5):
+    """Return a list of human-readable regressions against ``baseline``.
+
+    Latency may drift by ``tolerance`` (a fraction of the baseline p95) before
+    it counts, since it depends on the machine; query counts must not grow
+    at all.
+    """
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if current['failures']:
+            regressions.append(f'{name}: {current["failures"]} unexpected responses')
+        if current['p95_ms'] > reference['p95_ms'] * (1 + tolerance):
+            regressions.append(f'{name}: p95 {current["p95_ms"]}ms > baseline {reference["p95_ms"]}ms')
+        if current['queries_per_request'] > reference['queries_per_request']:
+            regressions.append(
+                f'{name}: {current["queries_per_request"]} queries/request > '
+                f'baseline {reference["queries_per_request"]}'
+            )
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as baseline_file:
+        return json.load(baseline_file)['results']
+
+
+def save_results(path, results, meta):
+    with open(path, 'w') as output:
+        json.dump({'meta': meta, 'results': results}, output, indent=2, sort_keys=True)
@@ -0,0 +1,239 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils.module_loading import import_string
+from .checkout import clear_cart
+from .inventory import InsufficientInventory, reserve_many, release_many, reservation_deadline, reserved_lines
+from .models import MenuItem, Cart
+
+DEFAULT_CART_STORE = 'LittleLemonAPIDRF.cart.DatabaseCartStore'
+
+
+# The price of the cart line's menu item, for UPDATEs over cart rows.
+MENU_PRICE = Subquery(MenuItem.objects.filter(pk=OuterRef('menuitem_id')).values('price')[:1])
+
+
+def upsert_cart_lines(user, lines, increment=False):
+    """Write ``{menuitem_id: quantity}`` lines into ``user``'s cart.
+
+    Quantities replace those of existing lines, or are added to them with
+    ``increment``; a line that ends up at 0 is removed. All lines are
+    written by one ``INSERT ... ON CONFLICT DO UPDATE`` and priced from
+    ``MenuItem.price`` by one UPDATE, whatever the number of lines. Stock is
+    only reserved or released for the difference to what each line already
+    holds (raises ``InsufficientInventory``, leaving the cart unchanged).
+    """
+    with transaction.atomic():
+        existing = {
+            line.menuitem_id: line for line in
+            Cart.objects.select_for_update().filter(user=user, menuitem_id__in=lines.keys())
+            .only('menuitem_id', 'quantity', 'reserved_until')
+        }
+        quantities, to_reserve, to_release = {}, {}, {}
+        for menuitem_id, quantity in lines.items():
+            line = existing.get(menuitem_id)
+            if increment and line is not None:
+                quantity += line.quantity
+            # Lines whose reservation expired hold no stock any more.
+            held = line.quantity if line is not None and line.reserved_until is not None else 0
+            if quantity > held:
+                to_reserve[menuitem_id] = quantity - held
+            elif quantity < held:
+                to_release[menuitem_id] = held - quantity
+            quantities[menuitem_id] = quantity
+
+        reserve_many(to_reserve)
+        release_many(to_release)
+        removed = [menuitem_id for menuitem_id, quantity in quantities.items() if quantity <= 0]
+        if removed:
+            Cart.objects.filter(user=user, menuitem_id__in=removed).delete()
+        kept = [menuitem_id for menuitem_id, quantity in quantities.items() if quantity > 0]
+        deadline = reservation_deadline()
+        Cart.objects.bulk_create([
+            # Priced below, from the menu as it is inside this transaction.
+            Cart(user=user, menuitem_id=menuitem_id, quantity=quantities[menuitem_id],
+                 unit_price=0, price=0, reserved_until=deadline)
+            for menuitem_id in kept
+        ], update_conflicts=True, unique_fields=['user', 'menuitem'], update_fields=['quantity', 'reserved_until'])
+        Cart.objects.filter(user=user, menuitem_id__in=kept).update(
+            unit_price=MENU_PRICE, price=F('quantity') * MENU_PRICE)
+
+
+class DatabaseCartStore:
+    """Carts live in the ``Cart`` table and every change reserves stock."""
+
+    def lines(self, user):
+        return Cart.objects.filter(user=user).order_by('id')
+
+    def line(self, user, menuitem_id):
+        return Cart.objects.get(user=user, menuitem_id=menuitem_id)
+
+    def upsert(self, user, lines, increment=False):
+        upsert_cart_lines(user, lines, increment)
+
+    def clear(self, user):
+        clear_cart(user)
+
+    def persist(self, user):
+        # Already in the table.
+        pass
+
+    def checked_out(self, user):
+        pass
+
+    def flush(self, batch_size=500):
+        return 0
+
+
+class CacheCartStore:
+    """Working carts in the default cache, written to ``Cart`` only at
+    checkout and by the ``flush_carts`` write-behind command.
+
+    Each cart is one cache entry ``{menuitem_id: (quantity, unit_price)}``,
+    so adding to or reading a cart costs a cache round trip and one menu
+    read, with no writes to the database.
+
+    Crash safety:
+
+    * Cached lines hold no stock. Stock is only checked when a line is
+      written, and taken at checkout, which fails with 409 if it is gone.
+      Losing the cache therefore never loses or leaks inventory.
+    * If the cache loses a cart (restart, eviction, ``TIMEOUT``), the cart
+      falls back to its last flushed state in ``Cart``. Changes made since
+      the last ``flush_carts`` run are lost, so run it as often as you can
+      afford to lose.
+    * Checkout always persists the cached cart first, so an order is made
+      from exactly what the customer saw.
+    * Two concurrent writes to the same cart: the last one wins.
+    """
+    key_prefix = 'littlelemon:cart'
+
+    def timeout(self):
+        # Seconds an untouched cart stays in the cache.
+        return getattr(settings, 'LITTLE_LEMON_CART_CACHE_TIMEOUT', 24 * 60 * 60)
+
+    def key(self, user_id):
+        return f'{self.key_prefix}:{user_id}'
+
+    def _entry(self, user):
+        entry = cache.get(self.key(user.pk))
+        if entry is None:
+            entry = {
+                line.menuitem_id: (line.quantity, line.unit_price)
+                for line in Cart.objects.filter(user=user).order_by('id').only('menuitem_id', 'quantity', 'unit_price')
+            }
+            cache.set(self.key(user.pk), entry, self.timeout())
+        return entry
+
+    def _line(self, user, menuitem_id, quantity, unit_price):
+        return Cart(user=user, menuitem_id=menuitem_id, quantity=quantity,
+                    unit_price=unit_price, price=unit_price * quantity)
+
+    def lines(self, user):
+        return [self._line(user, pk, quantity, price) for pk, (quantity, price) in self._entry(user).items()]
+
+    def line(self, user, menuitem_id):
+        quantity, unit_price = self._entry(user)[menuitem_id]
+        return self._line(user, menuitem_id, quantity, unit_price)
+
+    def upsert(self, user, lines, increment=False):
+        entry = dict(self._entry(user))
+        menu = {pk: (price, inventory) for pk, price, inventory in
+                MenuItem.objects.filter(pk__in=lines.keys()).values_list('pk', 'price', 'inventory')}
+        for menuitem_id, quantity in lines.items():
+            if increment and menuitem_id in entry:
+                quantity += entry[menuitem_id][0]
+            if quantity <= 0:
+                entry.pop(menuitem_id, None)
+                continue
+            price, inventory = menu[menuitem_id]
+            # Advisory only: stock is taken at checkout.
+            if quantity > inventory:
+                raise InsufficientInventory
+            entry[menuitem_id] = (quantity, price)
+        cache.set(self.key(user.pk), entry, self.timeout())
+        self._mark_dirty(user.pk)
+
+    def clear(self, user):
+        clear_cart(user)
+        cache.set(self.key(user.pk), {}, self.timeout())
+
+    def persist(self, user):
+        self.persist_many([user.pk])
+
+    def checked_out(self, user):
+        cache.set(self.key(user.pk), {}, self.timeout())
+
+    def persist_many(self, user_ids):
+        """Replace the ``Cart`` rows of ``user_ids`` with their cached carts.
+
+        Users without a cache entry keep their rows. Stock still held by rows
+        written by ``DatabaseCartStore`` is given back, since cached lines
+        hold none. Returns the number of carts written.
+        """
+        keys = {self.key(user_id): user_id for user_id in user_ids}
+        entries = {keys[key]: entry for key, entry in cache.get_many(keys).items()}
+        if not entries:
+            return 0
+        with transaction.atomic():
+            existing = list(
+                Cart.objects.select_for_update().filter(user_id__in=entries)
+                .only('pk', 'menuitem_id', 'quantity', 'reserved_until')
+            )
+            release_many(reserved_lines(existing))
+            Cart.objects.filter(pk__in=[line.pk for line in existing]).delete()
+            # Skip items deleted from the menu since they were added.
+            menu = set(MenuItem.objects.filter(
+                pk__in={pk for entry in entries.values() for pk in entry}).values_list('pk', flat=True))
+            Cart.objects.bulk_create([
+                Cart(user_id=user_id, menuitem_id=pk, quantity=quantity,
+                     unit_price=unit_price, price=unit_price * quantity)
+                for user_id, entry in entries.items()
+                for pk, (quantity, unit_price) in entry.items() if pk in menu
+            ], batch_size=1000)
+        return len(entries)
+
+    # Write-behind: every change appends the user id to a log of numbered
+    # cache keys. incr() keeps the log consistent across workers without a
+    # lock, and flush() persists everything logged since the last flush.
+    # Seconds a crashed flush keeps others out.
+    flush_lock_timeout = 5 * 60
+
+    def _mark_dirty(self, user_id):
+        sequence = f'{self.key_prefix}:dirty'
+        try:
+            position = cache.incr(sequence)
+        except ValueError:
+            # A new or evicted log restarts at 1, and so must the flushed mark.
+            if cache.add(sequence, 0, None):
+                cache.delete(f'{sequence}:flushed')
+            position = cache.incr(sequence)
+        cache.set(f'{sequence}:{position}', user_id, self.timeout())
+
+    def flush(self, batch_size=500):
+        """Persist every cart changed since the last flush; return how many,
+        or ``None`` if another flush is already running."""
+        sequence = f'{self.key_prefix}:dirty'
+        lock = f'{sequence}:lock'
+        if not cache.add(lock, 1, self.flush_lock_timeout):
+            return None
+        try:
+            end = cache.get(sequence, 0)
+            start = cache.get(f'{sequence}:flushed', 0)
+            if start > end:
+                # The log was evicted and restarted below the mark.
+                start = 0
+            written = 0
+            for offset in range(start + 1, end + 1, batch_size):
+                keys = [f'{sequence}:{position}' for position in range(offset, min(offset + batch_size, end + 1))]
+                written += self.persist_many(set(cache.get_many(keys).values()))
+                cache.delete_many(keys)
+            cache.set(f'{sequence}:flushed', end, None)
+            return written
+        finally:
+            cache.delete(lock)
+
+
+def get_cart_store():
+    return import_string(getattr(settings, 'LITTLE_LEMON_CART_STORE', DEFAULT_CART_STORE))()
@@ -0,0 +1,54 @@
+from django.db import transaction
+from .analytics import record_order_created
+from .inventory import reserve_many, release_many, reserved_lines
+from .models import Cart, Order, OrderItem
+
+
+class EmptyCartError(Exception):
+    pass
+
+
+def place_order(user):
+    """Turn ``user``'s cart into an order in a single transaction.
+
+    The cart rows are locked and read once, every order line is written with a
+    single ``bulk_create`` and the cart is cleared with a single DELETE, so the
+    number of queries does not grow with the size of the cart.
+    """
+    with transaction.atomic():
+        # The menu items are joined in for their title and category, but
+        # only the cart rows are locked.
+        cart_items = list(Cart.objects.select_for_update(of=('self',)).select_related('menuitem').filter(user=user))
+        if not cart_items:
+            raise EmptyCartError
+
+        # Lines whose reservation expired gave their stock back; take it
+        # again in one statement (raises InsufficientInventory if gone).
+        reserve_many({item.menuitem_id: item.quantity for item in cart_items if item.reserved_until is None})
+
+        order = Order.objects.create(user=user, total=sum(item.price for item in cart_items))
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                menuitem_id=item.menuitem_id,
+                title=item.menuitem.title,
+                category=item.menuitem.category,
+                quantity=item.quantity,
+                unit_price=item.unit_price,
+                price=item.price,
+            )
+            for item in cart_items
+        ])
+        record_order_created(order, [
+            (item.menuitem.title, item.menuitem.category, item.quantity, item.price) for item in cart_items
+        ])
+        Cart.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
+    return order
+
+
+def clear_cart(user):
+    """Empty ``user``'s cart and give back the stock its lines still hold."""
+    with transaction.atomic():
+        cart_items = list(Cart.objects.select_for_update().filter(user=user))
+        release_many(reserved_lines(cart_items))
+        Cart.objects.filter(pk__in=[item.pk for item in cart_items]).delete()
@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .analytics import snapshot, record_orders_reassigned
+from .events import publish_order_change
+from .models import Order
+
+# Everything analytics and the event feeds need to move an order between crew members.
+SNAPSHOT_FIELDS = ('id', 'user', 'date', 'delivery_crew', 'status', 'total', 'updated_at')
+
+# Rounds a compare-and-set claim retries after losing rows to other claimers.
+CLAIM_ROUNDS = 3
+
+
+def max_claim():
+    # Most orders a crew member can take in one claim.
+    return getattr(settings, 'LITTLE_LEMON_DISPATCH_MAX_CLAIM', 10)
+
+
+def queue():
+    """Unassigned open orders, oldest first (served by ``order_dispatch_queue_idx``)."""
+    return Order.objects.filter(delivery_crew__isnull=True, status=False).order_by('date', 'id')
+
+
+def claim_orders(crew, count=1):
+    """Assign up to ``count`` of the oldest queued orders to ``crew``; return their ids.
+
+    Where the database has ``SELECT ... FOR UPDATE SKIP LOCKED`` concurrent
+    claimers lock disjoint rows and never wait on each other. Elsewhere
+    (SQLite) the UPDATE itself re-checks that each row is still unassigned,
+    and rows another claimer got first are replaced in the next round.
+    """
+    if connection.features.has_select_for_update_skip_locked:
+        return _claim_skip_locked(crew, count)
+    return _claim_compare_and_set(crew, count)
+
+
+def _moved(orders, crew_id, now):
+    """Account for ``orders`` having just been given to ``crew_id``."""
+    record_orders_reassigned([snapshot(order) for order in orders], crew_id)
+    for order in orders:
+        previous_crew_id, order.delivery_crew_id, order.updated_at = order.delivery_crew_id, crew_id, now
+        publish_order_change(order, previous_crew_id)
+
+
+def _claim_skip_locked(crew, count):
+    with transaction.atomic():
+        orders = list(queue().select_for_update(skip_locked=True).only(*SNAPSHOT_FIELDS)[:count])
+        if orders:
+            now = timezone.now()
+            Order.objects.filter(pk__in=[order.pk for order in orders]).update(delivery_crew=crew, updated_at=now)
+            _moved(orders, crew.pk, now)
+    return [order.pk for order in orders]
+
+
+def _claim_compare_and_set(crew, count):
+    claimed = []
+    for _ in range(CLAIM_ROUNDS):
+        candidates = list(queue().only(*SNAPSHOT_FIELDS)[:count - len(claimed)])
+        if not candidates:
+            break
+        ids = [order.pk for order in candidates]
+        # The timestamp tells the rows this UPDATE won apart from rows that
+        # were assigned to the same crew member by someone else meanwhile.
+        now = timezone.now()
+        with transaction.atomic():
+            queue().filter(pk__in=ids).update(delivery_crew=crew, updated_at=now)
+            won = set(Order.objects.filter(pk__in=ids, delivery_crew=crew, updated_at=now).values_list('pk', flat=True))
+            _moved([order for order in candidates if order.pk in won], crew.pk, now)
+        claimed += [pk for pk in ids if pk in won]
+        if len(claimed) >= count:
+            break
+    return claimed
+
+
+def assign_orders(order_ids, crew):
+    """Assign every order in ``order_ids`` to ``crew`` (``None`` requeues them).
+
+    One UPDATE for the whole batch. Rows are locked in primary-key order so
+    managers assigning overlapping batches cannot deadlock. Returns the ids
+    that exist.
+    """
+    crew_id = crew.pk if crew else None
+    with transaction.atomic():
+        orders = list(
+            Order.objects.select_for_update().filter(pk__in=order_ids).order_by('pk').only(*SNAPSHOT_FIELDS)
+        )
+        if orders:
+            now = timezone.now()
+            Order.objects.filter(pk__in=[order.pk for order in orders]).update(delivery_crew=crew_id, updated_at=now)
+            _moved(orders, crew_id, now)
+    return [order.pk for order in orders]
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+from contextlib import asynccontextmanager
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = 'LittleLemonAPIDRF.events.InProcessBroker'
+
+
+def heartbeat_interval():
+    # Seconds between keep-alive comments on an idle event stream, so proxies
+    # do not time the connection out.
+    return getattr(settings, 'LITTLE_LEMON_EVENTS_HEARTBEAT', 15)
+
+
+def _offer(queue, message):
+    # Runs on the subscriber's loop. A subscriber that fell behind loses its
+    # oldest message rather than blocking the publisher.
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+class InProcessBroker:
+    """Fan messages out to the subscribers of one worker process.
+
+    A broker has two methods: ``publish(channel, message)``, callable from
+    any thread, and ``subscribe(channel)``, an async context manager yielding
+    an ``asyncio.Queue`` of that channel's messages. A broker shared between
+    processes (e.g. Redis pub/sub) implements the same two methods and is
+    selected with ``LITTLE_LEMON_EVENT_BROKER``.
+
+    Sync views publish from a worker thread, so each message is handed to the
+    subscriber's own event loop with ``call_soon_threadsafe``. An idle
+    subscriber is just a queue nobody writes to.
+    """
+    maxsize = 100
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscribers = {}
+
+    def publish(self, channel, message):
+        with self.lock:
+            subscribers = list(self.subscribers.get(channel, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, message)
+            except RuntimeError:
+                # The subscriber's loop has closed; it unsubscribes on its way out.
+                pass
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(self.maxsize))
+        with self.lock:
+            self.subscribers.setdefault(channel, set()).add(subscriber)
+        try:
+            yield subscriber[1]
+        finally:
+            with self.lock:
+                subscribers = self.subscribers.get(channel, set())
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    self.subscribers.pop(channel, None)
+
+    def subscriber_count(self, channel):
+        with self.lock:
+            return len(self.subscribers.get(channel, ()))
+
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+
+def get_broker():
+    path = getattr(settings, 'LITTLE_LEMON_EVENT_BROKER', DEFAULT_BROKER)
+    with _brokers_lock:
+        if path not in _brokers:
+            _brokers[path] = import_string(path)()
+        return _brokers[path]
+
+
+def order_event(order):
+    return {
+        'id': order.pk,
+        'status': order.status,
+        'delivery_crew': order.delivery_crew_id,
+        'updated_at': order.updated_at,
+    }
+
+
+def order_channels(order, previous_crew_id=None):
+    """Every feed ``order`` shows up in: its own, its customer's, its crew's and the managers'."""
+    channels = ['orders', f'order:{order.pk}', f'user:{order.user_id}']
+    for crew_id in sorted({order.delivery_crew_id, previous_crew_id} - {None}):
+        channels.append(f'crew:{crew_id}')
+    return channels
+
+
+def publish_order_change(order, previous_crew_id=None):
+    """Push ``order``'s status to its subscribers once the current transaction commits.
+
+    ``previous_crew_id`` is the crew member the order was taken from, whose
+    feed also learns that it moved.
+    """
+    message = order_event(order)
+    channels = order_channels(order, previous_crew_id)
+
+    def publish():
+        broker = get_broker()
+        for channel in channels:
+            broker.publish(channel, message)
+
+    transaction.on_commit(publish)
+
+
+def format_event(message, event='order'):
+    data = json.dumps(message, cls=DjangoJSONEncoder)
+    return f'event: {event}\ndata: {data}\n\n'
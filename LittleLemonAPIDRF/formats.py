@@ -0,0 +1,144 @@
+import codecs
+import csv
+import json
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class _Echo:
+    """File-like object for ``csv.writer`` that hands back each formatted row."""
+
+    def write(self, value):
+        return value
+
+
+def _lines(stream, encoding):
+    # Decode lazily so an upload is never held in memory as a whole.
+    return codecs.iterdecode(stream, encoding)
+
+
+class CSVParser(BaseParser):
+    """Parse a CSV upload with a header row into a lazy iterator of dicts."""
+    media_type = 'text/csv'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8-sig')
+        if encoding.lower().replace('_', '-') == 'utf-8':
+            encoding = 'utf-8-sig'
+        return self._rows(csv.DictReader(_lines(stream, encoding)))
+
+    def _rows(self, reader):
+        try:
+            for row in reader:
+                yield row
+        except (csv.Error, UnicodeDecodeError) as exc:
+            raise ParseError(f'CSV parse error on line {reader.line_num}: {exc}')
+
+
+class NDJSONParser(BaseParser):
+    """Parse newline-delimited JSON into a lazy iterator of objects."""
+    media_type = 'application/x-ndjson'
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', 'utf-8')
+        return self._rows(_lines(stream, encoding))
+
+    def _rows(self, lines):
+        line_number = 0
+        try:
+            for line_number, line in enumerate(lines, start=1):
+                if line.strip():
+                    yield json.loads(line)
+        except (ValueError, UnicodeDecodeError) as exc:
+            raise ParseError(f'JSON parse error on line {line_number}: {exc}')
+
+
+class CSVRenderer(BaseRenderer):
+    """Render a list of dicts (or one dict, e.g. an error) as CSV.
+
+    ``stream()`` formats rows lazily for a ``StreamingHttpResponse``.
+    """
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = [data] if isinstance(data, dict) else list(data)
+        header = list(rows[0]) if rows else []
+        return ''.join(self.stream(([row.get(key) for key in header] for row in rows), header)).encode()
+
+    def stream(self, rows, header):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Render a list as newline-delimited JSON, one object per line."""
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        rows = [data] if isinstance(data, dict) else data
+        return ''.join(self.stream(rows)).encode()
+
+    def stream(self, rows, header=None):
+        # With a header, rows are value sequences zipped into objects.
+        for row in rows:
+            yield json.dumps(dict(zip(header, row)) if header else row, cls=DjangoJSONEncoder) + '\n'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """``JSONRenderer`` on orjson, byte for byte the same output where it applies.
+
+    orjson encodes datetimes (``Z`` for UTC, as DRF does), dates and UUIDs
+    itself; ``Decimal`` and anything else it does not know go through DRF's
+    encoder, so ``Decimal`` still becomes a number. Without orjson, and for
+    output orjson cannot produce (indented for the browsable API or
+    ``; indent=``, ``UNICODE_JSON``/``COMPACT_JSON``/``STRICT_JSON`` set to
+    False), this is the stdlib ``JSONRenderer``. Unlike it, NaN and infinity
+    become ``null`` instead of raising.
+    """
+    options = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z if orjson else 0
+    default = staticmethod(JSONEncoder().default)
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or self.ensure_ascii or not self.compact or not self.strict
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+        ret = orjson.dumps(data, default=self.default, option=self.options)
+        # Escaped like JSONRenderer does, to keep the output a JavaScript subset.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class FastJSONParser(JSONParser):
+    """``JSONParser`` on orjson for UTF-8 bodies, the stdlib otherwise."""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or not self.strict or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,231 @@
+import json
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger('LittleLemonAPIDRF.timing')
+
+# Server-Timing metric names, in header order.
+METRICS = [
+    ('view', 'View'),
+    ('auth', 'Authentication'),
+    ('perm', 'Permission checks'),
+    ('ser', 'Serialization'),
+]
+MAX_CAPTURED_SQL = 50
+
+# Defaults of the LITTLE_LEMON_* instrumentation settings.
+SERVER_TIMING_HEADER = False
+SLOW_REQUEST_MS = 500
+SLOW_REQUEST_SAMPLE_RATE = 0.1
+
+# The timings of the request being served. A context variable rather than a
+# per-connection wrapper so that async views, whose queries run on another
+# thread's connection via sync_to_async, are still counted.
+_current_timings = ContextVar('littlelemon_timings', default=None)
+
+
+class RequestTimings:
+    """Per-request counters, fed by ``record_query`` and the view mixins."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.spans = {}
+        self.sql = []
+        self._serializer_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if len(self.sql) < MAX_CAPTURED_SQL:
+                # Only a reference to the SQL text; it is formatted if the
+                # request turns out to be slow and gets sampled.
+                self.sql.append((sql, elapsed))
+
+    def add(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    @contextmanager
+    def span(self, name):
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, perf_counter() - started)
+
+    @contextmanager
+    def serializer_span(self):
+        # Nested serializers share the context, so only the outermost call
+        # is timed to avoid counting the same work twice.
+        self._serializer_depth += 1
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self._serializer_depth -= 1
+            if not self._serializer_depth:
+                self.add('ser', perf_counter() - started)
+
+    def server_timing(self, total):
+        entries = [f'total;dur={total * 1000:.2f}', f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"']
+        for name, description in METRICS:
+            if name in self.spans:
+                entries.append(f'{name};dur={self.spans[name] * 1000:.2f};desc="{description}"')
+        return ', '.join(entries)
+
+    def as_dict(self, total):
+        record = {
+            'total_ms': round(total * 1000, 2),
+            'db_ms': round(self.db_time * 1000, 2),
+            'queries': self.queries,
+        }
+        for name, _ in METRICS:
+            if name in self.spans:
+                record[f'{name}_ms'] = round(self.spans[name] * 1000, 2)
+        return record
+
+
+def record_query(execute, sql, params, many, context):
+    timings = _current_timings.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    return timings(execute, sql, params, many, context)
+
+
+def install_query_recorder(connection):
+    """Attach ``record_query`` to a connection; called on ``connection_created``."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def get_timings(request):
+    """Return the ``RequestTimings`` of a Django or DRF request, if any."""
+    return getattr(request, 'timings', None)
+
+
+@contextmanager
+def timed(request, name):
+    timings = get_timings(request)
+    if timings is None:
+        yield
+    else:
+        with timings.span(name):
+            yield
+
+
+class ServerTimingMiddleware:
+    """Record query count, DB time and view phases for every request.
+
+    The figures go out as a JSON line on the ``LittleLemonAPIDRF.timing``
+    logger, at DEBUG for ordinary requests. Requests slower than
+    ``LITTLE_LEMON_SLOW_REQUEST_MS`` are logged at WARNING, and a
+    ``LITTLE_LEMON_SLOW_REQUEST_SAMPLE_RATE`` fraction of them include their SQL.
+
+    They are also sent as a ``Server-Timing`` header, but only to staff users
+    unless ``LITTLE_LEMON_SERVER_TIMING_HEADER`` is on: query counts and
+    timings tell an outsider too much about the backend.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        install_query_recorder(connection)
+        timings, token, started = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        return self.finish(request, response, timings, perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings, token, started = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timings.reset(token)
+        return self.finish(request, response, timings, perf_counter() - started)
+
+    def start(self, request):
+        timings = RequestTimings()
+        request.timings = timings
+        return timings, _current_timings.set(timings), perf_counter()
+
+    def finish(self, request, response, timings, total):
+        if self.shows_server_timing(request):
+            response['Server-Timing'] = timings.server_timing(total)
+        self.log(request, response, timings, total)
+        return response
+
+    def shows_server_timing(self, request):
+        if getattr(settings, 'LITTLE_LEMON_SERVER_TIMING_HEADER', SERVER_TIMING_HEADER):
+            return True
+        # DRF copies the authenticated user onto the Django request.
+        user = getattr(request, 'user', None)
+        return bool(user is not None and user.is_staff)
+
+    def log(self, request, response, timings, total):
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            **timings.as_dict(total),
+        }
+        if total * 1000 < getattr(settings, 'LITTLE_LEMON_SLOW_REQUEST_MS', SLOW_REQUEST_MS):
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(json.dumps(record))
+            return
+        if random.random() < getattr(settings, 'LITTLE_LEMON_SLOW_REQUEST_SAMPLE_RATE', SLOW_REQUEST_SAMPLE_RATE):
+            record['sql'] = [{'sql': sql, 'ms': round(elapsed * 1000, 2)} for sql, elapsed in timings.sql]
+        logger.warning(json.dumps(record))
+
+
+class InstrumentedViewMixin:
+    """DRF hook that attributes view time to authentication and permissions."""
+
+    def dispatch(self, request, *args, **kwargs):
+        with timed(request, 'view'):
+            return super().dispatch(request, *args, **kwargs)
+
+    def perform_authentication(self, request):
+        with timed(request, 'auth'):
+            super().perform_authentication(request)
+
+    def check_permissions(self, request):
+        with timed(request, 'perm'):
+            super().check_permissions(request)
+
+    def check_object_permissions(self, request, obj):
+        with timed(request, 'perm'):
+            super().check_object_permissions(request, obj)
+
+
+class InstrumentedSerializerMixin:
+    """Attribute ``to_representation`` time to the request's serializer span."""
+
+    def to_representation(self, instance):
+        request = self.context.get('request')
+        timings = get_timings(request) if request is not None else None
+        if timings is None:
+            return super().to_representation(instance)
+        with timings.serializer_span():
+            return super().to_representation(instance)
@@ -0,0 +1,89 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, When
+from django.utils import timezone
+from .menu_cache import bump_stock_version
+from .models import MenuItem, Cart
+
+
+class InsufficientInventory(Exception):
+    pass
+
+
+def reservation_ttl():
+    # Seconds a cart line holds its stock before the sweeper gives it back.
+    return timedelta(seconds=getattr(settings, 'LITTLE_LEMON_RESERVATION_TTL', 30 * 60))
+
+
+def reservation_deadline():
+    return timezone.now() + reservation_ttl()
+
+
+def _per_item(lines):
+    return Case(*[When(pk=pk, then=qty) for pk, qty in lines.items()], output_field=IntegerField())
+
+
+def reserve(menuitem_id, quantity):
+    """Take ``quantity`` units of stock, or raise ``InsufficientInventory``.
+
+    The check and the decrement are one conditional UPDATE, so concurrent
+    reservations can never oversell or lose an update.
+    """
+    reserve_many({menuitem_id: quantity})
+
+
+def reserve_many(lines):
+    """Reserve every ``{menuitem_id: quantity}`` line in a single UPDATE.
+
+    Either all lines are reserved or none are: if any item is short the
+    statement's partial effect is rolled back and ``InsufficientInventory``
+    is raised.
+    """
+    lines = {pk: qty for pk, qty in lines.items() if qty}
+    if not lines:
+        return
+    with transaction.atomic():
+        updated = MenuItem.objects.filter(
+            pk__in=lines.keys(), inventory__gte=_per_item(lines),
+        ).update(inventory=F('inventory') - _per_item(lines))
+        if updated != len(lines):
+            raise InsufficientInventory
+    transaction.on_commit(bump_stock_version)
+
+
+def release_many(lines):
+    """Return ``{menuitem_id: quantity}`` stock in a single UPDATE."""
+    lines = {pk: qty for pk, qty in lines.items() if qty}
+    if not lines:
+        return
+    MenuItem.objects.filter(pk__in=lines.keys()).update(inventory=F('inventory') + _per_item(lines))
+    transaction.on_commit(bump_stock_version)
+
+
+def reserved_lines(cart_items):
+    lines = {}
+    for item in cart_items:
+        if item.reserved_until is not None:
+            lines[item.menuitem_id] = lines.get(item.menuitem_id, 0) + item.quantity
+    return lines
+
+
+def release_expired_reservations(now=None):
+    """Give back the stock of cart lines whose reservation has expired.
+
+    The lines stay in the cart; checkout reserves them again. Returns the
+    number of cart lines released.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        expired = list(
+            Cart.objects.select_for_update()
+            .filter(reserved_until__lt=now)
+            .only('pk', 'menuitem_id', 'quantity', 'reserved_until')
+        )
+        if not expired:
+            return 0
+        Cart.objects.filter(pk__in=[item.pk for item in expired]).update(reserved_until=None)
+        release_many(reserved_lines(expired))
+    return len(expired)
@@ -0,0 +1,107 @@
+import platform
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from LittleLemonAPIDRF import benchmarks
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmark_baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a scratch database and measure latency, throughput and SQL queries '
+        'for every API route, optionally failing on regressions against a baseline. '
+        'Not covered: the order event streams (they never end), orders/export/ '
+        '(see --export), and the djoser user and token endpoints, whose time is '
+        'password hashing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--menu-items', type=int, default=2000)
+        parser.add_argument('--orders', type=int, default=100000)
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--crew', type=int, default=20)
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per scenario.')
+        parser.add_argument('--warmup', type=int, default=10)
+        parser.add_argument('--only', help='Only run scenarios whose name contains this text.')
+        parser.add_argument('--export', action='store_true',
+                            help='Also stream the full order export and report its throughput.')
+        parser.add_argument('--connections', action='store_true',
+                            help='Also compare latency with and without persistent database connections.')
+        parser.add_argument('--json', action='store_true',
+                            help='Also compare the default and orjson-backed JSON renderer and parser.')
+        parser.add_argument('--baseline', default=None,
+                            help=f'Baseline JSON to compare against (default: {DEFAULT_BASELINE.name} if present).')
+        parser.add_argument('--save-baseline', metavar='PATH', help='Write the results as a new baseline.')
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help='Allowed p95 slowdown as a fraction of the baseline.')
+
+    def handle(self, *args, **options):
+        scenarios = [s for s in benchmarks.SCENARIOS if not options['only'] or options['only'] in s.name]
+        if not scenarios:
+            raise CommandError('No scenario matches --only.')
+
+        with benchmarks.benchmark_database():
+            fixture = benchmarks.seed(
+                menu_items=options['menu_items'], orders=options['orders'],
+                customers=options['customers'], crew=options['crew'],
+                log=lambda message: self.stdout.write(message),
+            )
+            self.stdout.write(f'\n{"scenario":<34}{"p50 ms":>9}{"p95 ms":>9}{"p99 ms":>9}{"req/s":>9}{"queries":>9}')
+            results = benchmarks.run_benchmarks(
+                fixture, scenarios, options['requests'], options['warmup'], log=self.write_row,
+            )
+            if options['export']:
+                self.stdout.write(f'\n{"export":<34}{"rows":>11}{"seconds":>9}{"rows/s":>11}{"MB/s":>9}')
+                for name, result in benchmarks.run_export_benchmark(fixture).items():
+                    self.stdout.write(f'{name:<34}{result["rows"]:>11}{result["seconds"]:>9.2f}'
+                                      f'{result["rows_per_s"]:>11.0f}{result["mb_per_s"]:>9.2f}')
+            if options['connections']:
+                self.write_connection_comparison(fixture, scenarios, options)
+            if options['json']:
+                self.write_json_comparison()
+
+        meta = {
+            'vendor': connection.vendor,
+            'python': platform.python_version(),
+            'menu_items': options['menu_items'],
+            'orders': options['orders'],
+            'requests': options['requests'],
+        }
+        if options['save_baseline']:
+            benchmarks.save_results(options['save_baseline'], results, meta)
+            self.stdout.write(f'Baseline written to {options["save_baseline"]}')
+
+        baseline_path = options['baseline'] or (DEFAULT_BASELINE if DEFAULT_BASELINE.exists() else None)
+        if baseline_path and not options['save_baseline']:
+            regressions = benchmarks.compare_to_baseline(
+                results, benchmarks.load_baseline(baseline_path), options['tolerance'])
+            if regressions:
+                raise CommandError('Performance regressions:\n  ' + '\n  '.join(regressions))
+            self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline_path}'))
+
+    def write_row(self, name, result):
+        row = (f'{name:<34}{result["p50_ms"]:>9.2f}{result["p95_ms"]:>9.2f}{result["p99_ms"]:>9.2f}'
+               f'{result["rps"]:>9.1f}{result["queries_per_request"]:>9.1f}')
+        if result['failures']:
+            row += self.style.ERROR(f'  {result["failures"]} unexpected responses')
+        self.stdout.write(row)
+
+    def write_connection_comparison(self, fixture, scenarios, options):
+        max_age = connection.settings_dict['CONN_MAX_AGE'] or 60
+        self.stdout.write(f'\n{"p50 ms by CONN_MAX_AGE":<34}{"0":>9}{max_age!s:>9}{"saved":>9}')
+        results = benchmarks.run_connection_benchmark(
+            fixture, scenarios, options['requests'], options['warmup'], max_ages=(0, max_age))
+        for name, by_age in results.items():
+            closed, persistent = by_age[0]['p50_ms'], by_age[max_age]['p50_ms']
+            self.stdout.write(f'{name:<34}{closed:>9.2f}{persistent:>9.2f}{closed - persistent:>9.2f}')
+
+    def write_json_comparison(self):
+        self.stdout.write(f'\n{"json, us per call":<34}{"bytes":>9}{"render":>9}{"fast":>9}{"parse":>9}{"fast":>9}')
+        for name, result in benchmarks.run_json_benchmark(benchmarks.json_payloads()).items():
+            row = (f'{name:<34}{result["bytes"]:>9}{result["render_default_us"]:>9.1f}{result["render_fast_us"]:>9.1f}'
+                   f'{result["parse_default_us"]:>9.1f}{result["parse_fast_us"]:>9.1f}')
+            if not result['identical']:
+                row += self.style.WARNING('  output differs')
+            self.stdout.write(row)
@@ -0,0 +1,66 @@
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from LittleLemonAPIDRF.pagination import KeysetPagination
+from LittleLemonAPIDRF.roles import MANAGER, DELIVERY_CREW
+from LittleLemonAPIDRF.views import MenuItemViewSet, CartMenuItemsView, OrderListCreateView
+
+# (label, view class, extra attributes, query string, role of the caller)
+ENDPOINTS = [
+    ('GET /api/menu-items/', MenuItemViewSet, {'action': 'list'}, '', None),
+    ('GET /api/menu-items/?ordering=price', MenuItemViewSet, {'action': 'list'}, 'ordering=price', None),
+    ('GET /api/menu-items/?search=...', MenuItemViewSet, {'action': 'list'}, 'search=pizza', None),
+    ('GET /api/cart/menu-items/', CartMenuItemsView, {}, '', 'customer'),
+    ('GET /api/orders/ (manager)', OrderListCreateView, {}, '', MANAGER),
+    ('GET /api/orders/ (delivery crew)', OrderListCreateView, {}, '', DELIVERY_CREW),
+    ('GET /api/orders/ (customer)', OrderListCreateView, {}, '', 'customer'),
+]
+
+
+class Command(BaseCommand):
+    help = "Print the database's query plan for each list endpoint's page query."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--analyze', action='store_true',
+                            help='Run EXPLAIN ANALYZE (PostgreSQL only).')
+
+    def handle(self, *args, **options):
+        explain_options = {}
+        if options['analyze'] and connection.vendor == 'postgresql':
+            explain_options = {'analyze': True, 'buffers': True}
+
+        self.stdout.write(f'Database vendor: {connection.vendor}')
+        factory = APIRequestFactory()
+        for label, view_class, attrs, query, role in ENDPOINTS:
+            user = self.sample_user(role)
+            if role and user is None:
+                self.stdout.write(self.style.WARNING(f'\n{label}: no {role} user in the database, skipped'))
+                continue
+
+            request = Request(factory.get('/', QUERY_STRING=query))
+            request.user = user
+            view = view_class(request=request, args=(), kwargs={}, format_kwarg=None, **attrs)
+            queryset = view.filter_queryset(view.get_queryset())
+
+            paginator = KeysetPagination()
+            paginator.model = queryset.model
+            ordering = paginator.get_ordering(request, queryset, view)
+            first_page = queryset.order_by(*ordering)
+
+            self.stdout.write(self.style.MIGRATE_HEADING(f'\n{label}'))
+            self.stdout.write(first_page[:paginator.page_size + 1].explain(**explain_options))
+
+            row = first_page.first()
+            if row is not None:
+                seek = paginator._seek(ordering, [getattr(row, f.lstrip('-')) for f in ordering])
+                self.stdout.write(self.style.MIGRATE_LABEL('  next page (keyset seek):'))
+                self.stdout.write(first_page.filter(seek)[:paginator.page_size + 1].explain(**explain_options))
+
+    def sample_user(self, role):
+        if role is None:
+            return AnonymousUser()
+        if role == 'customer':
+            return User.objects.filter(groups__isnull=True).order_by('id').first()
+        return User.objects.filter(groups__name=role).order_by('id').first()
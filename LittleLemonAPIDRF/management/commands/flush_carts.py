@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from LittleLemonAPIDRF.cart import get_cart_store
+
+
+class Command(BaseCommand):
+    help = 'Write carts changed in the cart cache since the last run to the database.'
+
+    def handle(self, *args, **options):
+        flushed = get_cart_store().flush()
+        if flushed is None:
+            self.stdout.write('Another flush is running; nothing done.')
+        else:
+            self.stdout.write(f'Flushed {flushed} cart(s).')
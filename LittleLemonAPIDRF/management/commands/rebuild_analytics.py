@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+from LittleLemonAPIDRF.analytics import rebuild
+from LittleLemonAPIDRF.models import DailySales
+
+
+class Command(BaseCommand):
+    help = 'Recompute the sales analytics summary tables from all orders.'
+
+    def handle(self, *args, **options):
+        rebuild()
+        self.stdout.write(f'Rebuilt analytics for {DailySales.objects.count()} days.')
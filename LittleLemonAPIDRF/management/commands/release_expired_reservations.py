@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from LittleLemonAPIDRF.inventory import release_expired_reservations
+
+
+class Command(BaseCommand):
+    help = 'Return the stock held by abandoned cart lines whose reservation has expired.'
+
+    def handle(self, *args, **options):
+        released = release_expired_reservations()
+        self.stdout.write(f'Released {released} cart line(s).')
@@ -0,0 +1,137 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+from .models import MenuItem
+
+MENU_VERSION_KEY = 'littlelemon:menu:version'
+# Stock moves with every cart change, so it is versioned apart from the rest
+# of the menu: a reservation must not throw away every cached page.
+STOCK_VERSION_KEY = 'littlelemon:menu:stock'
+STOCK_FIELD = 'inventory'
+
+
+def _cache_timeout():
+    return getattr(settings, 'LITTLE_LEMON_MENU_CACHE_TIMEOUT', 600)
+
+
+def _get_version(key):
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock rather than 1 so a flushed or evicted counter
+        # can never hand out a version that was already used for older data.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def get_menu_version():
+    return _get_version(MENU_VERSION_KEY)
+
+
+def bump_menu_version():
+    _bump_version(MENU_VERSION_KEY)
+
+
+def get_stock_version():
+    return _get_version(STOCK_VERSION_KEY)
+
+
+def bump_stock_version():
+    _bump_version(STOCK_VERSION_KEY)
+
+
+def shows_stock(fields):
+    return fields is None or STOCK_FIELD in fields
+
+
+def _rows(data):
+    if isinstance(data, dict):
+        return data['results'] if 'results' in data else [data]
+    return data
+
+
+def stale_stock_ids(entry):
+    """Ids whose ``inventory`` a cached ``entry`` must refresh, or ``None`` if
+    it cannot be refreshed in place (rows without ``id``)."""
+    rows = _rows(entry['data'])
+    if not all('id' in row for row in rows):
+        return None
+    return [row['id'] for row in rows if STOCK_FIELD in row]
+
+
+def refresh_stock(entry, inventory, stock_version):
+    """Overlay ``{id: inventory}`` on a cached entry and mark it current."""
+    for row in _rows(entry['data']):
+        if STOCK_FIELD in row and row['id'] in inventory:
+            row[STOCK_FIELD] = inventory[row['id']]
+    entry['stock'] = stock_version
+    return entry
+
+
+# Replaced by the normalized fieldset, so ?fields=a,b and ?fields=b,a share entries.
+SPARSE_PARAMS = ('fields', 'expand')
+
+
+def _request_digest(request, action, fields=None):
+    params = sorted((name, values) for name, values in request.query_params.lists() if name not in SPARSE_PARAMS)
+    fieldset = sorted(fields) if fields is not None else None
+    raw = f'{action}|{request.get_host()}|{request.path}|{params}|{fieldset}'
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def menu_cache_key(request, action, fields=None):
+    return f'littlelemon:menu:{get_menu_version()}:{_request_digest(request, action, fields)}'
+
+
+def menu_etag(request, action, fields=None):
+    # Only responses that show stock change with it.
+    stock = f'-{get_stock_version()}' if shows_stock(fields) else ''
+    return f'menu-{get_menu_version()}{stock}-{_request_digest(request, action, fields)}'
+
+
+class MenuCacheMixin:
+    """Read-through cache for list and retrieve responses of the menu.
+
+    Entries are keyed on the menu version, so saving or deleting any
+    ``MenuItem`` (see ``signals.py``) makes every cached page unreachable.
+    Reserving or releasing stock only bumps the stock version: a cached page
+    that shows ``inventory`` then has just those values re-read, with one
+    primary-key query, instead of being rebuilt.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response('list', super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response('retrieve', super().retrieve, request, *args, **kwargs)
+
+    def _cached_response(self, action, handler, request, *args, **kwargs):
+        timeout = _cache_timeout()
+        if not timeout:
+            return handler(request, *args, **kwargs)
+        fields = self.get_sparse_fields() if hasattr(self, 'get_sparse_fields') else None
+        key = menu_cache_key(request, action, fields)
+        stock_version = get_stock_version()
+        entry = cache.get(key)
+        if entry is not None and entry['stock'] != stock_version and shows_stock(fields):
+            ids = stale_stock_ids(entry)
+            if ids is None:
+                entry = None
+            else:
+                inventory = dict(MenuItem.objects.filter(pk__in=ids).values_list('pk', STOCK_FIELD))
+                cache.set(key, refresh_stock(entry, inventory, stock_version), timeout)
+        if entry is not None:
+            return Response(entry['data'])
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, {'stock': stock_version, 'data': response.data}, timeout)
+        return response
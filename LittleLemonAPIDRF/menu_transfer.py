@@ -0,0 +1,94 @@
+from functools import partial
+from itertools import islice
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+from .menu_cache import bump_menu_version
+from .models import MenuItem
+from .search import get_search_backend
+from .serializers import MenuItemSerializer
+
+EXPORT_FIELDS = ['id', 'title', 'price', 'inventory', 'category']
+IMPORT_CHUNK_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportFailed(Exception):
+    def __init__(self, errors, error_count, created=0, updated=0):
+        super().__init__(errors)
+        self.errors = errors
+        self.error_count = error_count
+        # Written by chunks committed before the first invalid row.
+        self.created = created
+        self.updated = updated
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _upsert(items):
+    """Write ``{(title, category): validated_data}`` with one upsert.
+
+    ``INSERT ... ON CONFLICT`` on the title/category unique constraint, so
+    concurrent imports of the same rows update them instead of adding
+    duplicates. Returns ``(created, updated, ids)``.
+    """
+    titles = {title for title, _ in items}
+    existing = set(MenuItem.objects.filter(title__in=titles).values_list('title', 'category'))
+    objs = [MenuItem(**data) for data in items.values()]
+    MenuItem.objects.bulk_create(objs, update_conflicts=True, unique_fields=['title', 'category'],
+                                 update_fields=['price', 'inventory'])
+    created = sum(key not in existing for key in items)
+    return created, len(items) - created, [obj.pk for obj in objs if obj.pk is not None]
+
+
+def _after_write(ids):
+    # bulk writes skip the MenuItem signals that keep these in sync
+    transaction.on_commit(bump_menu_version)
+    transaction.on_commit(partial(get_search_backend().reindex, ids))
+
+
+def import_menu_items(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    """Upsert menu items keyed on (title, category) from an iterable of dicts.
+
+    Rows are validated with ``MenuItemSerializer`` and each chunk is written
+    and committed on its own, so a large upload never holds one long
+    transaction. A chunk with an invalid row is not written, and neither is
+    anything after it; the rest of the file is still validated so that
+    ``ImportFailed`` can list the first errors by row number along with what
+    the earlier chunks wrote. Returns ``(created, updated)``.
+    """
+    # Rows matching an existing title and category are updates, not duplicates.
+    serializer = MenuItemSerializer(validators=[])
+    created = updated = 0
+    errors, error_count = [], 0
+    for chunk in _chunks(enumerate(rows, start=1), chunk_size):
+        items = {}
+        for line, row in chunk:
+            try:
+                data = serializer.run_validation(row)
+            except ValidationError as exc:
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({'row': line, 'errors': exc.detail})
+                continue
+            data.setdefault('category', '')
+            # A title+category repeated within the file: the last row wins.
+            items[(data['title'], data['category'])] = data
+        if items and not error_count:
+            with transaction.atomic():
+                chunk_created, chunk_updated, ids = _upsert(items)
+                _after_write(ids)
+            created += chunk_created
+            updated += chunk_updated
+    if error_count:
+        raise ImportFailed(errors, error_count, created, updated)
+    return created, updated
+
+
+def export_menu_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """Every menu item as a tuple of ``EXPORT_FIELDS``, read in chunks."""
+    return MenuItem.objects.order_by('id').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
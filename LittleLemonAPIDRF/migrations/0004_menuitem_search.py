@@ -0,0 +1,40 @@
+from django.db import migrations
+
+FTS_TABLE = 'LittleLemonAPIDRF_menuitem_fts'
+MENU_TABLE = 'LittleLemonAPIDRF_menuitem'
+PG_INDEX = 'menuitem_search_gin_idx'
+PG_VECTOR = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(category, ''))"
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            f'CREATE VIRTUAL TABLE IF NOT EXISTS "{FTS_TABLE}" USING fts5('
+            "title, category, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        )
+        schema_editor.execute(
+            f'INSERT INTO "{FTS_TABLE}" (rowid, title, category) '
+            f'SELECT id, title, category FROM "{MENU_TABLE}"'
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'CREATE INDEX IF NOT EXISTS "{PG_INDEX}" ON "{MENU_TABLE}" USING gin (({PG_VECTOR}))')
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS "{FTS_TABLE}"')
+    elif vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS "{PG_INDEX}"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LittleLemonAPIDRF', '0003_query_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LittleLemonAPIDRF', '0006_analytics'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('delivery_crew__isnull', True), ('status', False)), fields=['date', 'id'], name='order_dispatch_queue_idx'),
+        ),
+    ]
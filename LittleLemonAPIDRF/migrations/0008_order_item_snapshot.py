@@ -0,0 +1,42 @@
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_snapshot(apps, schema_editor):
+    MenuItem = apps.get_model('LittleLemonAPIDRF', 'MenuItem')
+    OrderItem = apps.get_model('LittleLemonAPIDRF', 'OrderItem')
+    menuitem = MenuItem.objects.filter(pk=OuterRef('menuitem_id'))
+    # One UPDATE for the whole history rather than one per line.
+    OrderItem.objects.update(
+        title=Subquery(menuitem.values('title')[:1]),
+        category=Subquery(menuitem.values('category')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LittleLemonAPIDRF', '0007_dispatch_queue_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='title',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='category',
+            field=models.CharField(blank=True, default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_snapshot, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='menuitem',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, to='LittleLemonAPIDRF.menuitem'),
+        ),
+    ]
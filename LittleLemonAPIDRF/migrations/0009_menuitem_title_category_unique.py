@@ -0,0 +1,51 @@
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+FTS_TABLE = 'LittleLemonAPIDRF_menuitem_fts'
+MENU_TABLE = 'LittleLemonAPIDRF_menuitem'
+
+
+def rename_duplicates(apps, schema_editor):
+    MenuItem = apps.get_model('LittleLemonAPIDRF', 'MenuItem')
+    duplicates = (
+        MenuItem.objects.values('title', 'category').annotate(rows=Count('id'), keep=Min('id')).filter(rows__gt=1)
+    )
+    # The lowest id keeps the name, as the import did when matching them;
+    # the others are renamed rather than deleted so carts and orders keep them.
+    renamed = []
+    for group in duplicates:
+        for item in MenuItem.objects.filter(title=group['title'], category=group['category']).exclude(pk=group['keep']):
+            suffix = f' ({item.pk})'
+            item.title = item.title[:255 - len(suffix)] + suffix
+            item.save(update_fields=['title'])
+            renamed.append(item.pk)
+    # Historical models send no signals, so the SQLite full-text index (see
+    # 0004) still holds the old titles; the PostgreSQL one is an expression
+    # index and follows the rows by itself.
+    if renamed and schema_editor.connection.vendor == 'sqlite':
+        placeholders = ', '.join(['%s'] * len(renamed))
+        schema_editor.execute(f'DELETE FROM "{FTS_TABLE}" WHERE rowid IN ({placeholders})', renamed)
+        schema_editor.execute(
+            f'INSERT INTO "{FTS_TABLE}" (rowid, title, category) '
+            f'SELECT id, title, category FROM "{MENU_TABLE}" WHERE id IN ({placeholders})', renamed
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LittleLemonAPIDRF', '0008_order_item_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicates, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='menuitem',
+            name='category',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddConstraint(
+            model_name='menuitem',
+            constraint=models.UniqueConstraint(fields=('title', 'category'), name='menuitem_title_category_uniq'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+
+def clear_item_sales(apps, schema_editor):
+    apps.get_model('LittleLemonAPIDRF', 'DailyItemSales').objects.all().delete()
+
+
+def rebuild_item_sales(apps, schema_editor):
+    DailyItemSales = apps.get_model('LittleLemonAPIDRF', 'DailyItemSales')
+    OrderItem = apps.get_model('LittleLemonAPIDRF', 'OrderItem')
+    # Recomputed from the order lines, so the history of deleted menu items
+    # (which the old rows could not subtract from) comes back exact.
+    DailyItemSales.objects.bulk_create((
+        DailyItemSales(**row) for row in OrderItem.objects.annotate(day=TruncDate('order__date'))
+        .values('day', 'title', 'category').annotate(quantity=Sum('quantity'), revenue=Sum('price'))
+        .order_by().iterator()
+    ), batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('LittleLemonAPIDRF', '0009_menuitem_title_category_unique'),
+    ]
+
+    # Going back leaves the table empty; run rebuild_analytics afterwards.
+    operations = [
+        migrations.RunPython(clear_item_sales, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='dailyitemsales',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='dailyitemsales',
+            name='menuitem',
+        ),
+        migrations.AddField(
+            model_name='dailyitemsales',
+            name='title',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='dailyitemsales',
+            name='category',
+            field=models.CharField(blank=True, default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyitemsales',
+            unique_together={('day', 'title', 'category')},
+        ),
+        migrations.RunPython(rebuild_item_sales, clear_item_sales),
+    ]
@@ -5,7 +5,18 @@ class MenuItem(models.Model):
     title = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=6, decimal_places=2)
     inventory = models.SmallIntegerField()
-    category = models.CharField(max_length=255, blank=True)
+    category = models.CharField(max_length=255, blank=True, default='')
+
+    class Meta:
+        constraints = [
+            # The key menu imports upsert on.
+            models.UniqueConstraint(fields=['title', 'category'], name='menuitem_title_category_uniq'),
+        ]
+        indexes = [
+            # ?ordering=price / ?ordering=title with keyset pagination
+            models.Index(fields=['price', 'id'], name='menuitem_price_id_idx'),
+            models.Index(fields=['title', 'id'], name='menuitem_title_id_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -17,25 +28,89 @@ class Cart(models.Model):
     quantity = models.SmallIntegerField()
     unit_price = models.DecimalField(max_digits=6, decimal_places=2)
     price = models.DecimalField(max_digits=6, decimal_places=2)
+    # Stock for this line is held until then; None once it has been released.
+    reserved_until = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         unique_together = ('user', 'menuitem')
+        indexes = [
+            models.Index(fields=['reserved_until'], name='cart_reserved_until_idx'),
+        ]
 
 
 class Order(models.Model):
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    delivery_crew = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='deliveries')
+    # Both FKs lead the composite indexes below, so their own
+    # single-column indexes would only add write cost.
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    delivery_crew = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='deliveries', db_index=False)
     status = models.BooleanField(default=False)  # False = Out for delivery, True = Delivered
     total = models.DecimalField(max_digits=10, decimal_places=2)
     date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Manager listing: all orders, newest first
+            models.Index(fields=['date', 'id'], name='order_date_id_idx'),
+            # Customer listing: own orders, newest first
+            models.Index(fields=['user', 'date', 'id'], name='order_user_date_idx'),
+            # Delivery crew listing: assigned orders, newest first
+            models.Index(fields=['delivery_crew', 'date', 'id'], name='order_crew_date_idx'),
+            # Open/delivered orders by crew, and by status across the board
+            models.Index(fields=['delivery_crew', 'status', 'date'], name='order_crew_status_date_idx'),
+            models.Index(fields=['status', 'date'], name='order_status_date_idx'),
+            # Dispatch queue: unassigned open orders, oldest first. Partial, so
+            # it stays as small as the backlog rather than the order history.
+            models.Index(
+                fields=['date', 'id'], name='order_dispatch_queue_idx',
+                condition=models.Q(delivery_crew__isnull=True, status=False),
+            ),
+        ]
 
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='order_items')
-    menuitem = models.ForeignKey(MenuItem, on_delete=models.CASCADE)
+    # Order history outlives the menu: deleting an item only unlinks its lines.
+    menuitem = models.ForeignKey(MenuItem, on_delete=models.SET_NULL, null=True)
+    # The item as it was at checkout, so past orders read without a join.
+    title = models.CharField(max_length=255)
+    category = models.CharField(max_length=255, blank=True)
     quantity = models.SmallIntegerField()
     unit_price = models.DecimalField(max_digits=6, decimal_places=2)
     price = models.DecimalField(max_digits=6, decimal_places=2)
 
     class Meta:
         unique_together = ('order', 'menuitem')
+
+
+# Sales analytics, maintained incrementally by analytics.py. Every row is
+# keyed on the (local) day the order was placed, so any later change to an
+# order can be applied to, or reversed from, exactly the rows it counted in.
+class DailySales(models.Model):
+    day = models.DateField(unique=True)
+    orders = models.IntegerField(default=0)
+    delivered = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+
+class DailyItemSales(models.Model):
+    day = models.DateField()
+    # Keyed on the order lines' snapshot rather than the menu item, which
+    # their lines lose when it is deleted: history outlives the menu.
+    title = models.CharField(max_length=255)
+    category = models.CharField(max_length=255, blank=True)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ('day', 'title', 'category')
+
+
+class DailyCrewDeliveries(models.Model):
+    day = models.DateField()
+    delivery_crew = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    assigned = models.IntegerField(default=0)
+    delivered = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ('day', 'delivery_crew')
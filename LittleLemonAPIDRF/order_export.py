@@ -0,0 +1,63 @@
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from operator import itemgetter
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from .models import Order
+
+ORDER_FIELDS = ['id', 'user_id', 'delivery_crew_id', 'status', 'total', 'date']
+ITEM_FIELDS = ['menuitem_id', 'title', 'category', 'quantity', 'unit_price', 'price']
+# CSV has one row per order line, prefixed with its order's columns.
+EXPORT_HEADER = ['order_id', 'user_id', 'delivery_crew_id', 'status', 'total', 'date'] + ITEM_FIELDS
+EXPORT_CHUNK_SIZE = 5000
+
+
+def parse_bound(value, name, end=False):
+    """Parse ``?from=``/``?to=`` as a datetime, or a date covering the whole day."""
+    if not value:
+        return None
+    try:
+        # parse_datetime() also accepts a bare date, so check for one first.
+        day = parse_date(value) if len(value) == 10 else None
+        moment = None if day else parse_datetime(value)
+    except ValueError:
+        day = moment = None
+    if day is not None:
+        moment = datetime.combine(day + timedelta(days=1) if end else day, time.min)
+    elif moment is None:
+        raise ValidationError({name: 'Expected an ISO 8601 date or datetime.'})
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_order_rows(start=None, end=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Order lines in ``[start, end)`` as ``EXPORT_HEADER`` tuples, oldest first.
+
+    One LEFT JOIN over the ``(date, id)`` index, read through a server-side
+    cursor where the database has one, so memory stays flat however long the
+    range. An order without lines yields a single row with empty line columns.
+    """
+    queryset = Order.objects.order_by('date', 'id')
+    if start is not None:
+        queryset = queryset.filter(date__gte=start)
+    if end is not None:
+        queryset = queryset.filter(date__lt=end)
+    columns = ORDER_FIELDS + [f'order_items__{field.removesuffix("_id")}' for field in ITEM_FIELDS]
+    return queryset.values_list(*columns).iterator(chunk_size=chunk_size)
+
+
+def group_order_rows(rows):
+    """Fold consecutive rows of the same order into one dict with its ``items``."""
+    order_width = len(ORDER_FIELDS)
+    # menuitem_id is null on lines of deleted menu items; quantity never is.
+    quantity = order_width + ITEM_FIELDS.index('quantity')
+    for _, lines in groupby(rows, key=itemgetter(0)):
+        lines = list(lines)
+        order = dict(zip(ORDER_FIELDS, lines[0][:order_width]))
+        order['items'] = [
+            dict(zip(ITEM_FIELDS, line[order_width:]))
+            for line in lines if line[quantity] is not None
+        ]
+        yield order
@@ -0,0 +1,231 @@
+import json
+from functools import reduce
+from operator import or_
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _invert(field):
+    return field[1:] if field.startswith('-') else '-' + field
+
+
+class SizedPageNumberPagination(PageNumberPagination):
+    """``PageNumberPagination`` that also honours ``?page_size=`` (up to 100)."""
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_paginated_data(self, data):
+        return {
+            'count': self.page.paginator.count,
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+
+class KeysetPagination(BasePagination):
+    """Opt-in keyset ("seek") pagination with no COUNT(*) and no OFFSET.
+
+    Requests without ``?cursor=`` get the page-number envelope (``count``,
+    ``?page=N`` links) clients have always had. Passing ``?cursor=`` (empty
+    for the first page) switches to keyset pages: each cursor carries the
+    sort-key values of the row at the edge of the page, and the next page is
+    fetched with ``WHERE (k1, k2, ...) > (...)``, so every page costs the
+    same no matter how deep the client goes. The ordering comes from the
+    view's ``OrderingFilter`` (or ``view.ordering``) and is always made
+    unique by appending the primary key.
+    """
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor'
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('id',)
+    legacy_pagination_class = SizedPageNumberPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.legacy = None
+        if self.cursor_query_param not in request.query_params:
+            self.legacy = self.legacy_pagination_class()
+            return self.legacy.paginate_queryset(queryset, request, view)
+        return self._set_page(list(self._seek_queryset(queryset, request, view)))
+
+    def _seek_queryset(self, queryset, request, view):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.model = queryset.model
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.position, self.reverse = self.decode_cursor(request)
+        ordering = tuple(_invert(field) for field in self.ordering) if self.reverse else self.ordering
+        if self.position is not None:
+            queryset = queryset.filter(self._seek(ordering, self.position))
+        # One extra row tells whether there is another page.
+        return queryset.order_by(*ordering)[:self.page_size + 1]
+
+    def _set_page(self, rows):
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.position is not None
+        self.page = rows
+        return rows
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_data(data)
+        return {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        for backend in getattr(view, 'filter_backends', []):
+            if hasattr(backend, 'get_ordering'):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        if not ordering:
+            ordering = getattr(view, 'ordering', None)
+        if not ordering and all(isinstance(field, str) for field in queryset.query.order_by):
+            # e.g. a filter backend that ordered by an annotation
+            ordering = queryset.query.order_by
+        pk_name = self.model._meta.pk.name
+        ordering = [
+            field.replace('pk', pk_name) if field.lstrip('-') == 'pk' else field
+            for field in (ordering or self.ordering)
+        ]
+        if pk_name not in ordering and f'-{pk_name}' not in ordering:
+            descending = ordering[-1].startswith('-')
+            ordering.append(f'-{pk_name}' if descending else pk_name)
+        return tuple(ordering)
+
+    def _seek(self, ordering, position):
+        # Row comparison (k1, k2, ...) > (v1, v2, ...) expanded into
+        # (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ..., honouring each direction.
+        # The redundant bound on the leading key turns the OR into a single
+        # index range scan instead of a multi-index OR plus sort.
+        conditions = []
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            conditions.append(equal & Q(**{f'{name}__{lookup}': value}))
+            equal &= Q(**{name: value})
+        leading = ordering[0]
+        bound = Q(**{f"{leading.lstrip('-')}__{'lte' if leading.startswith('-') else 'gte'}": position[0]})
+        return bound & reduce(or_, conditions)
+
+    def _position(self, row):
+        return [getattr(row, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, position, reverse):
+        # default=str keeps full microsecond precision on datetimes, which
+        # DjangoJSONEncoder would truncate to milliseconds.
+        payload = json.dumps({'p': position, 'r': int(reverse)}, default=str)
+        cursor = urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode()))
+            if len(payload['p']) != len(self.ordering):
+                raise ValueError
+            position = [
+                self._to_python(field.lstrip('-'), value)
+                for field, value in zip(self.ordering, payload['p'])
+            ]
+            return position, bool(payload['r'])
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _to_python(self, name, value):
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations such as a search rank round-trip as plain JSON values.
+            return value
+        return field.to_python(value)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self._position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self._position(self.page[0]), reverse=True)
+
+
+class AsyncPageNumberPagination(SizedPageNumberPagination):
+    """``PageNumberPagination`` for async views, using ``acount()`` and ``async for``.
+
+    Same ``?page=``/``?page_size=`` parameters and response body as the sync
+    class; the view renders ``get_paginated_data()`` itself.
+    """
+
+    async def apaginate_queryset(self, queryset, request):
+        self.request = request
+        page_size = self.get_page_size(request)
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached_property; fill it without a sync COUNT.
+        paginator.count = await queryset.acount()
+        try:
+            self.page = paginator.page(self.get_page_number(request, paginator))
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(
+                page_number=request.query_params.get(self.page_query_param, 1), message=str(exc),
+            ))
+        # A page is small enough to fetch (and prefetch) in one go. aiterator()
+        # would also look up the connection on the event loop's side, leaving
+        # an extra DatabaseWrapper behind per request under async_to_sync().
+        self.page.object_list = [row async for row in self.page.object_list]
+        return self.page.object_list
+
+
+class AsyncKeysetPagination(KeysetPagination):
+    """``KeysetPagination`` for async views: page numbers with ``count`` by
+    default, keyset pages on ``?cursor=``, exactly as on the sync endpoints.
+
+    The ordering is taken from the queryset, which the view orders itself.
+    """
+    legacy_pagination_class = AsyncPageNumberPagination
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        self.legacy = None
+        if self.cursor_query_param not in request.query_params:
+            self.legacy = self.legacy_pagination_class()
+            return await self.legacy.apaginate_queryset(queryset, request)
+        return self._set_page([row async for row in self._seek_queryset(queryset, request, view)])
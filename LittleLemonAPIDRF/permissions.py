@@ -1,25 +1,23 @@
 from rest_framework.permissions import BasePermission, SAFE_METHODS
+from .roles import is_manager, is_delivery_crew, is_customer
 
 class IsManager(BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='Manager').exists()
+        return is_manager(request)
 
 
 class IsDeliveryCrew(BasePermission):
     def has_permission(self, request, view):
-        return request.user.groups.filter(name='Delivery crew').exists()
+        return is_delivery_crew(request)
 
 
 class IsCustomer(BasePermission):
     def has_permission(self, request, view):
-        return not (
-            request.user.groups.filter(name='Manager').exists() or
-            request.user.groups.filter(name='Delivery crew').exists()
-        )
+        return is_customer(request)
 
 
 class IsManagerOrReadOnly(BasePermission):
     def has_permission(self, request, view):
         if request.method in SAFE_METHODS:
             return True
-        return request.user.groups.filter(name='Manager').exists()
+        return is_manager(request)
@@ -0,0 +1,120 @@
+import time
+from functools import partial
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+MANAGER = 'Manager'
+DELIVERY_CREW = 'Delivery crew'
+
+_REQUEST_ATTR = '_littlelemon_roles'
+
+
+def _cache_timeout():
+    # Seconds a user's group names are kept in the default cache; 0 (the
+    # default) only memoizes them per request. See settings.py.
+    return getattr(settings, 'LITTLE_LEMON_ROLE_CACHE_TIMEOUT', 0)
+
+
+def _cache_key(user_id):
+    return f'littlelemon:roles:{user_id}'
+
+
+def _version_key(user_id):
+    return f'littlelemon:roles:{user_id}:version'
+
+
+def _cached(found, user_id):
+    # Entries are (version, roles) and only count while the version is current.
+    entry, version = found.get(_cache_key(user_id)), found.get(_version_key(user_id))
+    if entry is None or version is None or entry[0] != version:
+        return None, version
+    return entry[1], version
+
+
+def get_user_roles(user):
+    """Return the set of group names ``user`` belongs to."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+    timeout = _cache_timeout()
+    if not timeout:
+        return frozenset(user.groups.values_list('name', flat=True))
+    roles, version = _cached(cache.get_many([_cache_key(user.pk), _version_key(user.pk)]), user.pk)
+    if roles is not None:
+        return roles
+    if version is None:
+        # Seeded from the clock so an evicted version is never reused.
+        cache.add(_version_key(user.pk), time.time_ns(), None)
+        version = cache.get(_version_key(user.pk))
+    # The version was read before the groups, so a change committed in
+    # between leaves this entry stale instead of current.
+    roles = frozenset(user.groups.values_list('name', flat=True))
+    cache.set(_cache_key(user.pk), (version, roles), timeout)
+    return roles
+
+
+async def aget_user_roles(user):
+    """Async ``get_user_roles()`` for views served natively under ASGI."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+    timeout = _cache_timeout()
+    if not timeout:
+        return frozenset([name async for name in user.groups.values_list('name', flat=True)])
+    roles, version = _cached(await cache.aget_many([_cache_key(user.pk), _version_key(user.pk)]), user.pk)
+    if roles is not None:
+        return roles
+    if version is None:
+        await cache.aadd(_version_key(user.pk), time.time_ns(), None)
+        version = await cache.aget(_version_key(user.pk))
+    roles = frozenset([name async for name in user.groups.values_list('name', flat=True)])
+    await cache.aset(_cache_key(user.pk), (version, roles), timeout)
+    return roles
+
+
+def get_roles(request):
+    """Return the caller's group names, loading them at most once per request."""
+    roles = getattr(request, _REQUEST_ATTR, None)
+    if roles is None:
+        roles = get_user_roles(request.user)
+        setattr(request, _REQUEST_ATTR, roles)
+    return roles
+
+
+async def aget_roles(request):
+    roles = getattr(request, _REQUEST_ATTR, None)
+    if roles is None:
+        roles = await aget_user_roles(request.user)
+        setattr(request, _REQUEST_ATTR, roles)
+    return roles
+
+
+def is_manager(request):
+    return MANAGER in get_roles(request)
+
+
+def is_delivery_crew(request):
+    return DELIVERY_CREW in get_roles(request)
+
+
+def is_customer(request):
+    roles = get_roles(request)
+    return MANAGER not in roles and DELIVERY_CREW not in roles
+
+
+def _bump_versions(user_ids):
+    for user_id in user_ids:
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            # No version means no entry was stored under one.
+            pass
+
+
+def invalidate_user_roles(*user_ids):
+    """Drop cached roles of ``user_ids`` once the current transaction commits.
+
+    Invalidating earlier would let a request that still sees the old groups
+    cache them again under the new version.
+    """
+    if user_ids and _cache_timeout():
+        transaction.on_commit(partial(_bump_versions, user_ids))
@@ -0,0 +1,165 @@
+import re
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+from .models import MenuItem
+
+FTS_TABLE = 'LittleLemonAPIDRF_menuitem_fts'
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query.lower())
+
+
+class SearchBackend:
+    """Full-text search over ``MenuItem.title`` and ``MenuItem.category``.
+
+    ``match()`` and ``rank()`` return SQL expressions for the matching rows
+    and their ``search_rank`` (lower is better); they are the only part a
+    database-specific backend has to provide. Both stay inside the menu query,
+    so the paginator's LIMIT/OFFSET or cursor applies to the full-text query
+    itself and every match can be paged to. Every term is matched as a
+    prefix and all terms must match.
+    """
+
+    def match(self, terms):
+        raise NotImplementedError
+
+    def rank(self, terms):
+        raise NotImplementedError
+
+    def index(self, item):
+        pass
+
+    def remove(self, pk):
+        pass
+
+    def reindex(self, pks):
+        """Re-index the items ``pks``, e.g. after bulk writes that bypassed signals."""
+        pass
+
+    def rebuild(self):
+        """Re-index the whole menu."""
+        pass
+
+    def filter_queryset(self, queryset, terms):
+        return queryset.filter(self.match(terms)).annotate(search_rank=self.rank(terms))
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 virtual table kept in sync by the MenuItem signals."""
+
+    @staticmethod
+    def _query(terms):
+        return ' '.join('"%s"*' % term for term in terms)
+
+    def match(self, terms):
+        return Q(pk__in=RawSQL(
+            f'SELECT rowid FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s', [self._query(terms)],
+        ))
+
+    def rank(self, terms):
+        # bm25() only works next to its MATCH, hence one lookup per row by rowid.
+        return RawSQL(
+            f'SELECT bm25("{FTS_TABLE}", 2.0, 1.0) FROM "{FTS_TABLE}" '
+            f'WHERE "{FTS_TABLE}" MATCH %s AND rowid = "{MenuItem._meta.db_table}"."id"',
+            [self._query(terms)], output_field=FloatField(),
+        )
+
+    def index(self, item):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{FTS_TABLE}" WHERE rowid = %s', [item.pk])
+            cursor.execute(
+                f'INSERT INTO "{FTS_TABLE}" (rowid, title, category) VALUES (%s, %s, %s)',
+                [item.pk, item.title, item.category],
+            )
+
+    def remove(self, pk):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{FTS_TABLE}" WHERE rowid = %s', [pk])
+
+    def reindex(self, pks):
+        if not pks:
+            return
+        placeholders = ', '.join(['%s'] * len(pks))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{FTS_TABLE}" WHERE rowid IN ({placeholders})', pks)
+            cursor.execute(
+                f'INSERT INTO "{FTS_TABLE}" (rowid, title, category) '
+                f'SELECT id, title, category FROM "{MenuItem._meta.db_table}" WHERE id IN ({placeholders})',
+                pks,
+            )
+
+    def rebuild(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{FTS_TABLE}"')
+            cursor.execute(
+                f'INSERT INTO "{FTS_TABLE}" (rowid, title, category) '
+                f'SELECT id, title, category FROM "{MenuItem._meta.db_table}"'
+            )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """tsvector search served by the GIN expression index from migration 0004.
+
+    The index covers an expression over the row itself, so PostgreSQL keeps it
+    current on every write and ``index()``/``remove()`` have nothing to do.
+    """
+    vector = "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(category, ''))"
+
+    @staticmethod
+    def _query(terms):
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def match(self, terms):
+        return RawSQL(f"{self.vector} @@ to_tsquery('simple', %s)", [self._query(terms)],
+                      output_field=BooleanField())
+
+    def rank(self, terms):
+        # Negated so that, as on SQLite, the best match sorts first.
+        return RawSQL(f"-ts_rank({self.vector}, to_tsquery('simple', %s))", [self._query(terms)],
+                      output_field=FloatField())
+
+
+class FallbackSearchBackend(SearchBackend):
+    """``icontains`` scan for databases without a full-text backend."""
+
+    def filter_queryset(self, queryset, terms):
+        for term in terms:
+            queryset = queryset.filter(Q(title__icontains=term) | Q(category__icontains=term))
+        return queryset
+
+
+BACKENDS = {
+    'sqlite': SQLiteSearchBackend,
+    'postgresql': PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    path = getattr(settings, 'LITTLE_LEMON_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return BACKENDS.get(connection.vendor, FallbackSearchBackend)()
+
+
+class MenuSearchFilter(BaseFilterBackend):
+    """``?search=`` over title and category, ranked best match first.
+
+    Ranking only decides the order when the client has not asked for an
+    explicit ``?ordering=``.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        terms = search_terms(request.query_params.get(self.search_param, ''))
+        if not terms:
+            return queryset
+        queryset = get_search_backend().filter_queryset(queryset, terms)
+        if 'search_rank' in queryset.query.annotations and not request.query_params.get(api_settings.ORDERING_PARAM):
+            queryset = queryset.order_by('search_rank', 'id')
+        return queryset
@@ -1,17 +1,23 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import MenuItem, Cart, Order, OrderItem
+from .models import MenuItem, Cart, Order, OrderItem, DailySales
+from .instrumentation import InstrumentedSerializerMixin
+from .fieldsets import SparseFieldsMixin
+from .roles import DELIVERY_CREW
 
-class MenuItemSerializer(serializers.ModelSerializer):
+class MenuItemSerializer(InstrumentedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = MenuItem
         fields = '__all__'
 
 
-class CartSerializer(serializers.ModelSerializer):
+class CartSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     unit_price = serializers.DecimalField(max_digits=6, decimal_places=2, read_only=True)
     price = serializers.DecimalField(max_digits=6, decimal_places=2, read_only=True)
     user = serializers.PrimaryKeyRelatedField(read_only=True)
+    reserved_until = serializers.DateTimeField(read_only=True)
+    # Adding a line can only add to it; the batch endpoint sets or removes lines.
+    quantity = serializers.IntegerField(min_value=1, max_value=32767)
     
     class Meta:
         model = Cart
@@ -25,12 +31,30 @@ class CartSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user  # Important for automatic user
         return super().create(validated_data)
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class CartLineListSerializer(serializers.ListSerializer):
+    def validate(self, attrs):
+        ids = [line['menuitem'] for line in attrs]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError('Each menu item may only appear once.')
+        missing = set(ids) - set(MenuItem.objects.filter(pk__in=ids).values_list('pk', flat=True))
+        if missing:
+            raise serializers.ValidationError(f'Unknown menu items: {sorted(missing)}.')
+        return attrs
+
+class CartLineSerializer(serializers.Serializer):
+    """One ``{menuitem, quantity}`` line of a cart batch; quantity 0 removes the line."""
+    menuitem = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, max_value=32767)
+
+    class Meta:
+        list_serializer_class = CartLineListSerializer
+
+class OrderItemSerializer(InstrumentedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = '__all__'
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(InstrumentedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     order_items = OrderItemSerializer(many=True, read_only=True)
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     delivery_crew = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False)
@@ -39,10 +63,44 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ['id', 'user', 'delivery_crew', 'status', 'total', 'date', 'order_items']
 
-class SimpleUserSerializer(serializers.ModelSerializer):
+class SimpleUserSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email']
 
 class GroupUserSerializer(serializers.Serializer):
     user = serializers.IntegerField()
+
+
+class DispatchClaimSerializer(serializers.Serializer):
+    count = serializers.IntegerField(min_value=1, default=1)
+
+    def validate_count(self, value):
+        limit = self.context['max_claim']
+        if value > limit:
+            raise serializers.ValidationError(f'At most {limit} orders can be claimed at once.')
+        return value
+
+class DispatchAssignSerializer(serializers.Serializer):
+    orders = serializers.ListField(child=serializers.IntegerField(), min_length=1, max_length=1000)
+    delivery_crew = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.filter(groups__name=DELIVERY_CREW), allow_null=True)
+
+
+class DailySalesSerializer(InstrumentedSerializerMixin, serializers.ModelSerializer):
+    class Meta:
+        model = DailySales
+        fields = ['day', 'orders', 'delivered', 'revenue']
+
+class TopItemSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+    menuitem = serializers.IntegerField(source='menuitem_id', allow_null=True)
+    title = serializers.CharField()
+    category = serializers.CharField()
+    quantity = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+class CrewDeliveriesSerializer(InstrumentedSerializerMixin, serializers.Serializer):
+    delivery_crew = serializers.IntegerField(source='delivery_crew_id')
+    username = serializers.CharField()
+    assigned = serializers.IntegerField()
+    delivered = serializers.IntegerField()
@@ -1,8 +1,100 @@
-from django.db.models.signals import post_migrate
-from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate, post_save, post_delete, pre_delete, m2m_changed
+from django.contrib.auth.models import Group, User
+from rest_framework.authtoken.models import Token
 from django.dispatch import receiver
+from django.utils import timezone
+from .models import MenuItem, Order
+from .roles import MANAGER, DELIVERY_CREW, invalidate_user_roles
+from .menu_cache import bump_menu_version
+from .search import get_search_backend
+from .instrumentation import install_query_recorder
+from .authentication import invalidate_tokens
 
 @receiver(post_migrate)
 def create_user_groups(sender, **kwargs):
-    Group.objects.get_or_create(name='Manager')
-    Group.objects.get_or_create(name='Delivery crew')
+    Group.objects.get_or_create(name=MANAGER)
+    Group.objects.get_or_create(name=DELIVERY_CREW)
+
+
+# Role cache invalidation
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_user_roles(instance.pk)
+    elif action == 'pre_clear':
+        invalidate_user_roles(*instance.user_set.values_list('pk', flat=True))
+    elif pk_set:
+        invalidate_user_roles(*pk_set)
+
+
+@receiver(pre_delete, sender=Group)
+def invalidate_roles_on_group_delete(sender, instance, **kwargs):
+    invalidate_user_roles(*instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Group)
+def invalidate_roles_on_group_rename(sender, instance, created, **kwargs):
+    # Roles are cached by group name.
+    if not created:
+        invalidate_user_roles(*instance.user_set.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=User)
+def invalidate_roles_on_user_save(sender, instance, created, **kwargs):
+    # Primary keys can be reused (e.g. after a rolled back transaction), so a
+    # freshly created user must never inherit a stale cache entry.
+    if created:
+        invalidate_user_roles(instance.pk)
+
+
+# Token cache invalidation
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    invalidate_tokens(instance.key)
+
+
+@receiver(post_save, sender=User)
+def invalidate_tokens_on_user_save(sender, instance, created, update_fields, **kwargs):
+    # Cached users are snapshots, so any change (deactivation above all) must
+    # evict them. Logins only touch last_login, which nothing reads from them.
+    if created or update_fields == frozenset(['last_login']):
+        return
+    invalidate_tokens(*Token.objects.filter(user_id=instance.pk).values_list('key', flat=True))
+
+
+# Menu cache invalidation
+@receiver(post_save, sender=MenuItem)
+@receiver(post_delete, sender=MenuItem)
+def invalidate_menu_cache(sender, **kwargs):
+    # After commit: bumped earlier, a concurrent reader could still cache the
+    # old row under the new version.
+    transaction.on_commit(bump_menu_version)
+
+
+# Order validators
+@receiver(pre_delete, sender=MenuItem)
+def touch_orders_on_menu_item_delete(sender, instance, **kwargs):
+    # Deleting the item nulls order_items[].menuitem with a bulk UPDATE, which
+    # leaves updated_at (and so the orders' ETag and Last-Modified) alone.
+    Order.objects.filter(order_items__menuitem=instance).update(updated_at=timezone.now())
+
+
+# Search index synchronisation
+@receiver(post_save, sender=MenuItem)
+def index_menu_item(sender, instance, **kwargs):
+    get_search_backend().index(instance)
+
+
+@receiver(post_delete, sender=MenuItem)
+def unindex_menu_item(sender, instance, **kwargs):
+    get_search_backend().remove(instance.pk)
+
+
+# Request instrumentation
+@receiver(connection_created)
+def record_queries_on_connection(sender, connection, **kwargs):
+    install_query_recorder(connection)
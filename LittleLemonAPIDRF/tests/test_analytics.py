@@ -0,0 +1,97 @@
+# LittleLemonAPIDRF/tests/test_analytics.py
+
+from decimal import Decimal
+from io import StringIO
+from django.contrib.auth.models import User, Group
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.checkout import place_order
+from LittleLemonAPIDRF.models import MenuItem, Cart, Order, DailySales, DailyItemSales, DailyCrewDeliveries
+
+class TestAnalytics(APITestCase):
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.crew = User.objects.create_user(username='crew', password='testpass')
+        self.crew.groups.add(Group.objects.get_or_create(name='Delivery crew')[0])
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.pizza = MenuItem.objects.create(title="Pizza", price=10.00, inventory=100)
+        self.soup = MenuItem.objects.create(title="Soup", price=4.00, inventory=100)
+
+    def checkout(self, **quantities):
+        for title, quantity in quantities.items():
+            item = MenuItem.objects.get(title=title.capitalize())
+            Cart.objects.create(user=self.customer, menuitem=item, quantity=quantity,
+                                unit_price=item.price, price=item.price * quantity)
+        return place_order(self.customer)
+
+    def summary(self):
+        return (
+            list(DailySales.objects.values_list('orders', 'delivered', 'revenue')),
+            sorted(DailyItemSales.objects.values_list('title', 'quantity', 'revenue')),
+            list(DailyCrewDeliveries.objects.values_list('delivery_crew_id', 'assigned', 'delivered')),
+        )
+
+    def test_checkout_and_status_changes_update_summaries(self):
+        print("Test checkout and status changes update summaries")
+
+        order = self.checkout(pizza=2, soup=1)
+        self.checkout(pizza=1)
+        self.client.force_authenticate(user=self.manager)
+        self.client.patch(f'/api/orders/{order.id}/', {'delivery_crew': self.crew.id}, format='json')
+        self.client.force_authenticate(user=self.crew)
+        self.client.patch(f'/api/orders/{order.id}/', {'status': 1}, format='json')
+
+        sales, items, crew = self.summary()
+        self.assertEqual(sales, [(2, 1, Decimal('34.00'))])
+        self.assertEqual(items, [('Pizza', 3, Decimal('30.00')), ('Soup', 1, Decimal('4.00'))])
+        self.assertEqual(crew, [(self.crew.id, 1, 1)])
+
+    def test_delete_and_rebuild_agree_with_incremental_totals(self):
+        print("Test delete and rebuild agree with incremental totals")
+
+        order = self.checkout(pizza=1, soup=2)
+        self.checkout(soup=1)
+        self.client.force_authenticate(user=self.manager)
+        self.client.patch(f'/api/orders/{order.id}/', {'delivery_crew': self.crew.id, 'status': True}, format='json')
+        self.client.delete(f'/api/orders/{Order.objects.latest("id").id}/')
+        incremental = self.summary()
+
+        call_command('rebuild_analytics', stdout=StringIO())
+        self.assertEqual(self.summary(), incremental)
+        self.assertEqual(incremental[0], [(1, 1, Decimal('18.00'))])
+
+    def test_deleted_menu_items_keep_their_history(self):
+        print("Test deleted menu items keep their history")
+
+        order = self.checkout(pizza=1, soup=2)
+        self.checkout(soup=1)
+        self.soup.delete()
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get('/api/analytics/top-items/?from=2000-01-01')
+        self.assertEqual([(row['menuitem'], row['title'], row['quantity']) for row in response.data],
+                         [(None, 'Soup', 3), (self.pizza.id, 'Pizza', 1)])
+
+        self.client.delete(f'/api/orders/{order.id}/')
+        incremental = self.summary()
+        self.assertEqual(incremental[1], [('Pizza', 0, Decimal('0.00')), ('Soup', 1, Decimal('4.00'))])
+        call_command('rebuild_analytics', stdout=StringIO())
+        self.assertEqual(sorted(row for row in self.summary()[1] if row[1]), [('Soup', 1, Decimal('4.00'))])
+
+    def test_endpoints_are_manager_only(self):
+        print("Test analytics endpoints are manager only")
+
+        self.checkout(pizza=3, soup=1)
+        today = timezone.localdate().isoformat()
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get(f'/api/analytics/top-items/?from={today}&to={today}&limit=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'menuitem': self.pizza.id, 'title': 'Pizza', 'category': '', 'quantity': 3, 'revenue': '30.00'}])
+        response = self.client.get('/api/analytics/daily-sales/')
+        self.assertEqual(response.data[0]['revenue'], '34.00')
+
+        self.client.force_authenticate(user=self.customer)
+        self.assertEqual(self.client.get('/api/analytics/crew-deliveries/').status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,122 @@
+# LittleLemonAPIDRF/tests/test_async_views.py
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Order, OrderItem
+
+class TestAsyncViews(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.menu_item = MenuItem.objects.create(title="Pizza", price=10.00, inventory=10)
+        MenuItem.objects.create(title="Bruschetta", price=6.00, inventory=10)
+        self.orders = [Order.objects.create(user=self.customer, total=10) for _ in range(3)]
+        OrderItem.objects.create(order=self.orders[0], menuitem=self.menu_item, quantity=1, unit_price=10, price=10)
+        Order.objects.create(user=self.manager, total=5)
+
+    def authenticate(self, user):
+        token = Token.objects.create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_menu_list_matches_sync_ordering(self):
+        print("Test async menu list matches sync ordering")
+
+        response = self.client.get('/api/async/menu-items/?ordering=title')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = response.json()
+        self.assertEqual(body['count'], 2)
+        self.assertEqual([item['title'] for item in body['results']], ["Bruschetta", "Pizza"])
+
+        etag = response['ETag']
+        response = self.client.get('/api/async/menu-items/?ordering=title', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_orders_are_scoped_to_customer(self):
+        print("Test async orders are scoped to customer")
+
+        self.authenticate(self.customer)
+        response = self.client.get('/api/async/orders/?page_size=2')
+        body = response.json()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(body['count'], 3)
+        self.assertEqual([order['id'] for order in body['results']], [self.orders[2].id, self.orders[1].id])
+        self.assertIsNotNone(body['next'])
+
+    def test_order_detail_includes_items(self):
+        print("Test async order detail includes items")
+
+        self.authenticate(self.manager)
+        response = self.client.get(f'/api/async/orders/{self.orders[0].id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['order_items'][0]['menuitem'], self.menu_item.id)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/async/orders/{self.orders[0].id}/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # A match is answered from updated_at alone.
+        self.assertFalse(any('orderitem' in query['sql'] for query in ctx.captured_queries))
+        self.assertEqual(self.client.get('/api/async/orders/999/').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_detail_is_stale_after_its_menu_item_is_deleted(self):
+        print("Test async order detail is stale after its menu item is deleted")
+
+        self.authenticate(self.manager)
+        etag = self.client.get(f'/api/async/orders/{self.orders[0].id}/')['ETag']
+        self.menu_item.delete()
+        response = self.client.get(f'/api/async/orders/{self.orders[0].id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.json()['order_items'][0]['menuitem'])
+
+    def test_cursor_pages_match_sync_endpoint(self):
+        print("Test async cursor pages match the sync endpoint")
+
+        self.authenticate(self.customer)
+        sync = self.client.get('/api/orders/?cursor=&page_size=2').json()
+        body = self.client.get('/api/async/orders/?cursor=&page_size=2').json()
+        self.assertEqual(set(body), set(sync))
+        self.assertNotIn('count', body)
+        self.assertEqual(body['results'], sync['results'])
+        rest = self.client.get(body['next']).json()
+        self.assertEqual([order['id'] for order in rest['results']], [self.orders[0].id])
+        self.assertIsNone(rest['next'])
+
+    def test_renderer_is_negotiated(self):
+        print("Test async views negotiate the renderer")
+
+        response = self.client.get('/api/async/menu-items/', HTTP_ACCEPT='application/xml')
+        self.assertEqual(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertIn('detail', response.json())
+
+        response = self.client.get('/api/async/menu-items/', HTTP_ACCEPT='application/json; indent=2')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.content.startswith(b'{\n  "count": 2'))
+
+    def test_orders_require_valid_token(self):
+        print("Test async orders require a valid token")
+
+        response = self.client.get('/api/async/orders/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response['WWW-Authenticate'], 'Token')
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        response = self.client.get('/api/async/orders/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(response.json(), {'detail': 'Invalid token.'})
+
+    @override_settings(LITTLE_LEMON_SERVER_TIMING_HEADER=True)
+    async def test_served_through_asgi_handler(self):
+        print("Test async menu list is served through the ASGI handler")
+
+        response = await self.async_client.get('/api/async/menu-items/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('db;dur=', response['Server-Timing'])
@@ -0,0 +1,53 @@
+# LittleLemonAPIDRF/tests/test_benchmarks.py
+
+from rest_framework.test import APITestCase
+from LittleLemonAPIDRF import benchmarks
+
+class TestBenchmarkHarness(APITestCase):
+
+    def test_every_scenario_runs_cleanly(self):
+        print("Test every benchmark scenario runs cleanly")
+
+        fixture = benchmarks.seed(menu_items=30, orders=60, customers=5, crew=2, batch_size=25)
+        results = benchmarks.run_benchmarks(fixture, requests=2, warmup=1)
+        self.assertEqual(set(results), {scenario.name for scenario in benchmarks.SCENARIOS})
+        failing = {name: result for name, result in results.items() if result['failures']}
+        self.assertEqual(failing, {})
+
+    def test_export_benchmark_streams_every_order(self):
+        print("Test export benchmark streams every order")
+
+        fixture = benchmarks.seed(menu_items=10, orders=40, customers=3, crew=2, batch_size=25)
+        results = benchmarks.run_export_benchmark(fixture)
+        self.assertEqual(results['orders export (ndjson)']['rows'], 40)
+        self.assertGreaterEqual(results['orders export (csv)']['rows'], 40)
+
+    def test_connection_benchmark_runs_each_max_age(self):
+        print("Test connection benchmark runs each CONN_MAX_AGE")
+
+        fixture = benchmarks.seed(menu_items=10, orders=20, customers=3, crew=2, batch_size=25)
+        scenarios = [s for s in benchmarks.SCENARIOS if s.name in ('order detail', 'async orders list (customer)')]
+        results = benchmarks.run_connection_benchmark(fixture, scenarios, requests=2, warmup=1, max_ages=(0, 60))
+        self.assertEqual(set(results), {'order detail', 'async orders list (customer)'})
+        for by_age in results.values():
+            self.assertEqual(set(by_age), {0, 60})
+            self.assertEqual([result['failures'] for result in by_age.values()], [0, 0])
+
+    def test_json_benchmark_renders_identical_output(self):
+        print("Test JSON benchmark renders identical output")
+
+        benchmarks.seed(menu_items=10, orders=20, customers=3, crew=2, batch_size=25)
+        results = benchmarks.run_json_benchmark(benchmarks.json_payloads(page_size=10), iterations=2)
+        self.assertEqual(set(results), {'menu page', 'orders page', 'order rows'})
+        self.assertTrue(all(result['identical'] for result in results.values()))
+
+    def test_regressions_against_baseline(self):
+        print("Test regressions against baseline")
+
+        baseline = {'orders': {'p95_ms': 10.0, 'queries_per_request': 3, 'failures': 0}}
+        ok = {'orders': {'p95_ms': 14.0, 'queries_per_request': 3, 'failures': 0}}
+        slow = {'orders': {'p95_ms': 16.0, 'queries_per_request': 3, 'failures': 0}}
+        chatty = {'orders': {'p95_ms': 5.0, 'queries_per_request': 4, 'failures': 0}}
+        self.assertEqual(benchmarks.compare_to_baseline(ok, baseline, tolerance=0.5), [])
+        self.assertEqual(len(benchmarks.compare_to_baseline(slow, baseline, tolerance=0.5)), 1)
+        self.assertEqual(len(benchmarks.compare_to_baseline(chatty, baseline, tolerance=0.5)), 1)
@@ -0,0 +1,125 @@
+# LittleLemonAPIDRF/tests/test_cart_store.py
+
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.cart import get_cart_store
+from LittleLemonAPIDRF.models import MenuItem, Cart, OrderItem
+
+@override_settings(LITTLE_LEMON_CART_STORE='LittleLemonAPIDRF.cart.CacheCartStore')
+class TestCacheCartStore(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.other = User.objects.create_user(username='other', password='testpass')
+        self.pizza = MenuItem.objects.create(title="Pizza", price=10, inventory=5)
+        self.salad = MenuItem.objects.create(title="Salad", price=5, inventory=5)
+        self.client.force_authenticate(user=self.customer)
+
+    def inventory(self):
+        return dict(MenuItem.objects.values_list('title', 'inventory'))
+
+    def flush(self):
+        out = StringIO()
+        call_command('flush_carts', stdout=out)
+        return out.getvalue().strip()
+
+    def test_cart_is_kept_out_of_the_database_until_flushed(self):
+        print("Test cart is kept out of the database until flushed")
+
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 2}, format='json')
+        response = self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['quantity'], response.data['price']), (3, '30.00'))
+        self.client.post('/api/cart/menu-items/batch/', [{"menuitem": self.salad.id, "quantity": 1}], format='json')
+
+        response = self.client.get('/api/cart/menu-items/')
+        self.assertEqual([(line['menuitem'], line['quantity']) for line in response.data['results']],
+                         [(self.pizza.id, 3), (self.salad.id, 1)])
+        self.assertFalse(Cart.objects.exists())
+        self.assertEqual(self.inventory(), {'Pizza': 5, 'Salad': 5})
+
+        self.assertEqual(self.flush(), 'Flushed 1 cart(s).')
+        self.assertEqual(sorted(Cart.objects.values_list('menuitem_id', 'quantity', 'reserved_until')),
+                         [(self.pizza.id, 3, None), (self.salad.id, 1, None)])
+        self.assertEqual(self.flush(), 'Flushed 0 cart(s).')
+
+    def test_flush_survives_an_evicted_log(self):
+        print("Test flush survives an evicted log")
+
+        for quantity in (1, 2):
+            self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": quantity}, format='json')
+            self.flush()
+        cache.delete('littlelemon:cart:dirty')  # evicted; the flushed mark is not
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.salad.id, "quantity": 1}, format='json')
+        self.assertEqual(self.flush(), 'Flushed 1 cart(s).')
+        self.assertEqual(sorted(Cart.objects.values_list('menuitem_id', 'quantity')),
+                         [(self.pizza.id, 3), (self.salad.id, 1)])
+
+    def test_concurrent_flush_is_skipped(self):
+        print("Test concurrent flush is skipped")
+
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 2}, format='json')
+        cache.add('littlelemon:cart:dirty:lock', 1)
+        self.assertEqual(self.flush(), 'Another flush is running; nothing done.')
+        self.assertFalse(Cart.objects.exists())
+        cache.delete('littlelemon:cart:dirty:lock')
+        self.assertEqual(self.flush(), 'Flushed 1 cart(s).')
+
+    def test_lost_cache_falls_back_to_last_flush(self):
+        print("Test lost cache falls back to last flush")
+
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 2}, format='json')
+        self.flush()
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.salad.id, "quantity": 1}, format='json')
+        cache.clear()
+
+        lines = get_cart_store().lines(self.customer)
+        self.assertEqual([(line.menuitem_id, line.quantity) for line in lines], [(self.pizza.id, 2)])
+        self.assertEqual(self.inventory(), {'Pizza': 5, 'Salad': 5})
+
+    def test_checkout_persists_the_cached_cart_and_takes_stock(self):
+        print("Test checkout persists the cached cart and takes stock")
+
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 2}, format='json')
+        response = self.client.post('/api/orders/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(OrderItem.objects.values_list('menuitem_id', 'quantity')), [(self.pizza.id, 2)])
+        self.assertEqual(self.inventory()['Pizza'], 3)
+        self.assertFalse(Cart.objects.exists())
+        self.assertEqual(self.client.get('/api/cart/menu-items/').data['results'], [])
+
+        response = self.client.post('/api/orders/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_checkout_fails_when_stock_went_since_adding(self):
+        print("Test checkout fails when stock went since adding")
+
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 4}, format='json')
+        self.client.force_authenticate(user=self.other)
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 3}, format='json')
+        self.assertEqual(self.client.post('/api/orders/').status_code, status.HTTP_201_CREATED)
+
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.post('/api/orders/')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(self.inventory()['Pizza'], 2)
+        self.assertEqual(self.client.get('/api/cart/menu-items/').data['results'][0]['quantity'], 4)
+
+    def test_clear_empties_cache_and_releases_flushed_reservations(self):
+        print("Test clear empties cache and releases flushed reservations")
+
+        with self.settings(LITTLE_LEMON_CART_STORE='LittleLemonAPIDRF.cart.DatabaseCartStore'):
+            self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 2}, format='json')
+        self.assertEqual(self.inventory()['Pizza'], 3)
+
+        self.assertEqual(len(self.client.get('/api/cart/menu-items/').data['results']), 1)
+        response = self.client.delete('/api/cart/menu-items/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.inventory()['Pizza'], 5)
+        self.assertEqual(self.client.get('/api/cart/menu-items/').data['results'], [])
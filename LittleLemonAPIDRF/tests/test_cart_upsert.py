@@ -0,0 +1,76 @@
+# LittleLemonAPIDRF/tests/test_cart_upsert.py
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Cart
+
+class TestCartUpsert(APITestCase):
+
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.pizza = MenuItem.objects.create(title="Pizza", price=10, inventory=5)
+        self.salad = MenuItem.objects.create(title="Salad", price=5, inventory=5)
+        self.soup = MenuItem.objects.create(title="Soup", price=4, inventory=5)
+        self.client.force_authenticate(user=self.customer)
+
+    def inventory(self):
+        return dict(MenuItem.objects.values_list('title', 'inventory'))
+
+    def test_adding_same_item_twice_increments_quantity(self):
+        print("Test adding the same item twice increments quantity")
+
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 2}, format='json')
+        response = self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['quantity'], response.data['price']), (3, '30.00'))
+        self.assertEqual(Cart.objects.count(), 1)
+        self.assertEqual(self.inventory()['Pizza'], 2)
+
+    def test_batch_sets_lines_and_reserves_only_the_difference(self):
+        print("Test batch sets lines and reserves only the difference")
+
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 3}, format='json')
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.soup.id, "quantity": 1}, format='json')
+        lines = [
+            {"menuitem": self.pizza.id, "quantity": 1},
+            {"menuitem": self.salad.id, "quantity": 2},
+            {"menuitem": self.soup.id, "quantity": 0},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/cart/menu-items/batch/', lines, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(line['menuitem'], line['quantity'], line['unit_price'], line['price']) for line in response.data],
+            [(self.pizza.id, 1, '10.00', '10.00'), (self.salad.id, 2, '5.00', '10.00')],
+        )
+        self.assertEqual(self.inventory(), {'Pizza': 4, 'Salad': 3, 'Soup': 5})
+        writes = [q['sql'] for q in queries.captured_queries if q['sql'].startswith('INSERT INTO "LittleLemonAPIDRF_cart"')]
+        self.assertEqual(len(writes), 1)
+
+    def test_batch_is_all_or_nothing(self):
+        print("Test batch is all or nothing")
+
+        lines = [{"menuitem": self.pizza.id, "quantity": 1}, {"menuitem": self.salad.id, "quantity": 6}]
+        response = self.client.post('/api/cart/menu-items/batch/', lines, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Cart.objects.exists())
+        self.assertEqual(self.inventory()['Pizza'], 5)
+
+        response = self.client.post('/api/cart/menu-items/batch/', [{"menuitem": 999, "quantity": 1}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post('/api/cart/menu-items/batch/', [], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_adding_zero_or_negative_quantity_is_rejected(self):
+        print("Test adding zero or negative quantity is rejected")
+
+        self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": 2}, format='json')
+        for quantity in (0, -2):
+            response = self.client.post('/api/cart/menu-items/', {"menuitem": self.pizza.id, "quantity": quantity}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('quantity', response.data)
+        self.assertEqual(Cart.objects.get().quantity, 2)
+        self.assertEqual(self.inventory()['Pizza'], 3)
@@ -0,0 +1,51 @@
+# LittleLemonAPIDRF/tests/test_checkout.py
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Cart, Order, OrderItem
+from LittleLemonAPIDRF.checkout import place_order
+
+class TestCheckout(APITestCase):
+
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.menu_items = [
+            MenuItem.objects.create(title=f"Item {i}", price=2 + i, inventory=100)
+            for i in range(5)
+        ]
+
+    def fill_cart(self, count):
+        for menuitem in self.menu_items[:count]:
+            Cart.objects.create(user=self.customer, menuitem=menuitem, quantity=2,
+                                unit_price=menuitem.price, price=menuitem.price * 2)
+
+    def checkout_queries(self, count):
+        self.fill_cart(count)
+        with CaptureQueriesContext(connection) as ctx:
+            place_order(self.customer)
+        return len(ctx.captured_queries)
+
+    def test_checkout_writes_order_and_clears_cart(self):
+        print("Test checkout writes order and clears cart")
+
+        self.fill_cart(3)
+        order = place_order(self.customer)
+        self.assertEqual(order.total, 2 * (2 + 3 + 4))
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 3)
+        self.assertFalse(Cart.objects.filter(user=self.customer).exists())
+
+    def test_checkout_query_count_is_constant(self):
+        print("Test checkout query count is constant")
+
+        self.assertEqual(self.checkout_queries(1), self.checkout_queries(5))
+
+    def test_empty_cart_is_rejected(self):
+        print("Test empty cart is rejected")
+
+        self.client.force_authenticate(user=self.customer)
+        response = self.client.post('/api/orders/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
@@ -0,0 +1,66 @@
+# LittleLemonAPIDRF/tests/test_conditional_requests.py
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Order, OrderItem
+
+class TestConditionalRequests(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.menu_item = MenuItem.objects.create(title="Pizza", price=10.00, inventory=10)
+        self.order = Order.objects.create(user=self.manager, total=10)
+        self.client.force_authenticate(user=self.manager)
+
+    def test_menu_list_returns_304_for_matching_etag(self):
+        print("Test menu list returns 304 for matching ETag")
+
+        response = self.client.get('/api/menu-items/')
+        etag = response['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/menu-items/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_menu_etag_changes_after_write(self):
+        print("Test menu ETag changes after write")
+
+        etag = self.client.get(f'/api/menu-items/{self.menu_item.id}/')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/menu-items/{self.menu_item.id}/', {"price": 12}, format='json')
+        response = self.client.get(f'/api/menu-items/{self.menu_item.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_order_detail_conditional_get(self):
+        print("Test order detail conditional GET")
+
+        response = self.client.get(f'/api/orders/{self.order.id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        response = self.client.get(f'/api/orders/{self.order.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        response = self.client.get(f'/api/orders/{self.order.id}/',
+                                   HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(f'/api/orders/{self.order.id}/', {"status": True}, format='json')
+        response = self.client.get(f'/api/orders/{self.order.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['status'])
+
+    def test_order_etag_changes_when_its_menu_item_is_deleted(self):
+        print("Test order ETag changes when one of its menu items is deleted")
+
+        OrderItem.objects.create(order=self.order, menuitem=self.menu_item, title="Pizza",
+                                 quantity=1, unit_price=10, price=10)
+        etag = self.client.get(f'/api/orders/{self.order.id}/')['ETag']
+        self.menu_item.delete()
+        response = self.client.get(f'/api/orders/{self.order.id}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['order_items'][0]['menuitem'])
@@ -0,0 +1,49 @@
+# LittleLemonAPIDRF/tests/test_database_config.py
+
+from pathlib import Path
+from django.db import connection
+from rest_framework.test import APITestCase
+from LittleLemonAPI.database import database_config
+
+class TestDatabaseConfig(APITestCase):
+
+    def test_sqlite_defaults_to_tuned_connections_closed_per_request(self):
+        print("Test SQLite defaults to tuned connections closed per request")
+
+        config = database_config({}, Path('/srv/app'))
+        self.assertEqual(config['NAME'], Path('/srv/app/db.sqlite3'))
+        # Persistent connections leak under ASGI, so they are opt-in.
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertIn('PRAGMA journal_mode=WAL', config['OPTIONS']['init_command'])
+        self.assertIn('PRAGMA busy_timeout=5000', config['OPTIONS']['init_command'])
+
+        config = database_config({'DATABASE_CONN_MAX_AGE': 'none', 'DATABASE_SQLITE_PRAGMAS': 'off'}, Path('/srv/app'))
+        self.assertIsNone(config['CONN_MAX_AGE'])
+        self.assertEqual(config['OPTIONS'], {})
+
+    def test_postgresql_pool_replaces_persistent_connections(self):
+        print("Test PostgreSQL pool replaces persistent connections")
+
+        environ = {
+            'DATABASE_ENGINE': 'postgresql', 'DATABASE_NAME': 'lemon', 'DATABASE_HOST': 'db',
+            'DATABASE_CONN_MAX_AGE': '300', 'DATABASE_CONN_HEALTH_CHECKS': 'false',
+        }
+        config = database_config(environ, Path('/srv/app'))
+        self.assertEqual((config['ENGINE'], config['NAME'], config['HOST']), ('django.db.backends.postgresql', 'lemon', 'db'))
+        self.assertEqual(config['CONN_MAX_AGE'], 300)
+        self.assertFalse(config['CONN_HEALTH_CHECKS'])
+
+        config = database_config({**environ, 'DATABASE_POOL': '2:20'}, Path('/srv/app'))
+        self.assertEqual(config['OPTIONS']['pool'], {'min_size': 2, 'max_size': 20})
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertIs(database_config({**environ, 'DATABASE_POOL': 'on'}, Path('/srv/app'))['OPTIONS']['pool'], True)
+        with self.assertRaises(ValueError):
+            database_config({'DATABASE_ENGINE': 'oracle'}, Path('/srv/app'))
+
+    def test_pragmas_are_applied_on_connect(self):
+        print("Test SQLite pragmas are applied on connect")
+
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
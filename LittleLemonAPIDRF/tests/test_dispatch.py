@@ -0,0 +1,93 @@
+# LittleLemonAPIDRF/tests/test_dispatch.py
+
+from unittest import mock
+from django.contrib.auth.models import User, Group
+from django.test import override_settings
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF import dispatch
+from LittleLemonAPIDRF.models import Order, DailyCrewDeliveries
+
+class TestDispatch(APITestCase):
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        crew_group = Group.objects.get_or_create(name='Delivery crew')[0]
+        self.crew = User.objects.create_user(username='crew', password='testpass')
+        self.crew.groups.add(crew_group)
+        self.other_crew = User.objects.create_user(username='crew2', password='testpass')
+        self.other_crew.groups.add(crew_group)
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.orders = [Order.objects.create(user=self.customer, total=10) for _ in range(4)]
+
+    def crew_totals(self):
+        return dict(DailyCrewDeliveries.objects.values_list('delivery_crew_id', 'assigned'))
+
+    def test_crew_claims_oldest_orders_once(self):
+        print("Test crew claims oldest queued orders exactly once")
+
+        self.client.force_authenticate(user=self.crew)
+        response = self.client.post('/api/dispatch/claim/', {'count': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([order['id'] for order in response.data], [order.id for order in self.orders[:3]])
+
+        self.client.force_authenticate(user=self.other_crew)
+        response = self.client.post('/api/dispatch/claim/', {'count': 3}, format='json')
+        self.assertEqual([order['id'] for order in response.data], [self.orders[3].id])
+        self.assertEqual(self.client.post('/api/dispatch/claim/', {}, format='json').data, [])
+        self.assertEqual(self.client.get('/api/dispatch/queue/').data['results'], [])
+        self.assertEqual(self.crew_totals(), {self.crew.id: 3, self.other_crew.id: 1})
+
+    def test_claim_replaces_rows_lost_to_another_claimer(self):
+        print("Test claim replaces rows lost to another claimer")
+
+        stolen = self.orders[0]
+        Order.objects.filter(pk=stolen.pk).update(delivery_crew=self.other_crew)
+        real_queue = dispatch.queue
+        calls = []
+
+        def stale_queue():
+            # The first read still sees the stolen order as unassigned.
+            calls.append(1)
+            if len(calls) == 1:
+                return Order.objects.filter(pk__in=[stolen.pk, self.orders[1].pk]).order_by('date', 'id')
+            return real_queue()
+
+        with mock.patch.object(dispatch, 'queue', stale_queue):
+            claimed = dispatch._claim_compare_and_set(self.crew, 2)
+        self.assertEqual(claimed, [self.orders[1].id, self.orders[2].id])
+        self.assertEqual(Order.objects.get(pk=stolen.pk).delivery_crew, self.other_crew)
+
+    @override_settings(LITTLE_LEMON_DISPATCH_MAX_CLAIM=2)
+    def test_claim_is_limited_and_crew_only(self):
+        print("Test claim is limited and crew only")
+
+        self.client.force_authenticate(user=self.crew)
+        response = self.client.post('/api/dispatch/claim/', {'count': 3}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.customer)
+        self.assertEqual(self.client.post('/api/dispatch/claim/').status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get('/api/dispatch/queue/').status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_manager_bulk_assigns_and_requeues(self):
+        print("Test manager bulk assigns and requeues orders")
+
+        self.client.force_authenticate(user=self.manager)
+        ids = [order.id for order in self.orders[:3]]
+        response = self.client.post('/api/dispatch/assign/',
+                                    {'orders': ids + [999], 'delivery_crew': self.crew.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'assigned': ids, 'missing': [999]})
+        self.assertEqual(Order.objects.filter(delivery_crew=self.crew).count(), 3)
+
+        response = self.client.post('/api/dispatch/assign/',
+                                    {'orders': ids[:1], 'delivery_crew': None}, format='json')
+        self.assertEqual(response.data['assigned'], ids[:1])
+        self.assertEqual([order['id'] for order in self.client.get('/api/dispatch/queue/').data['results']],
+                         [self.orders[0].id, self.orders[3].id])
+        self.assertEqual(self.crew_totals(), {self.crew.id: 2})
+
+        response = self.client.post('/api/dispatch/assign/',
+                                    {'orders': ids, 'delivery_crew': self.customer.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,82 @@
+# LittleLemonAPIDRF/tests/test_events.py
+
+import asyncio
+import json
+from django.contrib.auth.models import User, Group
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.events import InProcessBroker, get_broker
+from LittleLemonAPIDRF.models import Order
+
+class RecordingBroker:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channel, message):
+        self.published.append((channel, message))
+
+
+class TestOrderEvents(APITestCase):
+
+    def setUp(self):
+        crew_group = Group.objects.get_or_create(name='Delivery crew')[0]
+        self.crew = User.objects.create_user(username='crew', password='testpass')
+        self.crew.groups.add(crew_group)
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.stranger = User.objects.create_user(username='stranger', password='testpass')
+        self.order = Order.objects.create(user=self.customer, delivery_crew=self.crew, total=10)
+        self.token = Token.objects.create(user=self.customer).key
+        self.stranger_token = Token.objects.create(user=self.stranger).key
+
+    async def test_broker_delivers_across_threads_and_drops_oldest(self):
+        print("Test broker delivers across threads and drops oldest")
+
+        broker = InProcessBroker()
+        broker.maxsize = 2
+        async with broker.subscribe('order:1') as queue:
+            for n in range(3):
+                await asyncio.to_thread(broker.publish, 'order:1', {'n': n})
+            await asyncio.sleep(0)
+            broker.publish('order:2', {'n': 99})
+            self.assertEqual([queue.get_nowait(), queue.get_nowait()], [{'n': 1}, {'n': 2}])
+            self.assertEqual(broker.subscriber_count('order:1'), 1)
+        self.assertEqual(broker.subscriber_count('order:1'), 0)
+
+    @override_settings(LITTLE_LEMON_EVENT_BROKER='LittleLemonAPIDRF.tests.test_events.RecordingBroker')
+    def test_status_patch_publishes_after_commit(self):
+        print("Test status patch publishes after commit")
+
+        broker = get_broker()
+        self.client.force_authenticate(user=self.crew)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.client.patch(f'/api/orders/{self.order.id}/', {'status': 1}, format='json')
+        self.assertEqual(broker.published, [])
+        for callback in callbacks:
+            callback()
+        channels = [channel for channel, _ in broker.published]
+        self.assertEqual(channels, ['orders', f'order:{self.order.id}', f'user:{self.customer.id}', f'crew:{self.crew.id}'])
+        self.assertIs(broker.published[0][1]['status'], True)
+
+    async def test_order_stream_sends_current_state_then_changes(self):
+        print("Test order stream sends current state then changes")
+
+        response = await self.async_client.get(f'/api/orders/{self.order.id}/events/',
+                                                headers={'Authorization': f'Token {self.token}'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = aiter(response.streaming_content)
+        self.assertTrue((await anext(events)).startswith(b'retry:'))
+        current = (await anext(events)).decode()
+        self.assertIn('"status": false', current)
+
+        get_broker().publish(f'order:{self.order.id}', {'id': self.order.id, 'status': True})
+        pushed = (await anext(events)).decode().splitlines()
+        self.assertEqual(pushed[0], 'event: order')
+        self.assertEqual(json.loads(pushed[1][len('data: '):]), {'id': self.order.id, 'status': True})
+        await events.aclose()
+
+        response = await self.async_client.get(f'/api/orders/{self.order.id}/events/',
+                                                headers={'Authorization': f'Token {self.stranger_token}'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
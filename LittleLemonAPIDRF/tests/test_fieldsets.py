@@ -0,0 +1,93 @@
+# LittleLemonAPIDRF/tests/test_fieldsets.py
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import serializers, status
+from LittleLemonAPIDRF.models import MenuItem, Order, OrderItem
+from LittleLemonAPIDRF.serializers import OrderSerializer, OrderItemSerializer
+
+class TestSparseFieldsets(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.pizza = MenuItem.objects.create(title="Pizza", price=10, inventory=5, category="Mains")
+        for _ in range(3):
+            order = Order.objects.create(user=self.customer, total=10)
+            OrderItem.objects.create(order=order, menuitem=self.pizza, title="Pizza", category="Mains",
+                                     quantity=1, unit_price=10, price=10)
+        self.client.force_authenticate(user=self.manager)
+
+    def test_fields_select_columns_and_skip_order_items(self):
+        print("Test fields select columns and skip order items")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/orders/?fields=id,status&cursor=')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'status'})
+        order_queries = [q['sql'] for q in queries.captured_queries if 'LittleLemonAPIDRF_order' in q['sql']]
+        self.assertEqual(len(order_queries), 1)
+        self.assertNotIn('"total"', order_queries[0])
+
+        # The cursor still works with the ordering keys selected behind the scenes.
+        next_page = self.client.get('/api/orders/?fields=id,status&cursor=&page_size=2').data['next']
+        self.assertEqual(len(self.client.get(next_page).data['results']), 1)
+
+    def test_expand_adds_order_items(self):
+        print("Test expand adds order items")
+
+        response = self.client.get('/api/orders/?fields=id&expand=order_items')
+        self.assertEqual(set(response.data['results'][0]), {'id', 'order_items'})
+        self.assertEqual(response.data['results'][0]['order_items'][0]['title'], 'Pizza')
+
+        order = Order.objects.first()
+        response = self.client.get(f'/api/orders/{order.id}/?fields=total')
+        self.assertEqual(response.data, {'total': '10.00'})
+
+    def test_sparse_etag_does_not_match_full_response(self):
+        print("Test sparse ETag does not match full response")
+
+        order = Order.objects.first()
+        for path in (f'/api/orders/{order.id}/', '/api/menu-items/'):
+            etag = self.client.get(f'{path}?fields=id')['ETag']
+            self.assertEqual(self.client.get(f'{path}?fields=id', HTTP_IF_NONE_MATCH=etag).status_code,
+                             status.HTTP_304_NOT_MODIFIED)
+            response = self.client.get(path, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotEqual(response['ETag'], etag)
+
+        # The menu cache keeps sparse and full pages apart too.
+        self.assertEqual(set(self.client.get('/api/menu-items/?fields=id').data['results'][0]), {'id'})
+        self.assertIn('title', self.client.get('/api/menu-items/').data['results'][0])
+
+    def test_unknown_fields_are_rejected(self):
+        print("Test unknown fields are rejected")
+
+        response = self.client.get('/api/orders/?fields=id,secret')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/orders/?expand=user')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_menu_items_accept_fields(self):
+        print("Test menu items accept fields")
+
+        response = self.client.get('/api/menu-items/?fields=title,price&ordering=price')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'title': 'Pizza', 'price': '10.00'}])
+
+    def test_fast_representation_matches_drf(self):
+        print("Test fast representation matches DRF")
+
+        order = Order.objects.prefetch_related('order_items').first()
+        order.delivery_crew = self.manager
+        item = order.order_items.all()[0]
+        item.menuitem = None
+        for serializer_class, instance in ((OrderSerializer, order), (OrderItemSerializer, item)):
+            fast = serializer_class(instance).data
+            slow = serializers.Serializer.to_representation(serializer_class(instance), instance)
+            self.assertEqual(dict(fast), dict(slow))
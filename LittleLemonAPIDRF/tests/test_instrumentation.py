@@ -0,0 +1,77 @@
+# LittleLemonAPIDRF/tests/test_instrumentation.py
+
+import json
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Order
+
+def server_timing(response):
+    metrics = {}
+    for entry in response['Server-Timing'].split(', '):
+        name, *params = entry.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+class TestInstrumentation(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='manager', password='testpass', is_staff=True)
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.menu_item = MenuItem.objects.create(title="Pizza", price=10.00, inventory=10)
+        Order.objects.create(user=self.manager, total=10)
+        self.client.force_authenticate(user=self.manager)
+
+    def test_server_timing_header_reports_view_phases(self):
+        print("Test Server-Timing header reports view phases")
+
+        response = self.client.get('/api/orders/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        metrics = server_timing(response)
+        for name in ('total', 'db', 'view', 'auth', 'perm', 'ser'):
+            self.assertIn(name, metrics)
+        self.assertGreater(float(metrics['total']['dur']), 0)
+
+    def test_server_timing_header_is_staff_only_by_default(self):
+        print("Test Server-Timing header is staff only by default")
+
+        self.client.force_authenticate(user=self.customer)
+        self.assertNotIn('Server-Timing', self.client.get('/api/orders/'))
+        self.client.force_authenticate(user=None)
+        self.assertNotIn('Server-Timing', self.client.get('/api/menu-items/'))
+        with override_settings(LITTLE_LEMON_SERVER_TIMING_HEADER=True):
+            self.assertIn('Server-Timing', self.client.get('/api/menu-items/'))
+
+    def test_query_count_matches_executed_queries(self):
+        print("Test query count matches executed queries")
+
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get('/api/orders/')
+        self.assertEqual(server_timing(response)['db']['desc'], f'"{len(captured)} queries"')
+
+    @override_settings(LITTLE_LEMON_SLOW_REQUEST_MS=0, LITTLE_LEMON_SLOW_REQUEST_SAMPLE_RATE=1.0)
+    def test_slow_request_is_logged_with_sql(self):
+        print("Test slow request is logged with SQL")
+
+        with self.assertLogs('LittleLemonAPIDRF.timing', level='WARNING') as logs:
+            self.client.get(f'/api/menu-items/{self.menu_item.id}/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['path'], f'/api/menu-items/{self.menu_item.id}/')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(len(record['sql']), record['queries'])
+
+    def test_fast_request_is_logged_without_sql(self):
+        print("Test fast request is logged without SQL")
+
+        with self.assertLogs('LittleLemonAPIDRF.timing', level='DEBUG') as logs:
+            self.client.get('/api/menu-items/')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(logs.records[0].levelname, 'DEBUG')
+        self.assertNotIn('sql', record)
+        self.assertIn('db_ms', record)
@@ -0,0 +1,93 @@
+# LittleLemonAPIDRF/tests/test_inventory.py
+
+from datetime import timedelta
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Cart, Order
+from LittleLemonAPIDRF.inventory import (
+    InsufficientInventory, reserve_many, release_expired_reservations,
+)
+
+class TestInventoryReservation(APITestCase):
+
+    def setUp(self):
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.pizza = MenuItem.objects.create(title="Pizza", price=10, inventory=5)
+        self.salad = MenuItem.objects.create(title="Salad", price=5, inventory=5)
+        self.client.force_authenticate(user=self.customer)
+
+    def add_to_cart(self, menuitem, quantity):
+        return self.client.post('/api/cart/menu-items/', {"menuitem": menuitem.id, "quantity": quantity}, format='json')
+
+    def inventory(self, menuitem):
+        menuitem.refresh_from_db()
+        return menuitem.inventory
+
+    def test_add_to_cart_reserves_stock(self):
+        print("Test add to cart reserves stock")
+
+        response = self.add_to_cart(self.pizza, 3)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNotNone(response.data['reserved_until'])
+        self.assertEqual(self.inventory(self.pizza), 2)
+
+    def test_cannot_reserve_more_than_stock(self):
+        print("Test cannot reserve more than stock")
+
+        response = self.add_to_cart(self.pizza, 6)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.inventory(self.pizza), 5)
+        self.assertFalse(Cart.objects.exists())
+
+    def test_clearing_cart_releases_stock(self):
+        print("Test clearing cart releases stock")
+
+        self.add_to_cart(self.pizza, 3)
+        self.client.delete('/api/cart/menu-items/')
+        self.assertEqual(self.inventory(self.pizza), 5)
+
+    def test_checkout_keeps_reserved_stock(self):
+        print("Test checkout keeps reserved stock")
+
+        self.add_to_cart(self.pizza, 3)
+        response = self.client.post('/api/orders/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.inventory(self.pizza), 2)
+
+    def test_reserve_many_is_all_or_nothing(self):
+        print("Test reserve many is all or nothing")
+
+        with CaptureQueriesContext(connection) as ctx:
+            with self.assertRaises(InsufficientInventory):
+                reserve_many({self.pizza.id: 2, self.salad.id: 9})
+        updates = [query for query in ctx.captured_queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(self.inventory(self.pizza), 5)
+        self.assertEqual(self.inventory(self.salad), 5)
+
+    def test_expired_reservation_is_released_and_retaken_at_checkout(self):
+        print("Test expired reservation is released and retaken at checkout")
+
+        self.add_to_cart(self.pizza, 3)
+        self.assertEqual(release_expired_reservations(timezone.now() + timedelta(days=1)), 1)
+        self.assertEqual(self.inventory(self.pizza), 5)
+
+        response = self.client.post('/api/orders/')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.inventory(self.pizza), 2)
+
+    def test_checkout_fails_when_released_stock_is_gone(self):
+        print("Test checkout fails when released stock is gone")
+
+        self.add_to_cart(self.pizza, 3)
+        release_expired_reservations(timezone.now() + timedelta(days=1))
+        MenuItem.objects.filter(pk=self.pizza.pk).update(inventory=1)
+
+        response = self.client.post('/api/orders/')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Order.objects.exists())
+        self.assertEqual(Cart.objects.count(), 1)
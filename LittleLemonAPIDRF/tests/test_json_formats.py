@@ -0,0 +1,61 @@
+# LittleLemonAPIDRF/tests/test_json_formats.py
+
+import io
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from django.contrib.auth.models import User, Group
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.formats import FastJSONParser, FastJSONRenderer
+from LittleLemonAPIDRF.models import MenuItem
+
+class TestFastJSON(APITestCase):
+
+    def test_renderer_matches_drf_output(self):
+        print("Test renderer matches DRF output")
+
+        data = {
+            'price': Decimal('10.50'),
+            'date': datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            'day': date(2026, 1, 2),
+            'id': uuid.UUID(int=1),
+            'label': gettext_lazy('Menu'),
+            'by_id': {1: 'Pizza', 2: 'Salad\u2028with feta'},
+            'lines': ({'quantity': 2, 'status': True, 'crew': None},),
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+        # Indented output is left to the stdlib.
+        self.assertEqual(FastJSONRenderer().render(data, 'application/json; indent=2'),
+                         JSONRenderer().render(data, 'application/json; indent=2'))
+
+    def test_parser_matches_drf_and_reports_errors(self):
+        print("Test parser matches DRF and reports errors")
+
+        body = '{"menuitem": 1, "quantity": 2, "note": "café", "price": 1.5}'.encode()
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(body)), JSONParser().parse(io.BytesIO(body)))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"quantity": NaN}'))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"quantity": '))
+
+    def test_api_uses_fast_json(self):
+        print("Test API uses fast JSON")
+
+        MenuItem.objects.create(title="Pizza", price=10, inventory=5)
+        response = self.client.get('/api/menu-items/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+        self.assertEqual(response.json()['results'][0]['price'], '10.00')
+
+        manager = User.objects.create_user(username='manager', password='testpass')
+        manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.client.force_authenticate(user=manager)
+        response = self.client.post('/api/menu-items/', b'{"title": ', content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertTrue(response.json()['detail'].startswith('JSON parse error'))
@@ -0,0 +1,84 @@
+# LittleLemonAPIDRF/tests/test_menu_cache.py
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem
+
+class TestMenuCache(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.menu_item = MenuItem.objects.create(title="Pizza", price=10.00, inventory=10)
+
+    def test_menu_list_is_served_from_cache(self):
+        print("Test menu list is served from cache")
+
+        first = self.client.get('/api/menu-items/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/menu-items/')
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.data, second.data)
+
+    def test_query_params_are_part_of_the_key(self):
+        print("Test query params are part of the key")
+
+        MenuItem.objects.create(title="Burger", price=12.00, inventory=5)
+        self.client.get('/api/menu-items/?search=Pizza')
+        response = self.client.get('/api/menu-items/?search=Burger')
+        self.assertEqual([item['title'] for item in response.data['results']], ["Burger"])
+
+    def test_menu_change_invalidates_cache(self):
+        print("Test menu change invalidates cache")
+
+        self.client.get(f'/api/menu-items/{self.menu_item.id}/')
+        self.client.force_authenticate(user=self.manager)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/menu-items/{self.menu_item.id}/', {"price": 15}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(f'/api/menu-items/{self.menu_item.id}/')
+        self.assertEqual(response.data['price'], '15.00')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/menu-items/{self.menu_item.id}/')
+        response = self.client.get('/api/menu-items/')
+        self.assertEqual(response.data['results'], [])
+
+    def test_reservations_refresh_stock_without_rebuilding_pages(self):
+        print("Test reservations refresh stock without rebuilding pages")
+
+        customer = User.objects.create_user(username='customer', password='testpass')
+        sparse_etag = self.client.get('/api/menu-items/?fields=id,title')['ETag']
+        full_etag = self.client.get('/api/menu-items/')['ETag']
+
+        self.client.force_authenticate(user=customer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/cart/menu-items/', {"menuitem": self.menu_item.id, "quantity": 3}, format='json')
+        self.client.force_authenticate(user=None)
+
+        # Only the stock is re-read for the cached page.
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/menu-items/')
+        self.assertEqual(response.data['results'][0]['inventory'], 7)
+        self.assertNotEqual(response['ETag'], full_etag)
+        with self.assertNumQueries(0):
+            self.client.get('/api/menu-items/')
+        response = self.client.get('/api/menu-items/?fields=id,title', HTTP_IF_NONE_MATCH=sparse_etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_menu_version_is_bumped_only_on_commit(self):
+        print("Test menu version is bumped only on commit")
+
+        self.client.get(f'/api/menu-items/{self.menu_item.id}/')
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.menu_item.price = 20
+            self.menu_item.save()
+            # Still inside the writer's transaction: readers keep the old version.
+            self.assertEqual(self.client.get(f'/api/menu-items/{self.menu_item.id}/').data['price'], '10.00')
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+        self.assertEqual(self.client.get(f'/api/menu-items/{self.menu_item.id}/').data['price'], '20.00')
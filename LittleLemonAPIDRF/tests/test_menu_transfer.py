@@ -0,0 +1,112 @@
+# LittleLemonAPIDRF/tests/test_menu_transfer.py
+
+import json
+from unittest.mock import patch
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.formats import FastJSONParser
+from LittleLemonAPIDRF.menu_transfer import ImportFailed, import_menu_items
+from LittleLemonAPIDRF.models import MenuItem
+
+class TestMenuImportExport(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.pizza = MenuItem.objects.create(title="Pizza", price=10.00, inventory=10, category="Mains")
+        self.client.force_authenticate(user=self.manager)
+
+    def upload(self, body, content_type):
+        return self.client.generic('POST', '/api/menu-items/import/', body.encode(), content_type=content_type)
+
+    def test_csv_import_upserts_on_title_and_category(self):
+        print("Test CSV import upserts on title and category")
+
+        body = (
+            "title,price,inventory,category\n"
+            "Pizza,12.50,20,Mains\n"
+            "Pizza,4.00,5,Kids\n"
+            "Lemon Tart,6.00,8,Desserts\n"
+        )
+        response = self.upload(body, 'text/csv')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'created': 2, 'updated': 1})
+        self.pizza.refresh_from_db()
+        self.assertEqual((str(self.pizza.price), self.pizza.inventory), ("12.50", 20))
+        self.assertEqual(MenuItem.objects.count(), 3)
+
+    def test_ndjson_import_is_all_or_nothing(self):
+        print("Test NDJSON import is all or nothing")
+
+        body = '\n'.join([
+            json.dumps({"title": "Soup", "price": "5.00", "inventory": 3}),
+            json.dumps({"title": "Salad", "price": "not a price", "inventory": 3}),
+        ])
+        response = self.upload(body, 'application/x-ndjson')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['error_count'], 1)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertFalse(MenuItem.objects.filter(title="Soup").exists())
+
+    def test_import_commits_chunks_before_the_first_error(self):
+        print("Test import commits chunks before the first error")
+
+        rows = [{"title": f"Soup {n}", "price": "5.00", "inventory": 3} for n in range(3)]
+        rows.append({"title": "Salad", "price": "not a price", "inventory": 3})
+        with self.assertRaises(ImportFailed) as failed:
+            import_menu_items(rows, chunk_size=2)
+        self.assertEqual((failed.exception.created, failed.exception.updated), (2, 0))
+        self.assertEqual(failed.exception.errors[0]['row'], 4)
+        self.assertEqual(sorted(MenuItem.objects.filter(title__startswith="Soup").values_list('title', flat=True)),
+                         ["Soup 0", "Soup 1"])
+
+    def test_import_upserts_without_duplicates(self):
+        print("Test import upserts without duplicates")
+
+        # Another import created the row after this one looked for it.
+        with patch.object(MenuItem.objects, 'filter', return_value=MenuItem.objects.none()):
+            created, updated = import_menu_items([{"title": "Pizza", "price": "11.00", "inventory": 4, "category": "Mains"}])
+        self.assertEqual(MenuItem.objects.filter(title="Pizza").count(), 1)
+        self.pizza.refresh_from_db()
+        self.assertEqual((str(self.pizza.price), self.pizza.inventory), ("11.00", 4))
+
+    def test_import_is_searchable_and_invalidates_menu_cache(self):
+        print("Test import is searchable and invalidates the menu cache")
+
+        self.client.get('/api/menu-items/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload("title,price,inventory\nBruschetta,6.00,4\n", 'text/csv')
+        results = self.client.get('/api/menu-items/?search=brus').data['results']
+        self.assertEqual([item['title'] for item in results], ["Bruschetta"])
+
+    def test_json_import_uses_the_fast_parser(self):
+        print("Test JSON import uses the fast parser")
+
+        with patch.object(FastJSONParser, 'parse', wraps=FastJSONParser().parse) as parse:
+            response = self.upload(json.dumps([{"title": "Bruschetta", "price": "6.00", "inventory": 4}]), 'application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        parse.assert_called_once()
+
+    def test_export_streams_csv_and_ndjson(self):
+        print("Test export streams CSV and NDJSON")
+
+        response = self.client.get('/api/menu-items/export/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines, ['id,title,price,inventory,category', f'{self.pizza.id},Pizza,10.00,10,Mains'])
+
+        response = self.client.get('/api/menu-items/export/?format=ndjson')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(rows, [{'id': self.pizza.id, 'title': 'Pizza', 'price': '10.00', 'inventory': 10, 'category': 'Mains'}])
+
+    def test_customers_cannot_import_or_export(self):
+        print("Test customers cannot import or export")
+
+        self.client.force_authenticate(user=User.objects.create_user(username='customer', password='testpass'))
+        self.assertEqual(self.client.get('/api/menu-items/export/').status_code, status.HTTP_403_FORBIDDEN)
+        response = self.upload("title,price,inventory\nSoup,5.00,3\n", 'text/csv')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
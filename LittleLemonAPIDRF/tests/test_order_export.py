@@ -0,0 +1,56 @@
+# LittleLemonAPIDRF/tests/test_order_export.py
+
+import csv
+import json
+from datetime import datetime, timezone
+from django.contrib.auth.models import User, Group
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Order, OrderItem
+
+class TestOrderExport(APITestCase):
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        pizza = MenuItem.objects.create(title="Pizza", price=10.00, inventory=10)
+        soup = MenuItem.objects.create(title="Soup", price=4.00, inventory=10)
+        self.orders = []
+        for day in (1, 2, 3):
+            order = Order.objects.create(user=self.customer, total=14)
+            Order.objects.filter(pk=order.pk).update(date=datetime(2025, 3, day, 12, tzinfo=timezone.utc))
+            OrderItem.objects.create(order=order, menuitem=pizza, quantity=1, unit_price=10, price=10)
+            OrderItem.objects.create(order=order, menuitem=soup, quantity=1, unit_price=4, price=4)
+            self.orders.append(order)
+        self.client.force_authenticate(user=self.manager)
+
+    def body(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_has_one_row_per_order_line(self):
+        print("Test CSV export has one row per order line")
+
+        rows = list(csv.DictReader(self.body(self.client.get('/api/orders/export/?from=2025-03-02&to=2025-03-03')).splitlines()))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual({row['order_id'] for row in rows}, {str(self.orders[1].id), str(self.orders[2].id)})
+        self.assertEqual(rows[0]['unit_price'], '10.00')
+
+    def test_ndjson_groups_lines_by_order(self):
+        print("Test NDJSON export groups lines by order")
+
+        body = self.body(self.client.get('/api/orders/export/?format=ndjson&to=2025-03-01'))
+        orders = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual([order['id'] for order in orders], [self.orders[0].id])
+        self.assertEqual(orders[0]['total'], '14.00')
+        self.assertEqual([item['quantity'] for item in orders[0]['items']], [1, 1])
+
+    def test_invalid_range_and_non_managers_are_rejected(self):
+        print("Test invalid range and non-managers are rejected")
+
+        response = self.client.get('/api/orders/export/?from=yesterday')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.customer)
+        self.assertEqual(self.client.get('/api/orders/export/').status_code, status.HTTP_403_FORBIDDEN)
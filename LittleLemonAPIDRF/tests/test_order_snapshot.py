@@ -0,0 +1,67 @@
+# LittleLemonAPIDRF/tests/test_order_snapshot.py
+
+from importlib import import_module
+from django.apps import apps
+from django.contrib.auth.models import User, Group
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Order, OrderItem, DailyItemSales
+
+backfill_snapshot = import_module('LittleLemonAPIDRF.migrations.0008_order_item_snapshot').backfill_snapshot
+
+class TestOrderItemSnapshot(APITestCase):
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.pizza = MenuItem.objects.create(title="Pizza", price=10, inventory=5, category="Mains")
+        self.salad = MenuItem.objects.create(title="Salad", price=5, inventory=5, category="Starters")
+
+    def checkout(self):
+        self.client.force_authenticate(user=self.customer)
+        self.client.post('/api/cart/menu-items/batch/', [
+            {"menuitem": self.pizza.id, "quantity": 1}, {"menuitem": self.salad.id, "quantity": 2},
+        ], format='json')
+        return self.client.post('/api/orders/').data['id']
+
+    def test_order_lines_keep_the_menu_as_it_was_at_checkout(self):
+        print("Test order lines keep the menu as it was at checkout")
+
+        order_id = self.checkout()
+        MenuItem.objects.filter(pk=self.pizza.pk).update(title="Pizza Margherita")
+        self.salad.delete()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'/api/orders/{order_id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(line['menuitem'], line['title'], line['category'], line['quantity']) for line in response.data['order_items']],
+            [(self.pizza.id, 'Pizza', 'Mains', 1), (None, 'Salad', 'Starters', 2)],
+        )
+        self.assertFalse(any('"LittleLemonAPIDRF_menuitem"' in query['sql'] for query in queries.captured_queries))
+
+    def test_deleting_order_of_deleted_menu_item_keeps_analytics_consistent(self):
+        print("Test deleting order of deleted menu item keeps analytics consistent")
+
+        order_id = self.checkout()
+        self.salad.delete()
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.delete(f'/api/orders/{order_id}/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(list(DailyItemSales.objects.order_by('title').values_list('title', 'quantity')),
+                         [('Pizza', 0), ('Salad', 0)])
+
+    def test_backfill_copies_title_and_category_from_menu(self):
+        print("Test backfill copies title and category from menu")
+
+        order = Order.objects.create(user=self.customer, total=15)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, menuitem=item, quantity=1, unit_price=item.price, price=item.price)
+            for item in (self.pizza, self.salad)
+        ])
+        backfill_snapshot(apps, None)
+        self.assertEqual(sorted(OrderItem.objects.values_list('title', 'category')),
+                         [('Pizza', 'Mains'), ('Salad', 'Starters')])
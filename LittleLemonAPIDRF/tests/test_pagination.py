@@ -0,0 +1,92 @@
+# LittleLemonAPIDRF/tests/test_pagination.py
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Order
+
+class TestKeysetPagination(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.orders = [Order.objects.create(user=self.manager, total=i) for i in range(7)]
+        for i in range(7):
+            MenuItem.objects.create(title=f"Item {i}", price=10 - (i % 3), inventory=5)
+        self.client.force_authenticate(user=self.manager)
+
+    def walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            url = response.data['next']
+        return pages
+
+    def test_orders_are_paged_newest_first_without_count(self):
+        print("Test orders are paged newest first without count")
+
+        with CaptureQueriesContext(connection) as ctx:
+            pages = self.walk('/api/orders/?cursor=&page_size=3')
+        self.assertFalse(any('COUNT(' in query['sql'] for query in ctx.captured_queries))
+        self.assertEqual([len(page['results']) for page in pages], [3, 3, 1])
+        ids = [order['id'] for page in pages for order in page['results']]
+        self.assertEqual(ids, [order.id for order in reversed(self.orders)])
+
+    def test_previous_link_returns_previous_page(self):
+        print("Test previous link returns previous page")
+
+        first = self.client.get('/api/orders/?cursor=&page_size=3').data
+        self.assertIsNone(first['previous'])
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertEqual(back['results'], first['results'])
+
+    def test_menu_keyset_follows_ordering_filter(self):
+        print("Test menu keyset follows ordering filter")
+
+        pages = self.walk('/api/menu-items/?cursor=&ordering=-price&page_size=2')
+        items = [(item['price'], item['id']) for page in pages for item in page['results']]
+        expected = list(MenuItem.objects.order_by('-price', '-id').values_list('price', 'id'))
+        self.assertEqual([(float(price), pk) for price, pk in items],
+                         [(float(price), pk) for price, pk in expected])
+
+    def test_page_size_is_capped(self):
+        print("Test page size is capped")
+
+        for i in range(110):
+            Order.objects.create(user=self.manager, total=i)
+        for path in ('/api/orders/?page_size=1000', '/api/orders/?cursor=&page_size=1000'):
+            response = self.client.get(path)
+            self.assertEqual(len(response.data['results']), 100)
+
+    def test_page_number_is_the_default(self):
+        print("Test page number is the default")
+
+        response = self.client.get('/api/orders/')
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(len(response.data['results']), 5)
+        self.assertIn('page=2', response.data['next'])
+        self.assertNotIn('cursor', response.data['next'])
+
+        response = self.client.get('/api/orders/?page=2')
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_keyset_pages_omit_count(self):
+        print("Test keyset pages omit count")
+
+        response = self.client.get('/api/orders/?cursor=')
+        self.assertNotIn('count', response.data)
+        self.assertIn('cursor=', response.data['next'])
+
+    def test_invalid_cursor_returns_404(self):
+        print("Test invalid cursor returns 404")
+
+        response = self.client.get('/api/orders/?cursor=bogus')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,57 @@
+# LittleLemonAPIDRF/tests/test_query_counts.py
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.models import MenuItem, Order, OrderItem
+
+# Role lookup, COUNT, orders, order_items prefetch (keyset pages skip the COUNT)
+MAX_ORDER_PAGE_QUERIES = 4
+
+class TestOrderQueryCounts(APITestCase):
+
+    def setUp(self):
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.menu_items = [
+            MenuItem.objects.create(title=f"Item {i}", price=5, inventory=100)
+            for i in range(3)
+        ]
+
+    def create_orders(self, count):
+        for _ in range(count):
+            order = Order.objects.create(user=self.customer, total=15)
+            OrderItem.objects.bulk_create([
+                OrderItem(order=order, menuitem=menuitem, quantity=1, unit_price=5, price=5)
+                for menuitem in self.menu_items
+            ])
+
+    def list_orders_queries(self, path='/api/orders/'):
+        cache.clear()
+        self.client.force_authenticate(user=self.manager)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(ctx.captured_queries)
+
+    def test_order_list_query_count_does_not_grow_with_page(self):
+        print("Test order list query count does not grow with page")
+
+        self.create_orders(1)
+        single = self.list_orders_queries()
+        self.create_orders(4)
+        full_page = self.list_orders_queries()
+        self.assertEqual(single, full_page)
+        self.assertLessEqual(full_page, MAX_ORDER_PAGE_QUERIES)
+        self.assertLessEqual(self.list_orders_queries('/api/orders/?cursor='), MAX_ORDER_PAGE_QUERIES - 1)
+
+    def test_order_detail_prefetches_order_items(self):
+        print("Test order detail prefetches order items")
+
+        self.create_orders(1)
+        order = Order.objects.get()
+        self.assertLessEqual(self.list_orders_queries(f'/api/orders/{order.id}/'), 3)
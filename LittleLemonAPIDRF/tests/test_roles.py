@@ -0,0 +1,80 @@
+# LittleLemonAPIDRF/tests/test_roles.py
+
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APITestCase, APIRequestFactory
+from rest_framework.request import Request
+from LittleLemonAPIDRF.roles import get_roles, get_user_roles, is_manager, is_customer
+
+class TestRoleResolution(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.manager_group = Group.objects.get_or_create(name='Manager')[0]
+        self.user = User.objects.create_user(username='manager', password='testpass')
+        self.user.groups.add(self.manager_group)
+
+    def make_request(self):
+        request = Request(APIRequestFactory().get('/api/orders/'))
+        request.user = self.user
+        return request
+
+    def test_roles_are_loaded_once_per_request(self):
+        print("Test roles are loaded once per request")
+
+        request = self.make_request()
+        with self.assertNumQueries(1):
+            self.assertTrue(is_manager(request))
+            self.assertFalse(is_customer(request))
+            self.assertEqual(get_roles(request), {'Manager'})
+
+    def test_roles_are_not_cached_across_requests_by_default(self):
+        print("Test roles are not cached across requests by default")
+
+        get_user_roles(self.user)
+        with self.assertNumQueries(1):
+            self.assertTrue(is_manager(self.make_request()))
+
+    @override_settings(LITTLE_LEMON_ROLE_CACHE_TIMEOUT=300)
+    def test_roles_are_cached_across_requests(self):
+        print("Test roles are cached across requests")
+
+        get_user_roles(self.user)
+        with self.assertNumQueries(0):
+            self.assertTrue(is_manager(self.make_request()))
+
+    @override_settings(LITTLE_LEMON_ROLE_CACHE_TIMEOUT=300)
+    def test_group_change_invalidates_cache_on_commit(self):
+        print("Test group change invalidates cache on commit")
+
+        self.assertTrue(is_manager(self.make_request()))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.manager_group.user_set.remove(self.user)
+        self.assertFalse(is_manager(self.make_request()))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(self.manager_group)
+        self.assertTrue(is_manager(self.make_request()))
+
+    @override_settings(LITTLE_LEMON_ROLE_CACHE_TIMEOUT=300)
+    def test_roles_read_before_a_change_are_not_kept(self):
+        print("Test roles read before a change are not kept")
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.manager_group.user_set.remove(self.user)
+        # A request that read the old groups caches them before the commit.
+        cache.set('littlelemon:roles:%s' % self.user.pk,
+                  (cache.get('littlelemon:roles:%s:version' % self.user.pk), frozenset(['Manager'])))
+        for callback in callbacks:
+            callback()
+        self.assertFalse(is_manager(self.make_request()))
+
+    @override_settings(LITTLE_LEMON_ROLE_CACHE_TIMEOUT=300)
+    def test_group_rename_invalidates_cache(self):
+        print("Test group rename invalidates cache")
+
+        self.assertTrue(is_manager(self.make_request()))
+        self.manager_group.name = 'Managers'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.manager_group.save()
+        self.assertFalse(is_manager(self.make_request()))
@@ -0,0 +1,66 @@
+# LittleLemonAPIDRF/tests/test_search.py
+
+from django.core.cache import cache
+from rest_framework.test import APITestCase
+from LittleLemonAPIDRF.models import MenuItem
+from LittleLemonAPIDRF.search import get_search_backend
+
+class TestMenuSearch(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.pizza = MenuItem.objects.create(title="Margherita Pizza", price=10, inventory=5, category="Mains")
+        self.calzone = MenuItem.objects.create(title="Calzone", price=11, inventory=5, category="Pizza")
+        self.cake = MenuItem.objects.create(title="Lemon Cake", price=6, inventory=5, category="Desserts")
+
+    def search(self, query, **params):
+        response = self.client.get('/api/menu-items/', {'search': query, **params})
+        return [item['id'] for item in response.data['results']]
+
+    def test_prefix_search_over_title_and_category(self):
+        print("Test prefix search over title and category")
+
+        self.assertEqual(set(self.search('piz')), {self.pizza.id, self.calzone.id})
+        self.assertEqual(self.search('dess'), [self.cake.id])
+
+    def test_all_terms_must_match(self):
+        print("Test all terms must match")
+
+        self.assertEqual(self.search('lemon cake'), [self.cake.id])
+        self.assertEqual(self.search('lemon pizza'), [])
+
+    def test_title_matches_rank_first(self):
+        print("Test title matches rank first")
+
+        self.assertEqual(self.search('pizza'), [self.pizza.id, self.calzone.id])
+
+    def test_ranked_results_page_with_cursor(self):
+        print("Test ranked results page with cursor")
+
+        for params in ({}, {'cursor': ''}):
+            first = self.client.get('/api/menu-items/', {'search': 'pizza', 'page_size': 1, **params}).data
+            second = self.client.get(first['next']).data
+            self.assertEqual([item['id'] for item in first['results'] + second['results']],
+                             [self.pizza.id, self.calzone.id])
+
+    def test_every_match_can_be_paged_to(self):
+        print("Test every match can be paged to")
+
+        MenuItem.objects.bulk_create([MenuItem(title=f"Soup {n}", price=5, inventory=5) for n in range(1005)])
+        get_search_backend().rebuild()
+        response = self.client.get('/api/menu-items/', {'search': 'soup', 'page': 11, 'page_size': 100})
+        self.assertEqual(response.data['count'], 1005)
+        self.assertEqual(len(response.data['results']), 5)
+
+    def test_index_follows_updates_and_deletes(self):
+        print("Test index follows updates and deletes")
+
+        self.cake.title = "Lemon Tart"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cake.save()
+        self.assertEqual(self.search('tart'), [self.cake.id])
+        self.assertEqual(self.search('cake'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cake.delete()
+        self.assertEqual(self.search('tart'), [])
@@ -0,0 +1,84 @@
+# LittleLemonAPIDRF/tests/test_throttling.py
+
+from unittest import mock
+from django.contrib.auth.models import User, Group
+from django.core.cache import cache
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.throttling import RoleRateThrottle
+
+RATES = {'user': '3/minute', 'anon': '1/minute', 'manager': '5/minute', 'orders.user': '2/minute'}
+
+class OrdersView:
+    throttle_scope = 'orders'
+
+class TestRoleRateThrottle(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.customer = User.objects.create_user(username='customer', password='testpass')
+        self.manager = User.objects.create_user(username='manager', password='testpass')
+        self.manager.groups.add(Group.objects.get_or_create(name='Manager')[0])
+        self.now = 1_000_000.0
+        patches = [
+            mock.patch.object(RoleRateThrottle, 'THROTTLE_RATES', RATES),
+            mock.patch.object(RoleRateThrottle, 'timer', lambda throttle: self.now),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def request(self, user=None):
+        request = Request(APIRequestFactory().get('/api/menu-items/', REMOTE_ADDR='10.0.0.1'))
+        request.user = user if user else mock.Mock(is_authenticated=False)
+        return request
+
+    def allowed(self, user=None, view=None, count=1):
+        return [RoleRateThrottle().allow_request(self.request(user), view) for _ in range(count)]
+
+    def test_rate_depends_on_role(self):
+        print("Test throttle rate depends on role")
+
+        self.assertEqual(self.allowed(self.customer, count=4), [True, True, True, False])
+        self.assertEqual(self.allowed(self.manager, count=6), [True] * 5 + [False])
+        self.assertEqual(self.allowed(count=2), [True, False])
+
+    def test_endpoint_rate_overrides_role_rate(self):
+        print("Test endpoint rate overrides role rate")
+
+        self.assertEqual(self.allowed(self.customer, OrdersView(), count=3), [True, True, False])
+        # The endpoint has its own counter; the role-wide one is untouched.
+        self.assertEqual(self.allowed(self.customer, count=3), [True, True, True])
+
+    def test_previous_window_slides_out(self):
+        print("Test previous window slides out")
+
+        self.now = 1_000_040.0  # 1/3 into a one-minute window
+        self.allowed(self.customer, count=3)
+        self.now += 60  # next window: 2/3 of the previous one still counts
+        self.assertEqual(self.allowed(self.customer, count=2), [True, False])
+        throttle = RoleRateThrottle()
+        throttle.allow_request(self.request(self.customer), None)
+        self.assertAlmostEqual(throttle.wait(), 20.0)
+
+    def test_rejected_requests_do_not_count(self):
+        print("Test rejected requests do not count")
+
+        self.allowed(self.customer, count=10)
+        key = RoleRateThrottle.cache_format % {'scope': 'user', 'ident': self.customer.pk, 'window': int(self.now // 60)}
+        self.assertEqual(cache.get(key), 3)
+
+    def test_manager_can_read_throttle_state(self):
+        print("Test manager can read throttle state")
+
+        self.allowed(self.customer, count=2)
+        self.client.force_authenticate(user=self.manager)
+        response = self.client.get(f'/api/throttles/?user={self.customer.pk}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        state = {entry['scope']: entry for entry in response.data['throttles']}
+        self.assertEqual(state['user']['current_window'], 2)
+        self.assertEqual(state['user']['remaining'], 1)
+
+        self.client.force_authenticate(user=self.customer)
+        self.assertEqual(self.client.get('/api/throttles/').status_code, status.HTTP_403_FORBIDDEN)
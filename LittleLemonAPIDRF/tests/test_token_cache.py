@@ -0,0 +1,100 @@
+# LittleLemonAPIDRF/tests/test_token_cache.py
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+from rest_framework import status
+from LittleLemonAPIDRF.authentication import TokenCache, token_cache
+
+class TestCachedTokenAuthentication(APITestCase):
+
+    def setUp(self):
+        cache.clear()
+        token_cache.clear()
+        self.user = User.objects.create_user(username='customer', password='testpass')
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_warm_path_skips_token_query(self):
+        print("Test warm path skips the token query")
+
+        self.client.get('/api/cart/menu-items/')
+        # Only the role lookup and the (empty) cart page's COUNT are left.
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/cart/menu-items/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_logout_invalidates_token(self):
+        print("Test logout invalidates the cached token")
+
+        self.client.get('/api/cart/menu-items/')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/token/logout/')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        response = self.client.get('/api/cart/menu-items/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        print("Test deactivated user is rejected")
+
+        self.client.get('/api/cart/menu-items/')
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        response = self.client.get('/api/cart/menu-items/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(LITTLE_LEMON_TOKEN_CACHE_SIZE=1)
+    def test_lru_is_bounded(self):
+        print("Test token LRU is bounded")
+
+        other = Token.objects.create(user=User.objects.create_user(username='other', password='testpass'))
+        token_cache.set(self.token.key, self.user, token_cache.stamp(self.token.key))
+        token_cache.set(other.key, other.user, token_cache.stamp(other.key))
+        self.assertIsNone(token_cache.get(self.token.key))
+        self.assertEqual(token_cache.get(other.key).pk, other.user.pk)
+
+    @override_settings(LITTLE_LEMON_TOKEN_CACHE_SHARED=True)
+    def test_shared_cache_warms_other_workers(self):
+        print("Test shared token cache warms other workers")
+
+        self.client.get('/api/cart/menu-items/')
+        token_cache.clear()  # a fresh worker's empty LRU
+        with self.assertNumQueries(2):
+            self.client.get('/api/cart/menu-items/')
+        self.assertIsNotNone(cache.get(token_cache.shared_key(self.token.key)))
+
+    def test_invalidation_is_deferred_to_commit(self):
+        print("Test token invalidation is deferred to commit")
+
+        self.client.get('/api/cart/menu-items/')
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.user.is_active = False
+            self.user.save()
+        self.assertIsNotNone(token_cache.get(self.token.key))
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    @override_settings(LITTLE_LEMON_TOKEN_CACHE_SHARED=True)
+    def test_entry_read_before_invalidation_is_not_stored(self):
+        print("Test entry read before invalidation is not stored")
+
+        stamp = token_cache.stamp(self.token.key)
+        # A logout commits between the database read and the cache write.
+        token_cache.delete(self.token.key)
+        token_cache.set(self.token.key, self.user, stamp)
+        self.assertIsNone(token_cache.get(self.token.key))
+        token_cache.clear()
+        self.assertIsNone(token_cache.get(self.token.key))
+
+    @override_settings(LITTLE_LEMON_TOKEN_CACHE_SHARED=True, LITTLE_LEMON_TOKEN_CACHE_LOCAL_TTL=0)
+    def test_other_workers_invalidation_reaches_shared_entries(self):
+        print("Test another worker's invalidation reaches shared entries")
+
+        self.client.get('/api/cart/menu-items/')
+        self.assertIsNotNone(token_cache.get(self.token.key))
+        TokenCache().delete(self.token.key)  # another worker
+        self.assertIsNone(token_cache.get(self.token.key))
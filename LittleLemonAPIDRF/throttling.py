@@ -0,0 +1,139 @@
+from rest_framework.throttling import SimpleRateThrottle
+from .roles import MANAGER, DELIVERY_CREW, get_roles
+
+ANON = 'anon'
+CUSTOMER = 'user'
+
+# Rate scope for each role, most privileged first.
+ROLE_SCOPES = [
+    (MANAGER, 'manager'),
+    (DELIVERY_CREW, 'delivery_crew'),
+]
+
+
+def role_scope(request):
+    if not request.user or not request.user.is_authenticated:
+        return ANON
+    roles = get_roles(request)
+    for role, scope in ROLE_SCOPES:
+        if role in roles:
+            return scope
+    return CUSTOMER
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Sliding-window counter: two integers per client instead of a timestamp list.
+
+    The request count of the current fixed window is kept with atomic
+    ``cache.add``/``cache.incr`` and blended with the previous window's count,
+    weighted by how much of it still overlaps the sliding window. Memory is
+    O(1) per client and concurrent workers sharing a cache cannot lose or
+    double-count updates.
+
+    Subclasses pick the rate per request through ``get_scope()``.
+    """
+    cache_format = 'littlelemon:throttle:%(scope)s:%(ident)s:%(window)d'
+
+    def __init__(self):
+        # Rates are resolved per request in allow_request().
+        pass
+
+    def get_scope(self, request, view):
+        raise NotImplementedError('.get_scope() must be overridden')
+
+    def get_ident_for(self, request):
+        if request.user and request.user.is_authenticated:
+            return request.user.pk
+        return self.get_ident(request)
+
+    def window_keys(self, scope, ident, duration, now):
+        window = int(now // duration)
+        return (
+            self.cache_format % {'scope': scope, 'ident': ident, 'window': window},
+            self.cache_format % {'scope': scope, 'ident': ident, 'window': window - 1},
+            (now % duration) / duration,
+        )
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(request, view)
+        if self.scope is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(self.THROTTLE_RATES[self.scope])
+        self.now = self.timer()
+        current_key, previous_key, elapsed = self.window_keys(
+            self.scope, self.get_ident_for(request), self.duration, self.now,
+        )
+
+        # The window key outlives its own window so it can serve as the
+        # "previous" count for the next one.
+        if self.cache.add(current_key, 1, self.duration * 2):
+            current = 1
+        else:
+            try:
+                current = self.cache.incr(current_key)
+            except ValueError:
+                # Expired between add() and incr().
+                self.cache.add(current_key, 1, self.duration * 2)
+                current = 1
+        previous = self.cache.get(previous_key, 0)
+
+        self.weighted_previous = previous * (1 - elapsed)
+        if self.weighted_previous + current <= self.num_requests:
+            return True
+        # Rejected requests do not use up the allowance.
+        try:
+            self.cache.decr(current_key)
+        except ValueError:
+            pass
+        self.current, self.elapsed = current - 1, elapsed
+        return False
+
+    def wait(self):
+        remaining = self.duration * (1 - self.elapsed)
+        if self.current >= self.num_requests or not self.weighted_previous:
+            return remaining
+        # Time until enough of the previous window slides out to admit one more.
+        excess = self.weighted_previous + self.current + 1 - self.num_requests
+        return min(remaining, excess / (self.weighted_previous / remaining))
+
+
+class RoleRateThrottle(SlidingWindowThrottle):
+    """Rates per role and, optionally, per endpoint.
+
+    The scope is ``<throttle_scope>.<role>`` if a view sets ``throttle_scope``
+    and that rate exists, else ``<throttle_scope>``, else the role alone:
+    ``anon``, ``user`` (customers), ``delivery_crew`` or ``manager``. A scope
+    with no configured rate is not throttled.
+    """
+
+    def get_scope(self, request, view):
+        role = role_scope(request)
+        endpoint = getattr(view, 'throttle_scope', None)
+        candidates = [f'{endpoint}.{role}', endpoint, role] if endpoint else [role]
+        for scope in candidates:
+            if self.THROTTLE_RATES.get(scope):
+                return scope
+        return None
+
+
+def throttle_state(ident, scopes=None, throttle_class=RoleRateThrottle):
+    """Current window counts of ``ident`` for monitoring, one dict per scope."""
+    throttle = throttle_class()
+    rates = throttle.THROTTLE_RATES
+    now = throttle.timer()
+    states = []
+    for scope in scopes or sorted(scope for scope, rate in rates.items() if rate):
+        num_requests, duration = throttle.parse_rate(rates[scope])
+        current_key, previous_key, elapsed = throttle.window_keys(scope, ident, duration, now)
+        counts = throttle.cache.get_many([current_key, previous_key])
+        estimate = counts.get(previous_key, 0) * (1 - elapsed) + counts.get(current_key, 0)
+        states.append({
+            'scope': scope,
+            'rate': rates[scope],
+            'current_window': counts.get(current_key, 0),
+            'previous_window': counts.get(previous_key, 0),
+            'estimate': round(estimate, 2),
+            'remaining': max(0, int(num_requests - estimate)),
+            'window_resets_in': round(duration * (1 - elapsed), 3),
+        })
+    return states
@@ -1,11 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
-    MenuItemViewSet, CartView, CartDeleteView, CartMenuItemsView,
-    OrderListCreateView, OrderDetailView,
+    MenuItemViewSet, CartView, CartDeleteView, CartMenuItemsView, CartBatchView,
+    OrderListCreateView, OrderDetailView, OrderExportView,
+    DispatchQueueView, DispatchClaimView, DispatchAssignView,
     ManagerUsersView, ManagerUserDeleteView,
-    DeliveryCrewUsersView, DeliveryCrewUserDeleteView
+    DeliveryCrewUsersView, DeliveryCrewUserDeleteView,
+    DailySalesView, TopItemsView, CrewDeliveriesView,
+    ThrottleStateView,
 )
+from .async_views import AsyncMenuItemListView, AsyncOrderListView, AsyncOrderDetailView, OrderEventsView
 
 router = DefaultRouter()
 router.register(r'menu-items', MenuItemViewSet, basename='menuitem')
@@ -14,10 +18,24 @@ urlpatterns = [
     path('', include(router.urls)),
     path('cart/menu-items/', CartMenuItemsView.as_view()),
     path('cart/menu-items/delete/', CartDeleteView.as_view()),
+    path('cart/menu-items/batch/', CartBatchView.as_view()),
     path('orders/', OrderListCreateView.as_view()),
     path('orders/<int:pk>/', OrderDetailView.as_view()),
+    path('orders/export/', OrderExportView.as_view()),
+    path('orders/events/', OrderEventsView.as_view()),
+    path('orders/<int:pk>/events/', OrderEventsView.as_view()),
+    path('dispatch/queue/', DispatchQueueView.as_view()),
+    path('dispatch/claim/', DispatchClaimView.as_view()),
+    path('dispatch/assign/', DispatchAssignView.as_view()),
+    path('async/menu-items/', AsyncMenuItemListView.as_view()),
+    path('async/orders/', AsyncOrderListView.as_view()),
+    path('async/orders/<int:pk>/', AsyncOrderDetailView.as_view()),
     path('groups/manager/users/', ManagerUsersView.as_view()),
     path('groups/manager/users/<int:user_id>/', ManagerUserDeleteView.as_view()),
     path('groups/delivery-crew/users/', DeliveryCrewUsersView.as_view()),
     path('groups/delivery-crew/users/<int:user_id>/', DeliveryCrewUserDeleteView.as_view()),
+    path('analytics/daily-sales/', DailySalesView.as_view()),
+    path('analytics/top-items/', TopItemsView.as_view()),
+    path('analytics/crew-deliveries/', CrewDeliveriesView.as_view()),
+    path('throttles/', ThrottleStateView.as_view()),
 ]
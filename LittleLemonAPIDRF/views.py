@@ -1,14 +1,40 @@
 # views.py
+from datetime import timedelta
 from rest_framework import generics, viewsets, status, permissions, filters, serializers
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.contrib.auth.models import User, Group
+from django.db import transaction
+from django.db.models import F, Sum
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404, render
-from .models import MenuItem, Cart, Order, OrderItem
-from .serializers import MenuItemSerializer, CartSerializer, OrderSerializer, OrderItemSerializer
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .models import MenuItem, Cart, Order, OrderItem, DailySales, DailyItemSales, DailyCrewDeliveries
+from .serializers import MenuItemSerializer, CartSerializer, CartLineSerializer, OrderSerializer, OrderItemSerializer
 from .permissions import IsManager, IsCustomer, IsDeliveryCrew, IsManagerOrReadOnly
+from .roles import is_manager, is_delivery_crew
+from .checkout import place_order, EmptyCartError
+from .inventory import InsufficientInventory
+from .cart import get_cart_store
+from .menu_cache import MenuCacheMixin, menu_etag
+from .conditional import ConditionalGetMixin
+from .fieldsets import SparseFieldsViewMixin
+from .pagination import KeysetPagination
+from .search import MenuSearchFilter
+from .instrumentation import InstrumentedViewMixin
+from .throttling import throttle_state
+from .formats import CSVParser, NDJSONParser, FastJSONParser, CSVRenderer, NDJSONRenderer
+from .menu_transfer import EXPORT_FIELDS, ImportFailed, import_menu_items, export_menu_rows
+from .analytics import snapshot, record_order_changed, record_order_deleted
+from .order_export import EXPORT_HEADER, parse_bound, export_order_rows, group_order_rows
+from .dispatch import queue, claim_orders, assign_orders, max_claim
+from .events import publish_order_change
 from LittleLemonAPIDRF.models import Cart
 from LittleLemonAPIDRF.serializers import CartSerializer
 from .serializers import SimpleUserSerializer, GroupUserSerializer
+from .serializers import DailySalesSerializer, TopItemSerializer, CrewDeliveriesSerializer
+from .serializers import DispatchClaimSerializer, DispatchAssignSerializer
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -16,121 +42,254 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'username', 'email']
 
 # Menu Item Views
-class MenuItemViewSet(viewsets.ModelViewSet):
+class MenuItemViewSet(InstrumentedViewMixin, ConditionalGetMixin, MenuCacheMixin, SparseFieldsViewMixin, viewsets.ModelViewSet):
     queryset = MenuItem.objects.all().order_by('id')
     serializer_class = MenuItemSerializer
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    filter_backends = [filters.OrderingFilter, MenuSearchFilter]
     ordering_fields = ['title', 'price']
-    search_fields = ['title']
     permission_classes = [IsManagerOrReadOnly]
+    pagination_class = KeysetPagination
+
+    def get_validators(self, request, *args, **kwargs):
+        # The menu version already changes on every MenuItem write, so the
+        # ETag costs no query at all.
+        return menu_etag(request, self.action, self.get_sparse_fields()), None
+
+    @action(detail=False, methods=['post'], url_path='import',
+            permission_classes=[permissions.IsAuthenticated, IsManager],
+            parser_classes=[CSVParser, NDJSONParser, FastJSONParser])
+    def import_items(self, request):
+        # CSV and NDJSON uploads arrive as lazy row iterators, JSON as a list.
+        rows = request.data
+        if isinstance(rows, dict):
+            return Response({'error': 'Expected a list of menu items.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            created, updated = import_menu_items(rows)
+        except ImportFailed as exc:
+            return Response({'error_count': exc.error_count, 'errors': exc.errors,
+                             'created': exc.created, 'updated': exc.updated}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({'created': created, 'updated': updated}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'], url_path='export',
+            permission_classes=[permissions.IsAuthenticated, IsManager],
+            renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(export_menu_rows(), EXPORT_FIELDS),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="menu.{renderer.format}"'
+        return response
 
 # Cart Views
-class CartView(generics.ListCreateAPIView):
-    serializer_class = CartSerializer
-    permission_classes = [permissions.IsAuthenticated, IsCustomer]
+class CartStoreMixin:
+    """Read and write the cart through the configured cart store."""
 
     def get_queryset(self):
-        return Cart.objects.filter(user=self.request.user)
+        return get_cart_store().lines(self.request.user)
 
+    def filter_queryset(self, queryset):
+        # Ordering and search only apply to carts kept in the database.
+        if isinstance(queryset, list):
+            return queryset
+        return super().filter_queryset(queryset)
+
+
+class CartLineCreateMixin:
     def perform_create(self, serializer):
+        # Adding an item that is already in the cart adds to its quantity.
         menuitem = serializer.validated_data['menuitem']
-        quantity = serializer.validated_data['quantity']
-        serializer.save(
-            user=self.request.user,
-            unit_price=menuitem.price,
-            price=menuitem.price * quantity
-        )
+        store = get_cart_store()
+        try:
+            store.upsert(self.request.user, {menuitem.id: serializer.validated_data['quantity']}, increment=True)
+        except InsufficientInventory:
+            raise serializers.ValidationError({'quantity': 'Not enough inventory.'})
+        serializer.instance = store.line(self.request.user, menuitem.id)
+
+
+class CartView(InstrumentedViewMixin, CartStoreMixin, CartLineCreateMixin, generics.ListCreateAPIView):
+    serializer_class = CartSerializer
+    permission_classes = [permissions.IsAuthenticated, IsCustomer]
+
+class CartBatchView(InstrumentedViewMixin, generics.GenericAPIView):
+    """Set the quantity of several cart lines at once and return the whole cart."""
+    serializer_class = CartLineSerializer
+    permission_classes = [permissions.IsAuthenticated, IsCustomer]
+    max_lines = 100
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data, many=True, max_length=self.max_lines, allow_empty=False)
+        serializer.is_valid(raise_exception=True)
+        lines = {line['menuitem']: line['quantity'] for line in serializer.validated_data}
+        store = get_cart_store()
+        try:
+            store.upsert(request.user, lines)
+        except InsufficientInventory:
+            raise serializers.ValidationError({'quantity': 'Not enough inventory.'})
+        return Response(CartSerializer(store.lines(request.user), many=True).data)
 
-class CartDeleteView(generics.DestroyAPIView):
+class CartDeleteView(InstrumentedViewMixin, generics.DestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsCustomer]
 
     def delete(self, request, *args, **kwargs):
-        Cart.objects.filter(user=request.user).delete()
+        get_cart_store().clear(request.user)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-class CartMenuItemsView(generics.ListCreateAPIView):
+class CartMenuItemsView(InstrumentedViewMixin, CartStoreMixin, CartLineCreateMixin, generics.ListCreateAPIView):
     serializer_class = CartSerializer
     permission_classes = [permissions.IsAuthenticated, IsCustomer]
 
-    def get_queryset(self):
-        return Cart.objects.filter(user=self.request.user)
-
     #def get_serializer(self, *args, **kwargs):
     #    kwargs['context'] = self.get_serializer_context()
     #    return super().get_serializer(*args, **kwargs)
 
-    def perform_create(self, serializer):
-        menuitem = serializer.validated_data['menuitem']
-        quantity = serializer.validated_data['quantity']
-        serializer.save(
-            user=self.request.user,
-            unit_price=menuitem.price,
-            price=menuitem.price * quantity
-        )
-
     def delete(self, request, *args, **kwargs):
-        Cart.objects.filter(user=request.user).delete()
+        get_cart_store().clear(request.user)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 # Order Views
-class OrderListCreateView(generics.ListCreateAPIView):
+class OrderListCreateView(InstrumentedViewMixin, SparseFieldsViewMixin, generics.ListCreateAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+    ordering = ['-date', '-id']
+    expandable = ['order_items']
 
     def get_queryset(self):
         user = self.request.user
-        if user.groups.filter(name='Manager').exists():
-            return Order.objects.all()
-        elif user.groups.filter(name='Delivery crew').exists():
-            return Order.objects.filter(delivery_crew=user)
-        return Order.objects.filter(user=user)
+        queryset = Order.objects.prefetch_related('order_items')
+        if is_manager(self.request):
+            return queryset
+        elif is_delivery_crew(self.request):
+            return queryset.filter(delivery_crew=user)
+        return queryset.filter(user=user)
 
     def create(self, request, *args, **kwargs):
-        user = self.request.user
-        cart_items = Cart.objects.filter(user=user)
-
-        if not cart_items.exists():
+        # A cart held outside the database is written to it first, so the
+        # order is placed from exactly the lines the customer was shown.
+        store = get_cart_store()
+        store.persist(self.request.user)
+        try:
+            order = place_order(self.request.user)
+        except EmptyCartError:
             return Response({'error': 'Cart is empty.'}, status=status.HTTP_400_BAD_REQUEST)
-
-        total = sum(item.price for item in cart_items)
-
-        order = Order.objects.create(user=user, total=total)
-
-        for item in cart_items:
-            OrderItem.objects.create(
-                order=order,
-                menuitem=item.menuitem,
-                quantity=item.quantity,
-                unit_price=item.unit_price,
-                price=item.price,
-            )
-
-        cart_items.delete()
+        except InsufficientInventory:
+            return Response({'error': 'Not enough inventory.'}, status=status.HTTP_409_CONFLICT)
+        store.checked_out(self.request.user)
 
         return Response({'id': order.id}, status=status.HTTP_201_CREATED)
 
 
-class OrderDetailView(generics.RetrieveUpdateDestroyAPIView):
+class OrderDetailView(InstrumentedViewMixin, ConditionalGetMixin, SparseFieldsViewMixin, generics.RetrieveUpdateDestroyAPIView):
     serializer_class = OrderSerializer
     permission_classes = [permissions.IsAuthenticated]
-    queryset = Order.objects.all()
+    queryset = Order.objects.prefetch_related('order_items')
+    expandable = ['order_items']
+
+    def get_validators(self, request, *args, **kwargs):
+        updated_at = Order.objects.filter(pk=kwargs['pk']).values_list('updated_at', flat=True).first()
+        if updated_at is None:
+            return None
+        etag = f"order-{kwargs['pk']}-{updated_at.timestamp():.6f}"
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            # Each fieldset is its own representation; '+' because parse_etags() splits on commas.
+            etag += '-' + '+'.join(sorted(fields))
+        return etag, updated_at
 
     def patch(self, request, *args, **kwargs):
         order = self.get_object()
-        user = request.user
-        if user.groups.filter(name='Manager').exists():
+        if is_manager(request):
             return self.partial_update(request, *args, **kwargs)
-        elif user.groups.filter(name='Delivery crew').exists():
+        elif is_delivery_crew(request):
             status_val = request.data.get('status')
             if status_val in [0, 1]:
-                order.status = status_val
-                order.save()
+                with transaction.atomic():
+                    before = snapshot(order)
+                    order.status = bool(status_val)
+                    order.save()
+                    record_order_changed(before, snapshot(order))
+                    publish_order_change(order)
                 return Response({'status': 'Updated'}, status=200)
             return Response({'error': 'Invalid status'}, status=400)
         return Response({'error': 'Permission denied'}, status=403)
 
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            before = snapshot(serializer.instance)
+            order = serializer.save()
+            after = snapshot(order)
+            record_order_changed(before, after)
+            if after != before:
+                publish_order_change(order, before.delivery_crew_id)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            record_order_deleted(instance)
+            instance.delete()
+
+class OrderExportView(InstrumentedViewMixin, generics.GenericAPIView):
+    """Stream every order in ``?from=``..``?to=`` as CSV lines or NDJSON orders."""
+    permission_classes = [permissions.IsAuthenticated, IsManager]
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+
+    def get(self, request):
+        start = parse_bound(request.query_params.get('from'), 'from')
+        end = parse_bound(request.query_params.get('to'), 'to', end=True)
+        renderer = request.accepted_renderer
+        rows = export_order_rows(start, end)
+        if isinstance(renderer, NDJSONRenderer):
+            content = renderer.stream(group_order_rows(rows))
+        else:
+            content = renderer.stream(rows, EXPORT_HEADER)
+        response = StreamingHttpResponse(content, content_type=f'{renderer.media_type}; charset={renderer.charset}')
+        response['Content-Disposition'] = f'attachment; filename="orders.{renderer.format}"'
+        return response
+
+# Dispatch Views
+class DispatchQueueView(InstrumentedViewMixin, generics.ListAPIView):
+    """Unassigned open orders, oldest first."""
+    serializer_class = OrderSerializer
+    permission_classes = [permissions.IsAuthenticated, IsManager | IsDeliveryCrew]
+    pagination_class = KeysetPagination
+    ordering = ['date', 'id']
+
+    def get_queryset(self):
+        return queue().prefetch_related('order_items')
+
+
+class DispatchClaimView(InstrumentedViewMixin, generics.GenericAPIView):
+    """Take the ``count`` oldest queued orders; fewer (or none) if the queue runs dry."""
+    serializer_class = DispatchClaimSerializer
+    permission_classes = [permissions.IsAuthenticated, IsDeliveryCrew]
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), 'max_claim': max_claim()}
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = claim_orders(request.user, serializer.validated_data['count'])
+        orders = Order.objects.prefetch_related('order_items').filter(pk__in=ids).order_by('date', 'id')
+        return Response(OrderSerializer(orders, many=True).data)
+
+
+class DispatchAssignView(InstrumentedViewMixin, generics.GenericAPIView):
+    """Assign a batch of orders to one crew member, or requeue them with ``null``."""
+    serializer_class = DispatchAssignSerializer
+    permission_classes = [permissions.IsAuthenticated, IsManager]
+
+    def post(self, request):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        requested = serializer.validated_data['orders']
+        assigned = assign_orders(requested, serializer.validated_data['delivery_crew'])
+        missing = sorted(set(requested) - set(assigned))
+        return Response({'assigned': assigned, 'missing': missing})
+
 # Group Management Views
-class ManagerUsersView(generics.ListCreateAPIView):
+class ManagerUsersView(InstrumentedViewMixin, generics.ListCreateAPIView):
     queryset = User.objects.filter(groups__name='Manager')
     serializer_class = SimpleUserSerializer
     permission_classes = [permissions.IsAuthenticated, IsManager]
@@ -148,7 +307,7 @@ class ManagerUsersView(generics.ListCreateAPIView):
     #    except User.DoesNotExist:
     #        return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-class ManagerUserDeleteView(generics.DestroyAPIView):
+class ManagerUserDeleteView(InstrumentedViewMixin, generics.DestroyAPIView):
     permission_classes = [permissions.IsAuthenticated, IsManager]
 
     def delete(self, request, user_id):
@@ -160,7 +319,7 @@ class ManagerUserDeleteView(generics.DestroyAPIView):
         except (User.DoesNotExist, Group.DoesNotExist):
             return Response({'error': 'User or Group not found'}, status=status.HTTP_404_NOT_FOUND)
 
-class DeliveryCrewUsersView(generics.ListCreateAPIView):
+class DeliveryCrewUsersView(InstrumentedViewMixin, generics.ListCreateAPIView):
     queryset = User.objects.filter(groups__name='Delivery crew')
     serializer_class = SimpleUserSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -182,7 +341,7 @@ class DeliveryCrewUsersView(generics.ListCreateAPIView):
     #    except User.DoesNotExist:
     #        return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-class DeliveryCrewUserDeleteView(generics.DestroyAPIView):
+class DeliveryCrewUserDeleteView(InstrumentedViewMixin, generics.DestroyAPIView):
     serializer_class = SimpleUserSerializer
     permission_classes = [permissions.IsAuthenticated, IsManager]
 
@@ -195,7 +354,7 @@ class DeliveryCrewUserDeleteView(generics.DestroyAPIView):
         except (User.DoesNotExist, Group.DoesNotExist):
             return Response({'error': 'User or Group not found'}, status=status.HTTP_404_NOT_FOUND)
 
-class GroupUserListCreate(generics.ListCreateAPIView):
+class GroupUserListCreate(InstrumentedViewMixin, generics.ListCreateAPIView):
     serializer_class = GroupUserSerializer
 
     def get_queryset(self):
@@ -207,3 +366,69 @@ class GroupUserListCreate(generics.ListCreateAPIView):
         user_id = serializer.validated_data['user']
         user = User.objects.get(id=user_id)
         group.user_set.add(user)
+
+# Analytics Views
+class AnalyticsRangeMixin:
+    """Read-only manager views over the summary tables, for ``?from=``..``?to=`` (last 30 days)."""
+    permission_classes = [permissions.IsAuthenticated, IsManager]
+    pagination_class = None
+    default_days = 30
+
+    def get_range(self):
+        try:
+            end = parse_date(self.request.query_params.get('to', '')) or timezone.localdate()
+            start = parse_date(self.request.query_params.get('from', '')) or end - timedelta(days=self.default_days - 1)
+        except ValueError:
+            raise serializers.ValidationError({'error': 'Dates must be YYYY-MM-DD.'})
+        return start, end
+
+
+class DailySalesView(InstrumentedViewMixin, AnalyticsRangeMixin, generics.ListAPIView):
+    serializer_class = DailySalesSerializer
+
+    def get_queryset(self):
+        return DailySales.objects.filter(day__range=self.get_range()).order_by('day')
+
+
+class TopItemsView(InstrumentedViewMixin, AnalyticsRangeMixin, generics.ListAPIView):
+    serializer_class = TopItemSerializer
+
+    def get_queryset(self):
+        try:
+            limit = min(int(self.request.query_params.get('limit', 10)), 100)
+        except ValueError:
+            limit = 10
+        rows = list(
+            DailyItemSales.objects.filter(day__range=self.get_range()).values('title', 'category')
+            .annotate(quantity=Sum('quantity'), revenue=Sum('revenue')).order_by('-quantity', 'title', 'category')[:limit]
+        )
+        # Title and category are unique on the menu; items deleted (or
+        # renamed) since keep their history but have no id any more.
+        ids = {
+            (title, category): pk for pk, title, category in
+            MenuItem.objects.filter(title__in=[row['title'] for row in rows]).values_list('id', 'title', 'category')
+        }
+        for row in rows:
+            row['menuitem_id'] = ids.get((row['title'], row['category']))
+        return rows
+
+
+class CrewDeliveriesView(InstrumentedViewMixin, AnalyticsRangeMixin, generics.ListAPIView):
+    serializer_class = CrewDeliveriesSerializer
+
+    def get_queryset(self):
+        return (
+            DailyCrewDeliveries.objects.filter(day__range=self.get_range())
+            .values('delivery_crew_id', username=F('delivery_crew__username'))
+            .annotate(assigned=Sum('assigned'), delivered=Sum('delivered'))
+            .order_by('-delivered', 'delivery_crew_id')
+        )
+
+# Monitoring Views
+class ThrottleStateView(InstrumentedViewMixin, generics.GenericAPIView):
+    """Current throttle windows of ``?user=<id>`` or ``?ip=<address>`` (default: caller)."""
+    permission_classes = [permissions.IsAuthenticated, IsManager]
+
+    def get(self, request):
+        ident = request.query_params.get('ip') or request.query_params.get('user') or request.user.pk
+        return Response({'ident': str(ident), 'throttles': throttle_state(ident)})